@@ -5,3 +5,5 @@ from .sdr import SDR
 from .webcam import Webcam
 from .ground_station import GroundStation
 from .controller import GroundStationController
+from .sweep_buffer import SweepBuffer
+from .aio import AsyncGroundStation
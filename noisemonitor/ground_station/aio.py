@@ -0,0 +1,518 @@
+from __future__ import annotations
+
+import time
+import asyncio
+import numpy as np
+
+from .data_structures import Position, MeasurementPoint, PSDLevels
+from .antenna import GenericAntenna
+from .ground_station import GroundStation
+from .psd_buffer import PSDFrameBuffer, PSDStatistics, PSDStreamClosed
+from .rotator import Rotator, SPIDRotator, MoveConvergence
+from .rotctld import AsyncRotctldClient
+from .sdr import SDR
+from .webcam import Webcam
+
+
+def _call_threadsafe(loop: asyncio.AbstractEventLoop, callback, *args):
+    # hands a result of a hardware thread over to the event loop
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        pass  # the event loop was closed already
+
+
+def _set_result(future: asyncio.Future, value):
+    if not future.done():
+        future.set_result(value)
+
+
+class AsyncRotator:
+    """
+    Asyncio counterpart of the rotator. It shares the state of the rotator, e.g. its settle events and its telemetry,
+    and detects the convergence of movements with the same logic. SPID rotators use their own non-blocking connection
+    to rotctld, simulated rotators do not block at all.
+    """
+
+    rotator: Rotator
+
+    def __init__(self, rotator: Rotator):
+        """
+        This function initializes the asyncio rotator.
+        :param rotator: The rotator
+        """
+        self.rotator = rotator
+        self._rotator = rotator._rotator
+        self._client = None
+        if isinstance(self._rotator, SPIDRotator):
+            self._client = AsyncRotctldClient(
+                self._rotator.netrotctl_ip, self._rotator.netrotctl_port
+            )
+
+    async def close(self):
+        """
+        This function closes the connection to rotctld.
+        :return: None
+        """
+        if self._client is not None:
+            await self._client.close()
+
+    async def move_to(
+        self, target_position: Position, on_reading=None, max_poll_interval: float = None
+    ) -> Position:
+        """
+        This function moves the rotator towards the given position, until it converged into a steady position.
+        :param target_position: The position (azimuth and elevation) where the rotator shall point to
+        :param on_reading: Function, which is called with the time (time.monotonic()) and position of each reading
+        :param max_poll_interval: Overrides the longest time between two position readings of this move in seconds
+        :return: The position the rotator could reach, after converging into a steady position reading.
+        """
+        move_start = time.monotonic()
+        if self._telemetry_running():
+            await self.set_position(target_position)
+            reading_time, current_position = await self._wait_for_reading(
+                after=time.monotonic()
+            )
+        else:
+            # the first reading is taken together with setting the target
+            current_position = await self._set_and_get_position(target_position)
+            reading_time = time.monotonic()
+        convergence = MoveConvergence(
+            self._rotator, target_position, move_start, max_poll_interval
+        )
+        while True:
+            if on_reading is not None:
+                on_reading(reading_time, current_position)
+            poll_interval = convergence.update(reading_time, current_position)
+            if convergence.stop_pending:
+                await self.stop_motion()
+                convergence.stop_pending = False
+            if poll_interval is None:
+                break
+            reading_time, current_position = await self._next_reading(
+                poll_interval, reading_time
+            )
+        self._rotator.settle_events.append(convergence.settle_event())
+        return current_position
+
+    async def set_position(self, target_position: Position):
+        """
+        This function commands the rotator to move towards the given position, without waiting for the movement.
+        :param target_position: The position (azimuth and elevation) where the rotator shall point to
+        :return: None
+        """
+        if self._client is None:
+            self._rotator.set_position(target_position)
+            return
+        self._rotator.target_position = target_position
+        await self._client.set_position(target_position)
+
+    async def get_position(self) -> Position:
+        """
+        This function returns the current position reading of the rotator controller.
+        While the telemetry is running, the latest cached reading is returned without querying the controller.
+        :return: The current position reading of the rotator controller
+        """
+        if self._telemetry_running():
+            latest = self._rotator.telemetry.latest()
+            if latest is not None:
+                return latest[1]
+        if self._client is None:
+            return self._rotator.get_position()
+        self._rotator.position = await self._client.get_position()
+        return self._rotator.position
+
+    async def stop_motion(self):
+        """
+        This function stops the movement of the rotator system.
+        :return: None
+        """
+        if self._client is None:
+            self._rotator.stop_motion()
+        else:
+            await self._client.stop()
+
+    async def _set_and_get_position(self, target_position: Position) -> Position:
+        if self._client is None:
+            return self._rotator.set_and_get_position(target_position)
+        self._rotator.target_position = target_position
+        self._rotator.position = await self._client.set_and_get_position(
+            target_position
+        )
+        return self._rotator.position
+
+    def _telemetry_running(self) -> bool:
+        telemetry = self._rotator.telemetry
+        return telemetry is not None and telemetry.running
+
+    async def _next_reading(
+        self, poll_interval: float, last_reading_time: float
+    ) -> (float, Position):
+        # waits for the next published reading, instead of querying the rotator controller itself
+        if self._telemetry_running():
+            return await self._wait_for_reading(after=last_reading_time + poll_interval)
+        await asyncio.sleep(poll_interval)
+        if self._client is None:
+            current_position = self._rotator.get_position()
+        else:
+            current_position = await self._client.get_position()
+            self._rotator.position = current_position
+        return time.monotonic(), current_position
+
+    async def _wait_for_reading(self, after: float) -> (float, Position):
+        telemetry = self._rotator.telemetry
+        delay = after - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def on_reading(reading_time: float, position: Position):
+            if reading_time >= after:
+                _call_threadsafe(loop, _set_result, future, (reading_time, position))
+
+        telemetry.subscribe(on_reading)
+        try:
+            latest = telemetry.latest()
+            if latest is not None and latest[0] >= after:
+                return latest
+            try:
+                return await asyncio.wait_for(future, 5 * telemetry.interval + 1)
+            except asyncio.TimeoutError:
+                raise TimeoutError("Did not receive a rotator position in time!")
+        finally:
+            telemetry.unsubscribe(on_reading)
+
+
+class PSDFrameStream:
+    """
+    Asynchronous iterator over the PSD frames of a frame buffer, as they arrive. The frames are handed over from the
+    thread receiving them, so waiting for frames does not block the event loop and does not poll the buffer.
+    """
+
+    def __init__(
+        self,
+        psd_buffer: PSDFrameBuffer,
+        after: float,
+        frequency: float = None,
+        timeout: float = None,
+    ):
+        """
+        This function initializes the stream, it starts receiving frames once it is opened.
+        :param psd_buffer: The frame buffer
+        :param after: Only frames, whose integration started after this point in time (time.monotonic()) are returned
+        :param frequency: If given, only frames captured at this center frequency are returned
+        :param timeout: The maximum time in seconds to wait for each frame
+        """
+        self.psd_buffer = psd_buffer
+        self.after = float(after)
+        self.frequency = frequency
+        self.timeout = timeout
+        self._queue = None
+        self._put = None
+
+    def open(self):
+        """
+        This function starts receiving frames, including the matching frames, which are buffered already.
+        It has to be called from within the event loop.
+        :return: self
+        """
+        if self._queue is not None:
+            return self
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+
+        def put(frame: PSDLevels):
+            _call_threadsafe(loop, self._queue.put_nowait, frame)
+
+        self._put = put
+        for frame in self.psd_buffer.subscribe(put, self.after, self.frequency):
+            self._queue.put_nowait(frame)
+        return self
+
+    def close(self):
+        """
+        This function stops receiving frames.
+        :return: None
+        """
+        if self._put is not None:
+            self.psd_buffer.unsubscribe(self._put)
+            self._put = None
+
+    async def __aenter__(self) -> PSDFrameStream:
+        return self.open()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __aiter__(self) -> PSDFrameStream:
+        return self.open()
+
+    async def __anext__(self) -> PSDLevels:
+        self.open()
+        try:
+            frame = await asyncio.wait_for(self._queue.get(), self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError("Did not receive the requested PSD frames in time!")
+        if frame is None:
+            self.close()
+            raise PSDStreamClosed("No PSD frames available, PSD stream was stopped!")
+        return frame
+
+
+class AsyncSDR:
+    """
+    Asyncio counterpart of the SDR. The samples are still read and transformed by the receiving thread of the SDR,
+    the event loop is only woken up, once a PSD frame is complete.
+    """
+
+    sdr: SDR
+
+    def __init__(self, sdr: SDR):
+        """
+        This function initializes the asyncio SDR.
+        :param sdr: The SDR
+        """
+        self.sdr = sdr
+        self._sdr = sdr._sdr
+
+    @property
+    def name(self) -> str:
+        return self.sdr.name
+
+    @property
+    def frequency(self) -> float:
+        return self.sdr.frequency
+
+    def stream(
+        self, after: float = None, frequency: float = None, timeout: float = None
+    ) -> PSDFrameStream:
+        """
+        This function returns an asynchronous iterator over the PSD frames as they arrive,
+        e.g. "async with sdr.stream() as frames: async for frame in frames: ...".
+        :param after: Only frames, whose integration started after this point in time (time.monotonic()) are
+            returned. If None, the iteration starts with the next frame.
+        :param frequency: Only frames captured at this center frequency are returned, defaults to the current one
+        :param timeout: The maximum time in seconds to wait for each frame
+        :return: The asynchronous iterator
+        """
+        return PSDFrameStream(
+            self._sdr.psd_buffer,
+            time.monotonic() if after is None else after,
+            frequency=self._sdr.frequency if frequency is None else float(frequency),
+            timeout=timeout,
+        )
+
+    async def change_frequency(self, frequency: float):
+        """
+        This function retunes the SDR to the given frequency. Frames of the new frequency arrive, once it settled.
+        :param frequency: The new center frequency in Hertz
+        :return: None
+        """
+        if not self._sdr.receiving or self._sdr.backend == "soapy_power":
+            # the receiving process is restarted, which waits for its reader thread
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._sdr.change_frequency, frequency
+            )
+            return
+        self._sdr.change_frequency(frequency, wait=False)
+
+    async def capture_psd_levels(
+        self, after: float = None, frequency: float = None, timeout: float = None
+    ) -> PSDLevels:
+        """
+        This function captures the PSD data of one measurement, starting after the given point in time.
+        If integration targets are configured, frames are integrated until the targets are met.
+        :param after: Point in time of time.monotonic(), defaults to now
+        :param frequency: Only frames captured at this center frequency are used, defaults to the current one
+        :param timeout: The maximum time in seconds to wait for each frame
+        :return: PSD levels
+        """
+        async with self.stream(after, frequency, timeout) as frames:
+            if not self._sdr.adaptive_integration:
+                return await frames.__anext__()
+            # integrate frames until one of the targets is met, within the time budget
+            start = time.monotonic()
+            statistics = PSDStatistics()
+            try:
+                async for frame in frames:
+                    statistics.update(frame)
+                    if self._sdr.integration_finished(
+                        statistics, time.monotonic() - start
+                    ):
+                        break
+            except PSDStreamClosed as e:
+                # keep the frames integrated until the stream was stopped
+                if statistics.count < 1:
+                    raise
+                print(f"Integration stopped after {statistics.count} frame(s): {e}")
+            return statistics.result()
+
+
+class AsyncWebcam:
+    """
+    Asyncio counterpart of the webcam. The frames are decoded by the stream thread of the webcam,
+    which is started with the first grab.
+    """
+
+    webcam: Webcam
+
+    def __init__(self, webcam: Webcam):
+        """
+        This function initializes the asyncio webcam.
+        :param webcam: The webcam
+        """
+        self.webcam = webcam
+
+    async def grab_frame(self, timeout: float = 5.0, new: bool = False) -> np.ndarray:
+        """
+        This function returns a copy of the latest frame of the stream.
+        :param timeout: The maximum time in seconds to wait for a frame
+        :param new: If set True, the function waits for the next frame instead of returning the latest one
+        :return: The image
+        """
+        if not self.webcam.streaming:
+            self.webcam.start_stream()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def on_frame(img: np.ndarray):
+            _call_threadsafe(loop, _set_result, future, img.copy())
+
+        latest = self.webcam.subscribe(on_frame)
+        try:
+            if latest is not None and not new:
+                return latest
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError("Did not receive an image from the webcam in time!")
+        finally:
+            self.webcam.unsubscribe(on_frame)
+
+    async def take_image(
+        self, image_path: str, overlay: bool = True, antenna: GenericAntenna = None
+    ):
+        """
+        This function takes an images with the webcam and saves the file.
+        :param image_path: File path where the image should be stored
+        :param overlay: Shall the image contain the overlay of the ground station information - True or False
+        :param antenna: The antenna object necessary for the overlay
+        :return: None
+        """
+        img = await self.grab_frame()
+        # encoding and writing the image is done in the default executor of the event loop
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.webcam.save_image, img, image_path, overlay, antenna
+        )
+
+
+class AsyncGroundStation:
+    """
+    Asyncio counterpart of the ground station, so a single event loop can drive several ground stations and their
+    webcams concurrently. It shares the hardware and the state of the ground station, e.g. the running SDRs.
+    """
+
+    station: GroundStation
+    rotator: AsyncRotator = None
+    sdr: AsyncSDR = None
+    sdrs: [AsyncSDR] = None
+    webcam: AsyncWebcam = None
+
+    def __init__(self, station: GroundStation):
+        """
+        This function initializes the asyncio ground station.
+        :param station: The ground station
+        """
+        self.station = station
+        if station.rotator is not None:
+            self.rotator = AsyncRotator(station.rotator)
+        self.sdrs = [AsyncSDR(sdr) for sdr in station.sdrs]
+        if len(self.sdrs) > 0:
+            self.sdr = self.sdrs[0]
+        if station.webcam is not None:
+            self.webcam = AsyncWebcam(station.webcam)
+
+    async def close(self):
+        """
+        This function closes the connections of the asyncio ground station, the ground station itself stays ready.
+        :return: None
+        """
+        if self.rotator is not None:
+            await self.rotator.close()
+
+    async def move_to(self, position: Position) -> Position:
+        """
+        This function moves the rotator to the given position.
+        :param position: The position (azimuth and elevation) where the rotator shall point to
+        :return: The position the rotator could reach, after converging into a steady position reading.
+        """
+        return await self.rotator.move_to(position)
+
+    async def measure_at_position(
+        self, position: Position, frequencies: [float] = None
+    ) -> [MeasurementPoint]:
+        """
+        This function collects PSD measurements of all SDRs at the provided position.
+        :param position: Position, where the measurement should be taken
+        :param frequencies: Center frequencies of all frequency windows, which shall be captured at the position by
+            SDRs without own frequency windows. If None, only the frequency the SDR is currently tuned to is captured.
+        :return: List of MeasurementPoints containing the results, one per SDR and frequency window
+        """
+        measurement_position = await self.rotator.move_to(position)
+        # only accept PSD frames integrated after the dish settled
+        settle_event = self.station.rotator.last_settle_event
+        after = None if settle_event is None else settle_event.timestamp
+        return await self.capture_at_position(
+            position, measurement_position, frequencies, after
+        )
+
+    async def capture_at_position(
+        self,
+        target_position: Position,
+        measurement_position: Position,
+        frequencies: [float] = None,
+        after: float = None,
+    ) -> [MeasurementPoint]:
+        """
+        This function collects PSD measurements of all SDRs concurrently, without moving the rotator.
+        :param target_position: The position the rotator was commanded to
+        :param measurement_position: The position the rotator reached
+        :param frequencies: Center frequencies of all frequency windows, which shall be captured by SDRs without
+            own frequency windows. If None, only the frequency the SDR is currently tuned to is captured.
+        :param after: Only PSD frames integrated after this point in time (time.monotonic()) are accepted
+        :return: List of MeasurementPoints containing the results, one per SDR and frequency window
+        """
+        results = await asyncio.gather(
+            *(
+                self._capture(
+                    sdr, target_position, measurement_position, frequencies, after
+                )
+                for sdr in self.sdrs
+            )
+        )
+        return [mp for measurement_points in results for mp in measurement_points]
+
+    @staticmethod
+    async def _capture(
+        sdr: AsyncSDR,
+        target_position: Position,
+        measurement_position: Position,
+        frequencies: [float] = None,
+        after: float = None,
+    ) -> [MeasurementPoint]:
+        measurement_points = []
+        for frequency in GroundStation.capture_frequencies(sdr.sdr, frequencies):
+            if frequency != sdr.frequency:
+                await sdr.change_frequency(frequency)
+            measurement_points.append(
+                MeasurementPoint(
+                    target_position=target_position,
+                    measurement_position=measurement_position,
+                    psd_levels=await sdr.capture_psd_levels(
+                        after=after, frequency=frequency
+                    ),
+                    sdr=sdr.name,
+                )
+            )
+        return measurement_points
@@ -22,29 +22,43 @@ class AstroObject:
         self.observation_location = str(observation_location)
         self.object_path = self._get_object_path()
 
-    def get_position(self, time_point: float = time.time()) -> Position:
+    def get_position(self, time_point: float = None) -> Position:
         """
         Returns the position of the astronomical object at the given point in time.
         If none is give, it returns the current position.
         :param time_point: Timestamp of the point in time for which the position shall be calculated
         :return: Position of the astronomical object
         """
-        t = time.time()
-        if time_point is not None:
-            t = float(time_point)
+        # the default is resolved at the call, not once at import
+        t = time.time() if time_point is None else float(time_point)
         past_df = self.object_path[self.object_path["timestamp"] <= t]
         if past_df.shape[0] < 1:
-            self.object_path = self._get_object_path(timestamp=time_point)
+            self.object_path = self._get_object_path(timestamp=t)
             past_df = self.object_path[self.object_path["timestamp"] <= t]
         past = past_df.iloc[-1]
         future_df = self.object_path[self.object_path["timestamp"] > t]
         if future_df.shape[0] < 1:
             # next day -> get new object path
-            self.object_path = self._get_object_path(timestamp=time_point)
+            self.object_path = self._get_object_path(timestamp=t)
             future_df = self.object_path[self.object_path["timestamp"] > t]
         future = future_df.iloc[0]
         return self._interpolate_position(t, past, future)
 
+    def get_rate(self, time_point: float = None, dt: float = 30.0) -> Position:
+        """
+        Returns the angular rate of the astronomical object at the given point in time.
+        :param time_point: Timestamp of the point in time, defaults to the current time
+        :param dt: The half width of the time window of the central difference in seconds
+        :return: The rate in azimuth and elevation direction in degree per second
+        """
+        t = time.time() if time_point is None else float(time_point)
+        before = self.get_position(t - dt)
+        after = self.get_position(t + dt)
+        # shortest way across the 0°/360° azimuth border
+        az_diff = (after.azimuth - before.azimuth + 180) % 360 - 180
+        el_diff = after.elevation - before.elevation
+        return Position(az_diff / (2 * dt), el_diff / (2 * dt))
+
     @staticmethod
     def _interpolate_position(
         time_now: float, past: pd.Series, future: pd.Series
@@ -52,16 +66,19 @@ class AstroObject:
         # only linear interpolation
         t_diff = future.timestamp - past.timestamp
         t_offset = time_now - past.timestamp
-        az_per_sec = (future.az - past.az) / t_diff
+        # shortest way across the 0°/360° azimuth border
+        az_per_sec = ((future.az - past.az + 180) % 360 - 180) / t_diff
         el_per_sec = (future.el - past.el) / t_diff
         az_offset = az_per_sec * t_offset
         el_offset = el_per_sec * t_offset
-        az = past.az + az_offset
+        az = (past.az + az_offset) % 360
         el = past.el + el_offset
         return Position(az, el)
 
-    def _get_object_path(self, timestamp: float = time.time()) -> pd.DataFrame:
+    def _get_object_path(self, timestamp: float = None) -> pd.DataFrame:
         # get object path for location for the current day, in UTC and in a frequency of 1min
+        if timestamp is None:
+            timestamp = time.time()
         df = pd.DataFrame(
             azely.compute(
                 self.object_name,
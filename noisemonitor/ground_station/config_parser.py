@@ -1,3 +1,4 @@
+import copy
 import yaml
 
 
@@ -10,12 +11,37 @@ DEFAULT_VALUES = {
             "netrotctl_ip": None,
             "netrotctl_port": None,
             "positioning_tolerance": None,
+            "min_poll_interval": None,
+            "max_poll_interval": None,
+            "stable_rate": None,
+            "stable_readings": None,
+            "stall_timeout": None,
+            "slew_rate_azimuth": None,
+            "slew_rate_elevation": None,
+            "acceleration_azimuth": None,
+            "acceleration_elevation": None,
+            "azimuth_limits": None,
+            "settle_time": None,
+            "telemetry_interval": None,
         },
         "sdr": {
             "type": None,
             "sample_rate": None,
             "lna_gain": None,
             "psd_bins": None,
+            "backend": None,
+            "tune_delay": None,
+            "name": None,
+            "device": None,
+            "frequencies": None,
+            "frame_time": None,
+            "min_integration_time": None,
+            "max_integration_time": None,
+            "target_std_error": None,
+            "target_snr": None,
+            "replay_file": None,
+            "replay_source": None,
+            "replay_speed": None,
         },
         "antenna": {
             "name": "Dipole",
@@ -38,6 +64,9 @@ DEFAULT_VALUES = {
     "controller": {
         "target_object": "Sun",
         "target_frequency": None,
+        "target_frequencies": None,
+        "optimize_path": None,
+        "target_uncertainty": None,
         "application_port": 8050,
         "application_ip": "127.0.0.1",
         "step_size_azimuth": None,
@@ -58,7 +87,8 @@ def load_config_from_file(
     :param default_values: Dict with default settings
     :return: updated dict, with all necessary setting parameters
     """
-    vals = default_values.copy()
+    # deep copy, so loading several configs never shares or alters the defaults
+    vals = copy.deepcopy(default_values)
     try:
         with open(config_file, "r") as f:
             config = yaml.safe_load(f)
@@ -78,7 +108,6 @@ def load_config_from_file(
                         vals["groundstation"][k_o] = gs[k_o]
         if con is None:
             print("No controller given in config file -> Fallback to defaults")
-            config.update("controller", config.get("controller"))
         else:
             # only update values which are not None
             for k, v in con.items():
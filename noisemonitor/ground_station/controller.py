@@ -2,23 +2,43 @@ from __future__ import annotations
 
 import time
 import math
+import numpy as np
 import pandas as pd
+from collections import deque
 
 from .ground_station import GroundStation
 from .astronomical_object import AstroObject
-from .data_structures import MeasurementPoint, Position
+from .data_structures import MeasurementPoint, Position, SourceFit
 from .config_parser import load_config_from_file
+from .path_planner import plan_path, SweepTiming
+from .source_fit import position_levels, fit_source
+from .pipeline import PipelineStage
+from .sweep_log import SweepLog
+from .sweep_buffer import SweepBuffer
+
+
+COARSEN_FACTOR = 2**0.25  # increase of the step size per step, when a sweep is fitted into a time budget
+REPLAN_MARGIN = 0.05  # share of the remaining time budget kept as reserve, when a late sweep is re-planned
 
 
 class GroundStationController:
     ground_station: GroundStation = None
     astro_object: AstroObject = None
     motion_path: [Position] = []
-    measurement_points: [MeasurementPoint] = []
+    measurement_points: SweepBuffer = None
     step_size: (float, float) = (5, 5)
     target_position: Position = Position(180, 45)
     scan_width: (float, float) = (360, 90)
     target_frequency: float = None
+    target_frequencies: [float] = None
+    optimize_path: bool = False
+    target_uncertainty: float = None  # in degree, position uncertainty of adaptive sweeps
+    source_fit: SourceFit = None
+    sweep_log: SweepLog = None
+    progress: (int, int) = (0, 0)  # measured and total positions of the running sweep
+    sweep_timing: SweepTiming = None  # move and dwell times measured during the sweeps
+    keep_rx: bool = False  # if set True, the SDRs keep receiving after a sweep, e.g. between the jobs of a service
+    tracking_errors: [dict] = None  # pointing errors of the last predictive tracking
     config: dict = None
     port: int = None
     ip: str = None
@@ -47,19 +67,27 @@ class GroundStationController:
         :param no_sdr: If set True, the ground station class will be initialized without an SDR
         :param inactive: If set True, the ground station class will be initialized without an SDR or rotator
         """
+        # per instance, so several controllers can run in the same process
+        self.motion_path = []
+        self.measurement_points = SweepBuffer()
         if config_file is not None:
             self.config = load_config_from_file(config_file)
             c = self.config["controller"]
             self.target_frequency = c.get("target_frequency")
+            if c.get("target_frequencies") is not None:
+                self.set_target_frequencies(c.get("target_frequencies"))
+            self.optimize_path = bool(c.get("optimize_path"))
+            self.target_uncertainty = c.get("target_uncertainty")
             self.port = c.get("application_port")
             self.ip = c.get("application_ip")
             self.set_scan_width(
                 c.get("scan_width_azimuth"), c.get("scan_width_elevation")
             )
-            self.set_step_size(c.get("step_size_azimuth"), c.get("step_size_elevation"))
+            # the default step size depends on the antenna of the ground station
             self.ground_station = GroundStation(
                 config_dict=self.config, no_sdr=no_sdr, inactive=inactive
             )
+            self.set_step_size(c.get("step_size_azimuth"), c.get("step_size_elevation"))
             self._load_astro_object()
         if ground_station is not None:
             self.ground_station = ground_station
@@ -112,7 +140,21 @@ class GroundStationController:
             frequency = self.target_frequency
         if frequency is None or set_center_frequency:
             frequency = self.ground_station.antenna.center_frequency
-        self.ground_station.sdr.start_rx(frequency=frequency)
+        self.ground_station.start_rx(frequency=frequency)
+
+    def set_target_frequencies(self, frequencies: [float] = None):
+        """
+        This function sets multiple frequency windows, which shall be captured at every position of the sweep.
+        :param frequencies: The center frequencies of the frequency windows in Hertz. If None, only the single
+            target frequency is captured.
+        :return: None
+        """
+        if frequencies is None:
+            self.target_frequencies = None
+            return
+        self.target_frequencies = [float(f) for f in frequencies]
+        if len(self.target_frequencies) < 1:
+            raise ValueError("Expected at least one frequency window!")
 
     def set_scan_width(self, azimuth: float, elevation: float):
         """
@@ -138,9 +180,11 @@ class GroundStationController:
             elevation = self.ground_station.antenna.opening_angle_el / 2
         self.step_size = (float(azimuth), float(elevation))
 
-    def compute_path(self):
+    def compute_path(self, optimize: bool = None):
         """
         This function calculates the motion path for the noise measurement.
+        :param optimize: If set True, the positions are reordered to minimize the slew time of the rotator.
+            Defaults to the optimize_path setting.
         :return: None
 
         A -> Start Point
@@ -171,78 +215,612 @@ class GroundStationController:
                 "The target_position is not defined for azimuth or elevation!"
             )
 
-        col_num = math.ceil(self.scan_width[0] / self.step_size[0])
-        row_num = math.ceil(self.scan_width[1] / self.step_size[1])
+        self.motion_path = self._grid_path(self.step_size)
+        if self.optimize_path if optimize is None else optimize:
+            self.motion_path = self._optimized(self.motion_path)
 
-        az_diff = col_num * self.step_size[0] - self.scan_width[0]
-        az_offset = (self.scan_width[0] + az_diff) / 2 - self.step_size[0] / 2
+    def _optimized(self, path: [(float, float)]) -> [(float, float)]:
+        # the order of the positions with the shortest slew time from the current position of the rotator
+        rotator = self.ground_station.rotator
+        path = plan_path(
+            [Position(az, el) for az, el in path],
+            rotator.cost_model,
+            start=rotator.last_position,
+        )
+        return [(p.azimuth, p.elevation) for p in path]
+
+    def _grid_path(self, step_size: (float, float)) -> [(float, float)]:
+        # serpentine rows of the scan width around the target position
+        col_num = math.ceil(self.scan_width[0] / step_size[0])
+        row_num = math.ceil(self.scan_width[1] / step_size[1])
+
+        az_diff = col_num * step_size[0] - self.scan_width[0]
+        az_offset = (self.scan_width[0] + az_diff) / 2 - step_size[0] / 2
         start_az = self.target_position.azimuth - az_offset
 
-        el_diff = row_num * self.step_size[1] - self.scan_width[1]
-        el_offset = (self.scan_width[1] + el_diff) / 2 - self.step_size[1] / 2
+        el_diff = row_num * step_size[1] - self.scan_width[1]
+        el_offset = (self.scan_width[1] + el_diff) / 2 - step_size[1] / 2
         start_el = self.target_position.elevation - el_offset
 
+        path = []
         for row in range(row_num):
             for col in range(col_num):
                 col_step = col if row % 2 == 0 else col_num - col - 1
-                az = start_az + self.step_size[0] * col_step
-                el = start_el + self.step_size[1] * row
-                self.motion_path.append((az, el))
-        self._limit_axis()
+                az = start_az + step_size[0] * col_step
+                el = start_el + step_size[1] * row
+                path.append((az, el))
+        return self._limit_axis(path)
+
+    def predict_sweep_duration(self, path: [(float, float)] = None) -> float:
+        """
+        This function predicts the duration of a sweep along the computed motion path, based on the cost model of
+        the rotator and the expected measurement time at each position.
+        :param path: The azimuth and elevation angles of the positions, defaults to the motion path
+        :return: The predicted duration in seconds
+        """
+        if path is None:
+            path = self.motion_path
+        rotator = self.ground_station.rotator
+        if self.sweep_timing is None:
+            self.sweep_timing = SweepTiming(rotator.cost_model)
+        return self.sweep_timing.predict(
+            [Position(az, el) for az, el in path],
+            start=rotator.last_position,
+            dwell_time=self.ground_station.predict_dwell_time(self.target_frequencies),
+        )
+
+    def plan_path_for_deadline(
+        self,
+        deadline: float,
+        max_step: (float, float) = None,
+        optimize: bool = None,
+    ) -> float:
+        """
+        This function computes the densest motion path, which can be measured until the deadline.
+        Starting at the current step size, the step size is increased in small factors until the predicted duration
+        of the sweep fits. If even the largest step size does not fit, the positions farthest from the target
+        position are dropped. The prediction includes the move and dwell times measured during previous sweeps.
+        The step size is set to the one of the planned path, budgeted_sweep restores it after the sweep.
+        :param deadline: Point in time of time.time(), at which the sweep has to be finished
+        :param max_step: The largest step size in degree (AZ, EL), defaults to the HPBW of the antenna
+        :param optimize: If set True, the positions are reordered to minimize the slew time of the rotator.
+            Defaults to the optimize_path setting.
+        :return: The predicted duration of the sweep in seconds
+        """
+        budget = deadline - time.time()
+        if budget <= 0:
+            raise ValueError("The deadline of the sweep has passed already!")
+        self.motion_path, self.step_size = self._fit_grid(
+            budget, self.step_size, max_step=max_step
+        )
+        if self.optimize_path if optimize is None else optimize:
+            self.motion_path = self._optimized(self.motion_path)
+        predicted = self.predict_sweep_duration()
+        print(
+            f"Planned {len(self.motion_path)} positions in steps of "
+            f"AZ{self.step_size[0]:.2f}, EL{self.step_size[1]:.2f}, "
+            f"predicted duration {predicted:.0f}s of {budget:.0f}s"
+        )
+        return predicted
+
+    def _fit_grid(
+        self,
+        budget: float,
+        min_step: (float, float),
+        max_step: (float, float) = None,
+        measured: [Position] = None,
+    ) -> ([(float, float)], (float, float)):
+        # the densest grid between both step sizes, whose unmeasured positions fit into the time budget
+        if max_step is None:
+            max_step = self.ground_station.antenna.opening_angle
+        max_step = (max(max_step[0], min_step[0]), max(max_step[1], min_step[1]))
+        factor = 1.0
+        while True:
+            step = (
+                min(min_step[0] * factor, max_step[0]),
+                min(min_step[1] * factor, max_step[1]),
+            )
+            path = self._unmeasured(self._grid_path(step), measured or [], step)
+            if self.predict_sweep_duration(path) <= budget or step == max_step:
+                break
+            factor *= COARSEN_FACTOR
+        return self._drop_farthest(path, budget), step
+
+    @staticmethod
+    def _unmeasured(
+        path: [(float, float)], measured: [Position], step: (float, float)
+    ) -> [(float, float)]:
+        # drops the positions within half a step of a measured position
+        if len(path) < 1 or len(measured) < 1:
+            return path
+        points = np.asarray(path, dtype=np.float64)
+        done = np.asarray(
+            [(p.azimuth, p.elevation) for p in measured], dtype=np.float64
+        )
+        az_diff = np.abs((points[:, None, 0] - done[None, :, 0] + 180) % 360 - 180)
+        el_diff = np.abs(points[:, None, 1] - done[None, :, 1])
+        covered = ((az_diff < step[0] / 2) & (el_diff < step[1] / 2)).any(axis=1)
+        return [p for p, c in zip(path, covered) if not c]
+
+    def _drop_farthest(
+        self, path: [(float, float)], budget: float
+    ) -> [(float, float)]:
+        # keeps as many positions close to the target position as fit into the time budget, in their order
+        if self.predict_sweep_duration(path) <= budget:
+            return path
+        def distance(point: (float, float)) -> float:
+            d = _angular_difference(Position(*point), self.target_position)
+            # on the sky, the azimuth difference shrinks with the elevation
+            return math.hypot(d.azimuth * math.cos(math.radians(point[1])), d.elevation)
+
+        ranks = np.argsort([distance(p) for p in path])
+        low, high = 0, len(path)
+        while low < high:
+            count = (low + high + 1) // 2
+            keep = set(ranks[:count].tolist())
+            kept = [p for i, p in enumerate(path) if i in keep]
+            if self.predict_sweep_duration(kept) <= budget:
+                low = count
+            else:
+                high = count - 1
+        keep = set(ranks[:low].tolist())
+        print(f"Dropped {len(path) - low} positions far from the target position")
+        return [p for i, p in enumerate(path) if i in keep]
+
+    def _replan(
+        self,
+        path: [(float, float)],
+        deadline: float,
+        measured: [Position],
+        optimize: bool = None,
+    ) -> [(float, float)]:
+        # keeps the remaining positions, as long as they fit until the deadline, otherwise coarsens or drops them
+        budget = deadline - time.time()
+        if self.predict_sweep_duration(path) <= budget:
+            return path
+        if budget <= 0:
+            print(f"Deadline reached, skip the remaining {len(path)} positions..")
+            return []
+        path, self.step_size = self._fit_grid(
+            budget * (1 - REPLAN_MARGIN),
+            (
+                self.step_size[0] * COARSEN_FACTOR,
+                self.step_size[1] * COARSEN_FACTOR,
+            ),
+            measured=measured,
+        )
+        if self.optimize_path if optimize is None else optimize:
+            path = self._optimized(path)
+        print(
+            f"Behind schedule, re-planned {len(path)} remaining positions in steps of "
+            f"AZ{self.step_size[0]:.2f}, EL{self.step_size[1]:.2f}"
+        )
+        # a resumed sweep continues with the re-planned path
+        self.motion_path = [(p.azimuth, p.elevation) for p in measured] + path
+        if self.sweep_log is not None:
+            self.sweep_log.replan(self.motion_path)
+        return path
 
-    def track_motion_path(self, take_images: bool = False):
+    def open_sweep_log(self, file_path: str, resume: bool = False):
+        """
+        This function opens an append-only log, to which all following measurements are written as soon as they
+        were taken.
+        :param file_path: The path of the log file
+        :param resume: If set True, the motion path and the measurements of the last sweep are restored from the
+            log, so track_motion_path(resume=True) continues with the positions, which were not measured yet
+        :return: None
+        """
+        self.close_sweep_log()
+        self.sweep_log = SweepLog(file_path)
+        if resume:
+            self.resume_sweep()
+
+    def resume_sweep(self):
+        """
+        This function restores the motion path and the measurements of the last sweep from the open sweep log, so
+        track_motion_path(resume=True) continues with the positions, which were not measured yet.
+        :return: None
+        """
+        file_path = self.sweep_log.file_path
+        if len(self.sweep_log.motion_path) < 1:
+            raise Exception(f"The sweep log {file_path} contains no sweep to resume!")
+        if not self.sweep_log.resumable:
+            raise Exception(
+                f"The {self.sweep_log.kind} sweep of the sweep log {file_path} can not be resumed!"
+            )
+        self.motion_path = list(self.sweep_log.motion_path)
+        self.measurement_points = self.sweep_log.take_measurement_points()
+        remaining = [
+            p
+            for p in self.motion_path
+            if not self.sweep_log.is_measured(Position(*p))
+        ]
+        print(
+            f"Resume sweep with {len(remaining)} of {len(self.motion_path)} positions remaining"
+        )
+
+    def close_sweep_log(self):
+        """
+        This function syncs and closes the sweep log.
+        :return: None
+        """
+        if self.sweep_log is not None:
+            self.sweep_log.close()
+            self.sweep_log = None
+
+    def _stop_rx(self):
+        # SDRs, which keep receiving, are only retuned by the next sweep
+        if not self.keep_rx:
+            self.ground_station.stop_rx()
+
+    def _persist(self, measurement_points: [MeasurementPoint]):
+        if self.sweep_log is not None:
+            self.sweep_log.append(measurement_points)
+        self.measurement_points.extend(measurement_points)
+
+    def track_motion_path(
+        self,
+        take_images: bool = False,
+        resume: bool = False,
+        deadline: float = None,
+        sweep_kind: str = "sweep",
+        optimize: bool = None,
+    ):
         """
         This function processes all previously computed points on the motion path and takes measurements.
+        If multiple target frequencies are set, all of them are captured at each position.
+        Images and measurements are processed on worker threads, while the rotator moves to the next position.
         :param take_images: If set True, an image will be taken at each position
+        :param resume: If set True, positions which the sweep log already contains are skipped
+        :param deadline: Point in time of time.time(), at which the sweep has to be finished. If the sweep falls
+            behind, the remaining positions are re-planned with a larger step size or dropped.
+        :param sweep_kind: The kind of the sweep in the sweep log, sweeps of the kind "adaptive" can not be resumed
+        :param optimize: Only with a deadline, if set True, re-planned positions are reordered to minimize the slew
+            time of the rotator. Defaults to the optimize_path setting.
         :return: None
         """
-        self.set_target_frequency()
-        for az_pos, el_pos in self.motion_path:
-            target_pos = Position(az_pos, el_pos)
-            try:
-                mp = self.ground_station.measure_at_position(target_pos)
-            except Exception as e:
-                print(
-                    f"Could not measure at {target_pos} due to Exception: {e}\n"
-                    f"Try resetting rotator motor driver and try again.."
-                )
-                try:
-                    self.ground_station.rotator.reset_motor_driver()
-                    mp = self.ground_station.measure_at_position(target_pos)
-                except Exception as e:
-                    print(
-                        f"Could not get rotator to work - Exception: {e}\n"
-                        f"Exit motion tracking.."
+        path = self.motion_path
+        if self.sweep_log is not None:
+            if resume:
+                path = [
+                    p for p in path if not self.sweep_log.is_measured(Position(*p))
+                ]
+            else:
+                self.sweep_log.start_sweep(path, kind=sweep_kind)
+        frequencies = self.target_frequencies
+        if frequencies is None:
+            self.set_target_frequency()
+        else:
+            self.set_target_frequency(frequency=frequencies[0])
+        t_start = time.time()
+        self.progress = (0, len(path))
+        print(
+            f"Sweep {len(path)} positions, "
+            f"predicted duration {self.predict_sweep_duration(path):.0f}s"
+        )
+        webcam = self.ground_station.webcam
+        if take_images and webcam is None:
+            print("No webcam configured, skip imaging..")
+            take_images = False
+        stop_stream = take_images and not webcam.streaming
+        if stop_stream:
+            # one connection for the whole sweep, instead of one per image
+            webcam.start_stream()
+        # appending to the sweep log is not idempotent, so it is never retried and a failure stops the sweep
+        persistence = (
+            None
+            if self.sweep_log is None
+            else PipelineStage(
+                "Persisting", self.sweep_log.append, retries=0, fail_fast=True
+            )
+        )
+        imaging = PipelineStage("Imaging", self._save_image) if take_images else None
+        rotator = self.ground_station.rotator
+        timing = self.sweep_timing
+        dwell_time = self.ground_station.predict_dwell_time(frequencies)
+        remaining = deque(path)
+        measured = [Position(*p) for p in set(self.motion_path) - set(path)]
+        # re-planning coarsens the step size only for this sweep
+        step_size = self.step_size
+        try:
+            while len(remaining) > 0:
+                if deadline is not None:
+                    remaining = deque(
+                        self._replan(list(remaining), deadline, measured, optimize)
                     )
-                    break
-            self.measurement_points.append(mp)
-            if take_images:
-                file_name = f"tracking_image_{int(mp.timestamp.timestamp())}.png"
+                    self.progress = (
+                        self.progress[0],
+                        self.progress[0] + len(remaining),
+                    )
+                    if len(remaining) < 1:
+                        break
+                target_pos = Position(*remaining.popleft())
+                start_pos, point_start = rotator.last_position, time.monotonic()
                 try:
-                    self.take_image(file_name)
+                    mps = self.ground_station.measure_at_position(
+                        target_pos, frequencies
+                    )
                 except Exception as e:
+                    start_pos = None
                     print(
-                        f"Could not take image due to Exception: {e}\nRetry taking image.."
+                        f"Could not measure at {target_pos} due to Exception: {e}\n"
+                        f"Try resetting rotator motor driver and try again.."
                     )
                     try:
-                        self.take_image(file_name)
+                        self.ground_station.rotator.reset_motor_driver()
+                        mps = self.ground_station.measure_at_position(
+                            target_pos, frequencies
+                        )
+                    except Exception as e:
+                        print(
+                            f"Could not get rotator to work - Exception: {e}\n"
+                            f"Exit motion tracking.."
+                        )
+                        break
+                mp = mps[0]
+                if take_images:
+                    # grab the frame at the position, it is encoded while the rotator moves on
+                    try:
+                        image = webcam.grab_frame()
                     except Exception as e:
                         print(
                             f"Could not take image due to Exception: {e}\nSkip imaging for this position.."
                         )
-            is_pos = mp.measurement_position
-            print(
-                f"Measured PSDs at position AZ{is_pos.azimuth:.2f}, EL{is_pos.elevation:.2f}"
+                    else:
+                        imaging.submit(image, f"tracking_image_{mp.timestamp // 10**9}.png")
+                self.measurement_points.extend(mps)
+                if persistence is not None:
+                    persistence.submit(mps)
+                measured.append(target_pos)
+                self.progress = (
+                    self.progress[0] + 1,
+                    self.progress[0] + 1 + len(remaining),
+                )
+                is_pos = mp.measurement_position
+                settle_event = rotator.last_settle_event
+                settle_time = (
+                    ""
+                    if settle_event is None
+                    else f", settled in {settle_event.settle_time:.2f}s"
+                )
+                print(
+                    f"Measured PSDs at position AZ{is_pos.azimuth:.2f}, EL{is_pos.elevation:.2f}"
+                    f" in {len(mps)} frequency window(s){settle_time}"
+                )
+                if start_pos is not None and settle_event is not None:
+                    # everything after the rotator settled counts as dwell time of the position
+                    timing.record(
+                        start_pos,
+                        target_pos,
+                        settle_event.settle_time,
+                        dwell_time,
+                        time.monotonic() - point_start - settle_event.settle_time,
+                    )
+        finally:
+            self.step_size = step_size
+            self._stop_rx()
+            if imaging is not None:
+                imaging.close()
+            if stop_stream:
+                webcam.stop_stream()
+            if persistence is not None:
+                persistence.close()
+        print(f"Sweep finished after {time.time() - t_start:.0f}s")
+
+    def scan_motion_path(self, telemetry_interval: float = 0.2):
+        """
+        This function scans the rows of the previously computed motion path continuously, instead of stopping at
+        each point. PSD frames captured while slewing are assigned to the closest point of the path.
+        Only the current frequency of each SDR is captured, so frequency windows are not supported.
+        :param telemetry_interval: The longest time between two position readings during the slews, in seconds
+        :return: None
+        """
+        self.set_target_frequency(
+            frequency=None
+            if self.target_frequencies is None
+            else self.target_frequencies[0]
+        )
+        rows = []
+        for az_pos, el_pos in self.motion_path:
+            # the path alternates its direction in every row of equal elevation
+            if len(rows) < 1 or rows[-1][-1].elevation != el_pos:
+                rows.append([])
+            rows[-1].append(Position(az_pos, el_pos))
+        if self.sweep_log is not None:
+            self.sweep_log.start_sweep(self.motion_path)
+        self.progress = (0, len(self.motion_path))
+        try:
+            mps = self.ground_station.scan(rows, telemetry_interval=telemetry_interval)
+        finally:
+            self._stop_rx()
+        self._persist(mps)
+        self.progress = (len(self.motion_path), len(self.motion_path))
+        print(f"Scanned {len(rows)} rows, measured PSDs at {len(mps)} position(s)")
+
+    def budgeted_sweep(
+        self,
+        time_budget: float = None,
+        deadline: float = None,
+        max_step: (float, float) = None,
+        optimize: bool = None,
+        take_images: bool = False,
+    ):
+        """
+        This function sweeps the densest grid around the target position, which fits into the given time window.
+        While the sweep runs, the remaining positions are re-planned with a larger step size or dropped, as soon as
+        the sweep falls behind.
+        :param time_budget: The duration of the sweep in seconds, if no deadline is given
+        :param deadline: Point in time of time.time(), at which the sweep has to be finished
+        :param max_step: The largest step size in degree (AZ, EL), defaults to the HPBW of the antenna
+        :param optimize: If set True, the positions are reordered to minimize the slew time of the rotator.
+            Defaults to the optimize_path setting.
+        :param take_images: If set True, an image will be taken at each position
+        :return: None
+        """
+        if deadline is None:
+            if time_budget is None:
+                raise ValueError("A budgeted sweep needs a time budget or a deadline!")
+            deadline = time.time() + float(time_budget)
+        # the following sweeps start from the configured step size again
+        step_size = self.step_size
+        try:
+            self.plan_path_for_deadline(deadline, max_step=max_step, optimize=optimize)
+            self.track_motion_path(
+                take_images=take_images, deadline=deadline, optimize=optimize
             )
-        self.ground_station.sdr.stop_rx()
+        finally:
+            self.step_size = step_size
 
-    def track_object(self, duration_s: float = 3600, sleep_interval_s: float = 5):
+    def adaptive_sweep(
+        self,
+        target_uncertainty: float = None,
+        refine_points: int = 5,
+        max_passes: int = 5,
+        take_images: bool = False,
+    ) -> SourceFit:
+        """
+        This function locates the noise source close to the target position with as few measurements as possible.
+        A coarse pass samples the scan width in steps of the HPBW. Afterwards, the beam is fitted to all measured
+        levels and only the region around the estimated peak is measured again with half the previous step size,
+        until the position uncertainty is below the target.
+        :param target_uncertainty: The 1 sigma position uncertainty in degree, at which the sweep stops.
+            Defaults to the target_uncertainty setting or a tenth of the HPBW.
+        :param refine_points: The number of positions per axis of each refinement pass
+        :param max_passes: The maximum number of refinement passes
+        :param take_images: If set True, an image will be taken at each position
+        :return: The estimated position of the source, which is also stored as source_fit
+        """
+        hpbw = self.ground_station.antenna.opening_angle
+        if target_uncertainty is None:
+            target_uncertainty = self.target_uncertainty
+        if target_uncertainty is None:
+            target_uncertainty = min(hpbw) / 10
+        target_position, scan_width, step_size = (
+            self.target_position,
+            self.scan_width,
+            self.step_size,
+        )
+        first_point = len(self.measurement_points)
+        step = hpbw
+        try:
+            self.set_step_size(*step)
+            self.compute_path()
+            print(f"Coarse pass with {len(self.motion_path)} positions")
+            self.track_motion_path(take_images=take_images, sweep_kind="adaptive")
+            for refinement in range(max_passes + 1):
+                positions, levels = position_levels(
+                    self.measurement_points[first_point:]
+                )
+                try:
+                    self.source_fit = fit_source(positions, levels, beam_width=hpbw)
+                except Exception as e:
+                    print(f"Could not fit the source due to Exception: {e}")
+                    # continue around the brightest position
+                    self.source_fit = SourceFit(
+                        position=positions[int(levels.argmax())],
+                        uncertainty=Position(float("inf"), float("inf")),
+                        beam_width=hpbw,
+                        peak_level=float(levels.max() - levels.min()),
+                        points=len(positions),
+                    )
+                fit = self.source_fit
+                print(
+                    f"Source at AZ{fit.position.azimuth:.2f}, EL{fit.position.elevation:.2f}"
+                    f" ±{fit.uncertainty.azimuth:.3f}/{fit.uncertainty.elevation:.3f}°"
+                    f" from {fit.points} positions"
+                )
+                if (
+                    max(fit.uncertainty.azimuth, fit.uncertainty.elevation)
+                    < target_uncertainty
+                    or refinement == max_passes
+                ):
+                    break
+                # refine around the estimated peak with half the step size
+                step = (step[0] / 2, step[1] / 2)
+                self.target_position = fit.position
+                self.set_scan_width(step[0] * refine_points, step[1] * refine_points)
+                self.set_step_size(*step)
+                self.compute_path()
+                # skip positions, which were already measured
+                self.motion_path = [
+                    (az, el)
+                    for az, el in self.motion_path
+                    if not any(
+                        abs((az - p.azimuth + 180) % 360 - 180) < step[0] / 4
+                        and abs(el - p.elevation) < step[1] / 4
+                        for p in positions
+                    )
+                ]
+                if len(self.motion_path) < 1:
+                    break
+                print(f"Refinement pass {refinement + 1}")
+                self.track_motion_path(take_images=take_images, sweep_kind="adaptive")
+        finally:
+            self.target_position, self.scan_width, self.step_size = (
+                target_position,
+                scan_width,
+                step_size,
+            )
+        return self.source_fit
+
+    def monitor_position(
+        self, position: Position, duration_s: float = 3600, interval_s: float = 0
+    ):
+        """
+        This function points the antenna at a fixed position and measures repeatedly for the given time frame.
+        :param position: The position, which shall be monitored
+        :param duration_s: The duration of the monitoring in seconds
+        :param interval_s: The time between the start of two measurements in seconds, 0 measures back-to-back
+        :return: None
+        """
+        frequencies = self.target_frequencies
+        self.set_target_frequency(None if frequencies is None else frequencies[0])
+        if self.sweep_log is not None:
+            self.sweep_log.start_sweep([(position.azimuth, position.elevation)])
+        stop_t = time.time() + duration_s
+        self.progress = (0, 0)
+        try:
+            next_t = time.time()
+            # the rotator only moves once, afterwards the SDRs capture at the reached position
+            mps = self.ground_station.measure_at_position(position, frequencies)
+            measurement_position = mps[0].measurement_position
+            while True:
+                self._persist(mps)
+                self.progress = (self.progress[0] + 1, 0)
+                next_t = max(next_t + interval_s, time.time())
+                if next_t >= stop_t:
+                    break
+                time.sleep(max(0.0, next_t - time.time()))
+                mps = self.ground_station.capture_at_position(
+                    position, measurement_position, frequencies
+                )
+        finally:
+            self._stop_rx()
+        print(
+            f"Measured PSDs at position AZ{position.azimuth:.2f}, EL{position.elevation:.2f}"
+            f" {self.progress[0]} times"
+        )
+
+    def track_object(
+        self,
+        duration_s: float = 3600,
+        sleep_interval_s: float = 5,
+        predictive: bool = False,
+        telemetry_interval: float = 0.2,
+        log_file: str = None,
+    ):
         """
         This function tracks the astronomical object for the given time frame.
         :param duration_s: The duration of the object tracking in seconds
         :param sleep_interval_s: The interval in which the position shall be updated, in seconds
+        :param predictive: If set True, positions ahead of the object are commanded, only when the predicted
+            pointing error would exceed the positioning tolerance, instead of moving every sleep interval
+        :param telemetry_interval: Only predictive tracking, the time between two pointing error records in seconds
+        :param log_file: Only predictive tracking, CSV file, to which the pointing errors are written
         :return: None
         """
+        if predictive:
+            return self._track_object_predictive(duration_s, telemetry_interval, log_file)
         stop_t = time.time() + duration_s
         while time.time() < stop_t:
             pos = self.astro_object.get_position()
@@ -254,10 +832,92 @@ class GroundStationController:
             print(f"Wait {sleep_interval_s:.1f}sec until next position update..")
             time.sleep(sleep_interval_s)
 
-    def _limit_axis(self):
+    def _track_object_predictive(
+        self, duration_s: float, telemetry_interval: float, log_file: str = None
+    ):
+        rotator = self.ground_station.rotator
+        tolerance = rotator.get_positioning_tolerance()
+        started_telemetry = rotator.telemetry is None or not rotator.telemetry.running
+        telemetry = rotator.start_telemetry(
+            telemetry_interval if started_telemetry else None
+        )
+        # response lag between a command and the dish reaching its position, measured during the tracking
+        lead = rotator.cost_model.settle_time
+        lags = []
+        self.tracking_errors = []
+        stop_t = time.time() + duration_s
+        try:
+            commanded = self.astro_object.get_position(time.time() + lead)
+            rotator.move_rotator_to_position(commanded)
+            command_time, commands = None, 1
+            reading_time = time.monotonic()
+            while time.time() < stop_t:
+                reading_time, position = telemetry.wait_for_reading(
+                    after=reading_time + 1e-6
+                )
+                now = time.time()
+                # ephemeris time of the reading
+                t_reading = now - (time.monotonic() - reading_time)
+                target = self.astro_object.get_position(t_reading)
+                error = _angular_difference(position, target)
+                self.tracking_errors.append(
+                    {
+                        "timestamp": t_reading,
+                        "object_azimuth": target.azimuth,
+                        "object_elevation": target.elevation,
+                        "rotator_azimuth": position.azimuth,
+                        "rotator_elevation": position.elevation,
+                        "commanded_azimuth": commanded.azimuth,
+                        "commanded_elevation": commanded.elevation,
+                        # on the sky, the azimuth error shrinks with the elevation
+                        "error_azimuth": error.azimuth
+                        * math.cos(math.radians(target.elevation)),
+                        "error_elevation": error.elevation,
+                        "lead": lead,
+                    }
+                )
+                if command_time is not None:
+                    reached = abs(_angular_difference(position, commanded))
+                    if max(reached.azimuth, reached.elevation) < tolerance / 2:
+                        lags.append(reading_time - command_time)
+                        lead = 0.7 * lead + 0.3 * lags[-1]
+                        command_time = None
+                # only command, if the dish would miss the object once a command took effect
+                predicted = abs(
+                    _angular_difference(
+                        commanded, self.astro_object.get_position(now + lead)
+                    )
+                )
+                if max(predicted.azimuth, predicted.elevation) < tolerance:
+                    continue
+                # command the position, which the object passes halfway through the tolerance window
+                rate = abs(self.astro_object.get_rate(now))
+                ahead = lead + tolerance / max(rate.azimuth, rate.elevation, 1e-6)
+                target = self.astro_object.get_position(now + min(ahead, 600.0))
+                commanded = Position(
+                    rotator.cost_model.unwrap(target.azimuth, position.azimuth),
+                    target.elevation,
+                )
+                rotator.set_position(commanded)
+                command_time, commands = time.monotonic(), commands + 1
+        finally:
+            if started_telemetry:
+                rotator.stop_telemetry()
+        df = pd.DataFrame(self.tracking_errors)
+        if log_file is not None:
+            df.to_csv(log_file)
+        if len(df) > 0:
+            error = (df["error_azimuth"] ** 2 + df["error_elevation"] ** 2) ** 0.5
+            print(
+                f"Tracked {self.astro_object.object_name} with {commands} rotator commands, "
+                f"pointing error RMS {(error**2).mean() ** 0.5:.3f}°, max {error.max():.3f}°, "
+                f"response lag {lead:.2f}s"
+            )
+
+    @staticmethod
+    def _limit_axis(points: [(float, float)]) -> [(float, float)]:
         # limit azimuth to 0-360° and elevation to 0-90°
-        points = self.motion_path
-        self.motion_path = []
+        limited = []
         for az, el in points:
             if el > 90:
                 if el > 180:
@@ -266,7 +926,13 @@ class GroundStationController:
                 az = 180.0 - az
             if az < 0:
                 az += 360.0
-            self.motion_path.append((az, el))
+            limited.append((az, el))
+        return limited
+
+    def _save_image(self, image, image_path: str):
+        self.ground_station.webcam.save_image(
+            image, image_path, overlay=True, antenna=self.ground_station.antenna
+        )
 
     def take_image(self, image_path: str, overlay: bool = True):
         """
@@ -279,10 +945,10 @@ class GroundStationController:
             image_path=image_path, overlay=overlay, antenna=self.ground_station.antenna
         )
 
-    def get_measurement_points(self) -> [MeasurementPoint]:
+    def get_measurement_points(self) -> SweepBuffer:
         """
         This function returns the measurement results of the previous noise sweep
-        :return: List of MeasurementPoints
+        :return: Sequence of MeasurementPoints
         """
         return self.measurement_points
 
@@ -291,7 +957,12 @@ class GroundStationController:
         This function returns the measurement results of the previous noise sweep, converted as a pandas DataFrame
         :return: DataFrame with measurement results
         """
-        return pd.DataFrame([x.as_dict() for x in self.get_measurement_points()])
+        return self.get_measurement_points().as_dataframe()
+
+
+def _angular_difference(a: Position, b: Position) -> Position:
+    # difference a - b, azimuth on the shortest way across the 0°/360° border
+    return Position((a.azimuth - b.azimuth + 180) % 360 - 180, a.elevation - b.elevation)
 
 
 if __name__ == "__main__":
@@ -299,6 +970,6 @@ if __name__ == "__main__":
     mission_control = GroundStationController(config_file=config_file)
     mission_control.compute_path()
     mission_control.track_motion_path()
-    df = pd.DataFrame([x.as_dict() for x in mission_control.get_measurement_points()])
+    df = mission_control.get_measurement_points_as_dataframe()
     df.to_csv(f"sun_sweep_{int(time.time())}.csv")
     a = 1
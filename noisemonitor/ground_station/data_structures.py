@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+import numpy as np
 import pandas as pd
 
 
@@ -33,27 +34,56 @@ class PSDLevels:
     PSD measurement data
     """
 
-    timestamp: pd.Timestamp
+    timestamp: int  # end of the integration, in nanoseconds since epoch
     frequency_start: float
     frequency_stop: float
     frequency_step: float
     samples: int
-    psd_levels: [float]
+    psd_levels: np.ndarray  # float32 PSD levels in dB
+    frequency: float = None  # center frequency the SDR was tuned to
+    capture_start: float = None  # start of the integration, in time.monotonic()
+    capture_stop: float = None  # end of the integration, in time.monotonic()
 
     def as_dict(self):
         return {
-            "timestamp": self.timestamp,
+            "timestamp": pd.Timestamp.fromtimestamp(self.timestamp / 1e9),
             "frequency_start": self.frequency_start,
             "frequency_stop": self.frequency_stop,
             "frequency_step": self.frequency_step,
             "samples": self.samples,
-            **{f"psd_{i}": self.psd_levels[i] for i in range(len(self.psd_levels))},
-            "psd_min": min(self.psd_levels),
-            "psd_max": max(self.psd_levels),
-            "psd_mean": sum(self.psd_levels) / len(self.psd_levels),
+            **{f"psd_{i}": x for i, x in enumerate(self.psd_levels.tolist())},
+            "psd_min": float(self.psd_levels.min()),
+            "psd_max": float(self.psd_levels.max()),
+            "psd_mean": float(self.psd_levels.mean(dtype=np.float64)),
         }
 
 
+@dataclass
+class SettleEvent:
+    """
+    The moment the rotator settled at a position, in time.monotonic()
+    """
+
+    timestamp: float
+    target_position: Position
+    position: Position
+    settle_time: float = None  # time from the move command until the convergence, in seconds
+    readings: int = None  # number of position readings during the move
+
+
+@dataclass
+class SourceFit:
+    """
+    The position of a noise source, estimated by fitting the antenna beam to the measured levels
+    """
+
+    position: Position
+    uncertainty: Position  # 1 sigma std. error of the position on the sky, in degree
+    beam_width: (float, float)  # fitted HPBW in azimuth (on the sky) and elevation, in degree
+    peak_level: float  # level of the source above the background, in dB
+    points: int  # number of measured positions used by the fit
+
+
 @dataclass
 class MeasurementPoint:
     """
@@ -65,17 +95,20 @@ class MeasurementPoint:
     center_frequency: float
     psd_bandwidth: float
     psd_levels: PSDLevels
-    timestamp: pd.Timestamp
+    timestamp: int  # in nanoseconds since epoch
+    sdr: str
 
     def __init__(
         self,
         target_position: Position,
         measurement_position: Position,
         psd_levels: PSDLevels,
+        sdr: str = None,
     ):
         self.target_position = target_position
         self.measurement_position = measurement_position
         self.psd_levels = psd_levels
+        self.sdr = sdr
         self.timestamp = psd_levels.timestamp
         self.psd_bandwidth = psd_levels.frequency_step
         self.center_frequency = (
@@ -88,6 +121,7 @@ class MeasurementPoint:
             "target_elevation": self.target_position.elevation,
             "measurement_azimuth": self.measurement_position.azimuth,
             "measurement_elevation": self.measurement_position.elevation,
+            "sdr": self.sdr,
             "center_frequency": self.center_frequency,
             "psd_bandwidth": self.psd_bandwidth,
             **self.psd_levels.as_dict(),
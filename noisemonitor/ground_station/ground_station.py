@@ -1,10 +1,17 @@
 from __future__ import annotations
 
-from .data_structures import Position, MeasurementPoint
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .data_structures import Position, MeasurementPoint, PSDLevels
 from .sdr import SDR
 from .rotator import Rotator
 from .antenna import GenericAntenna, ParabolicAntenna
 from .webcam import Webcam
+from .astronomical_object import AstroObject
+from .scan import PositionTrack, bin_frames
+from .path_planner import SlewCostModel
 from .config_parser import load_config_from_file
 
 
@@ -13,6 +20,7 @@ class GroundStation:
     name: str
     antenna: GenericAntenna = None
     sdr: SDR = None
+    sdrs: [SDR] = None
     rotator: Rotator = None
     webcam: Webcam = None
     config: dict = None
@@ -37,6 +45,8 @@ class GroundStation:
         """
         self.location = "" if location is None else str(location)
         self.name = "" if name is None else str(name)
+        self.sdrs = []
+        self._capture_pool = None
         if config_file is not None:
             self.load_config(config_file, no_sdr=no_sdr, inactive=inactive)
         if config_dict is not None:
@@ -96,16 +106,53 @@ class GroundStation:
                 rotator_port=rot.get("netrotctl_port"),
                 rotator_tolerance=rot.get("positioning_tolerance"),
             )
+            self.rotator.set_convergence(
+                min_poll_interval=rot.get("min_poll_interval"),
+                max_poll_interval=rot.get("max_poll_interval"),
+                stable_rate=rot.get("stable_rate"),
+                stable_readings=rot.get("stable_readings"),
+                stall_timeout=rot.get("stall_timeout"),
+            )
+            self.rotator.cost_model = SlewCostModel(
+                rate_azimuth=rot.get("slew_rate_azimuth"),
+                rate_elevation=rot.get("slew_rate_elevation"),
+                acceleration_azimuth=rot.get("acceleration_azimuth"),
+                acceleration_elevation=rot.get("acceleration_elevation"),
+                azimuth_limits=rot.get("azimuth_limits"),
+                settle_time=rot.get("settle_time"),
+            )
+            if rot.get("telemetry_interval") is not None:
+                self.rotator.start_telemetry(interval=rot.get("telemetry_interval"))
 
         if not no_sdr and not inactive:
-            sdr = self.config.get("groundstation").get("sdr")
-            print("Setup SDR..")
-            self.setup_sdr(
-                sampling_rate=sdr.get("sampling_rate"),
-                device_driver=sdr.get("type"),
-                lna_gain=sdr.get("lna_gain"),
-                psd_bins=sdr.get("psd_bins"),
-            )
+            sdr_configs = self.config.get("groundstation").get("sdr")
+            # one SDR as dict or several SDRs as list of dicts
+            if isinstance(sdr_configs, dict):
+                sdr_configs = [sdr_configs]
+            for sdr in sdr_configs:
+                print(f"Setup SDR {sdr.get('name') or sdr.get('type') or ''}..")
+                frequencies = sdr.get("frequencies")
+                if frequencies is None and sdr.get("frequency") is not None:
+                    frequencies = [sdr.get("frequency")]
+                self.setup_sdr(
+                    sampling_rate=sdr.get("sampling_rate", sdr.get("sample_rate")),
+                    device_driver=sdr.get("type"),
+                    lna_gain=sdr.get("lna_gain"),
+                    psd_bins=sdr.get("psd_bins"),
+                    backend=sdr.get("backend"),
+                    tune_delay=sdr.get("tune_delay"),
+                    device_args=sdr.get("device"),
+                    name=sdr.get("name"),
+                    frequencies=frequencies,
+                    frame_time=sdr.get("frame_time"),
+                    min_integration_time=sdr.get("min_integration_time"),
+                    max_integration_time=sdr.get("max_integration_time"),
+                    target_std_error=sdr.get("target_std_error"),
+                    target_snr=sdr.get("target_snr"),
+                    replay_file=sdr.get("replay_file"),
+                    replay_source=sdr.get("replay_source"),
+                    replay_speed=sdr.get("replay_speed"),
+                )
 
         cam = self.config.get("groundstation").get("webcam")
         if cam.get("rtsp_url") is not None:
@@ -123,23 +170,99 @@ class GroundStation:
         device_driver: str = None,
         lna_gain: float = None,
         psd_bins: int = None,
+        backend: str = None,
+        tune_delay: float = None,
+        device_args: str = None,
+        name: str = None,
+        frequencies: [float] = None,
+        frame_time: float = None,
+        min_integration_time: float = None,
+        max_integration_time: float = None,
+        target_std_error: float = None,
+        target_snr: float = None,
+        replay_file: str = None,
+        replay_source=None,
+        replay_speed: float = None,
     ):
         """
-        This function initializes the SDR
+        This function initializes an SDR and adds it to the SDRs of the ground station.
+        The first SDR is the primary one, which is also available as sdr attribute.
         :param sampling_rate: The sample rate in which the SDR shall be configured, given in sample per second
         :param device_driver: The device driver of the SDR used for SoapySDR, e.g. "uhd", "lime", "rtlsdr"
         :param lna_gain: The gain in dB the LNA of the SDR shall be set to
         :param psd_bins: In how many frequency bins shall the PSD data be collected?
+        :param backend: How the PSD data is computed, "numpy" (in process) or "soapy_power" (subprocess)
+        :param tune_delay: The time in seconds, which the SDR needs to settle after changing the frequency
+        :param device_args: Additional SoapySDR device arguments to select one of several devices, e.g. "serial=1234"
+        :param name: The name of the SDR within the ground station, defaults to the device driver
+        :param frequencies: The center frequencies of the frequency windows this SDR captures in a sweep
+        :param frame_time: The integration time of each PSD frame in seconds
+        :param min_integration_time: The minimum time in seconds a measurement integrates PSD frames
+        :param max_integration_time: The maximum time in seconds a measurement integrates PSD frames
+        :param target_std_error: A measurement stops integrating, once the standard error of each bin is below
+            this value in dB
+        :param target_snr: A measurement stops integrating, once the band power exceeds its standard error by
+            this value in dB
+        :param replay_file: Only "replay" SDRs, path of a recorded sweep file, whose PSD levels are replayed
+        :param replay_source: Only "replay" SDRs, position [az, el] or name of the astronomical object modelled as
+            noise source, if no file is given
+        :param replay_speed: Only "replay" SDRs, replay speed relative to real time, 0 replays as fast as possible
         :return: self
         """
-        self.sdr = SDR(
+        if isinstance(replay_source, str):
+            astro_object = AstroObject(replay_source, self.location)
+            replay_source = lambda: astro_object.get_position(time.time())  # noqa: E731
+        sdr = SDR(
             sampling_rate=sampling_rate,
             device_driver=device_driver,
             lna_gain=lna_gain,
             psd_bins=psd_bins,
+            backend=backend,
+            tune_delay=tune_delay,
+            device_args=device_args,
+            name=name,
+            frequencies=frequencies,
+            frame_time=frame_time,
+            min_integration_time=min_integration_time,
+            max_integration_time=max_integration_time,
+            target_std_error=target_std_error,
+            target_snr=target_snr,
+            replay_file=replay_file,
+            replay_source=replay_source,
+            replay_speed=replay_speed,
+            hpbw=None if self.antenna is None else self.antenna.opening_angle,
+            pointing=self._pointing,
         )
+        if any(s.name == sdr.name for s in self.sdrs):
+            raise ValueError(
+                f"There is already an SDR named {sdr.name}, please name the SDRs!"
+            )
+        self.sdrs.append(sdr)
+        self.sdr = self.sdrs[0]
         return self
 
+    def start_rx(self, frequency: float):
+        """
+        This function starts the receiving of all SDRs.
+        SDRs with own frequency windows start at their first window, all others at the given frequency.
+        :param frequency: The center frequency in Hertz
+        :return: None
+        """
+        for sdr in self.sdrs:
+            sdr.start_rx(frequency if sdr.frequencies is None else sdr.frequencies[0])
+
+    def stop_rx(self):
+        """
+        This function stops the receiving of all SDRs.
+        :return: None
+        """
+        for sdr in self.sdrs:
+            sdr.stop_rx()
+
+    def _pointing(self) -> Position:
+        # last known antenna position, without querying the rotator
+        return None if self.rotator is None else self.rotator.last_position
+
     def setup_antenna(
         self,
         antenna_type: str,
@@ -222,18 +345,179 @@ class GroundStation:
             )
         return self
 
-    def measure_at_position(self, position: Position) -> MeasurementPoint:
+    def measure_at_position(
+        self, position: Position, frequencies: [float] = None
+    ) -> [MeasurementPoint]:
         """
-        This function collects a PSD measurement at the provided position.
+        This function collects PSD measurements of all SDRs at the provided position.
+        All SDRs capture concurrently, so additional SDRs do not add dwell time.
         :param position: Position, where the measurement should be taken
-        :return: MeasurementPoint containing the results
+        :param frequencies: Center frequencies of all frequency windows, which shall be captured at the position by
+            SDRs without own frequency windows. If None, only the frequency the SDR is currently tuned to is captured.
+        :return: List of MeasurementPoints containing the results, one per SDR and frequency window
         """
-        mp = MeasurementPoint(
-            target_position=position,
-            measurement_position=self.rotator.move_rotator_to_position(position),
-            psd_levels=self.sdr.get_psd_levels(),
+        measurement_position = self.rotator.move_rotator_to_position(position)
+        # only accept PSD frames integrated after the dish settled
+        settle_event = self.rotator.last_settle_event
+        after = None if settle_event is None else settle_event.timestamp
+        return self.capture_at_position(
+            position, measurement_position, frequencies, after
         )
-        return mp
+
+    def capture_at_position(
+        self,
+        target_position: Position,
+        measurement_position: Position,
+        frequencies: [float] = None,
+        after: float = None,
+    ) -> [MeasurementPoint]:
+        """
+        This function collects PSD measurements of all SDRs, without moving the rotator.
+        :param target_position: The position the rotator was commanded to
+        :param measurement_position: The position the rotator reached
+        :param frequencies: Center frequencies of all frequency windows, which shall be captured by SDRs without
+            own frequency windows. If None, only the frequency the SDR is currently tuned to is captured.
+        :param after: Only PSD frames integrated after this point in time (time.monotonic()) are accepted
+        :return: List of MeasurementPoints containing the results, one per SDR and frequency window
+        """
+        if len(self.sdrs) == 1:
+            return self._capture(
+                self.sdr, target_position, measurement_position, frequencies, after
+            )
+        if self._capture_pool is None:
+            self._capture_pool = ThreadPoolExecutor(
+                max_workers=len(self.sdrs), thread_name_prefix="capture"
+            )
+        futures = [
+            self._capture_pool.submit(
+                self._capture,
+                sdr,
+                target_position,
+                measurement_position,
+                frequencies,
+                after,
+            )
+            for sdr in self.sdrs
+        ]
+        return [mp for future in futures for mp in future.result()]
+
+    @staticmethod
+    def capture_frequencies(sdr: SDR, frequencies: [float] = None) -> [float]:
+        """
+        This function returns the center frequencies an SDR captures at one position, in the order of capturing.
+        :param sdr: The SDR
+        :param frequencies: Center frequencies of all frequency windows, used if the SDR has no own frequency windows
+        :return: The center frequencies in Hertz
+        """
+        if sdr.frequencies is not None:
+            frequencies = sdr.frequencies
+        if frequencies is None:
+            frequencies = [sdr.frequency]
+        # start with the current frequency, which saves one retune per position
+        return sorted(frequencies, key=lambda f: f != sdr.frequency)
+
+    @staticmethod
+    def _capture(
+        sdr: SDR,
+        target_position: Position,
+        measurement_position: Position,
+        frequencies: [float] = None,
+        after: float = None,
+    ) -> [MeasurementPoint]:
+        measurement_points = []
+        for frequency in GroundStation.capture_frequencies(sdr, frequencies):
+            if frequency != sdr.frequency:
+                sdr.change_frequency(frequency)
+            measurement_points.append(
+                MeasurementPoint(
+                    target_position=target_position,
+                    measurement_position=measurement_position,
+                    psd_levels=sdr.capture_psd_levels(after=after),
+                    sdr=sdr.name,
+                )
+            )
+        return measurement_points
+
+    def predict_dwell_time(self, frequencies: [float] = None) -> float:
+        """
+        This function predicts the time all SDRs need to measure at one position.
+        :param frequencies: Center frequencies of all frequency windows, which shall be captured at each position by
+            SDRs without own frequency windows
+        :return: The predicted time in seconds
+        """
+        dwell_times = [
+            sdr.predict_capture_time(
+                len(sdr.frequencies or frequencies or [sdr.frequency])
+            )
+            for sdr in self.sdrs
+        ]
+        # the SDRs capture concurrently
+        return max(dwell_times, default=0.0)
+
+    def scan(
+        self, rows: [[Position]], telemetry_interval: float = 0.2
+    ) -> [MeasurementPoint]:
+        """
+        This function scans the given rows continuously. The rotator slews along each row, while all SDRs keep
+        capturing PSD frames at their current frequency. Each frame is located by interpolating the position readings
+        of the rotator and is assigned to the closest point of its row.
+        :param rows: Rows of grid points, each row is scanned from its first to its last point
+        :param telemetry_interval: The longest time between two position readings during the slews, in seconds
+        :return: List of MeasurementPoints, one per SDR and grid point, which was hit by at least one frame
+        """
+        track = PositionTrack()
+        stop_event = threading.Event()
+        frames = {sdr.name: [] for sdr in self.sdrs}
+        collectors = [
+            threading.Thread(
+                target=self._collect_frames,
+                args=(sdr, time.monotonic(), stop_event, frames[sdr.name]),
+                name=f"{sdr.name}-scan",
+                daemon=True,
+            )
+            for sdr in self.sdrs
+        ]
+        for collector in collectors:
+            collector.start()
+        scanned_rows = []
+        try:
+            for row in rows:
+                self.rotator.move_rotator_to_position(
+                    row[0], on_reading=track.append
+                )
+                # the row starts, once the dish is steady at its first point
+                settle_event = self.rotator.last_settle_event
+                row_start = (
+                    time.monotonic() if settle_event is None else settle_event.timestamp
+                )
+                self.rotator.move_rotator_to_position(
+                    row[-1],
+                    on_reading=track.append,
+                    max_poll_interval=telemetry_interval,
+                )
+                scanned_rows.append((row_start, time.monotonic(), row))
+        finally:
+            stop_event.set()
+            for collector in collectors:
+                collector.join()
+        return [
+            mp
+            for sdr in self.sdrs
+            for mp in bin_frames(frames[sdr.name], track, scanned_rows, sdr=sdr.name)
+        ]
+
+    @staticmethod
+    def _collect_frames(
+        sdr: SDR, after: float, stop_event: threading.Event, frames: [PSDLevels]
+    ):
+        try:
+            for frame in sdr.iterate_psd_levels(after=after, timeout=10):
+                frames.append(frame)
+                if stop_event.is_set():
+                    return
+        except Exception as e:
+            if not stop_event.is_set():
+                print(f"SDR {sdr.name} stopped capturing during the scan: {e}")
 
 
 if __name__ == "__main__":
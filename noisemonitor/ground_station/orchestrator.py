@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import os
+import time
+import threading
+from dataclasses import dataclass
+
+from .controller import GroundStationController
+
+
+@dataclass
+class StationJob:
+    """
+    The job of one ground station, which the orchestrator runs
+    """
+
+    config_file: str
+    mode: str = "sweep"  # "sweep", "continuous", "adaptive" or "track"
+    name: str = None  # defaults to the name of the config file
+    take_images: bool = False
+    optimize_path: bool = None  # defaults to the optimize_path setting of the config
+    duration: float = 3600.0  # in seconds, only "track" jobs
+
+
+@dataclass
+class StationStatus:
+    """
+    The progress of the job of one ground station
+    """
+
+    name: str
+    state: str = "pending"  # "pending", "setup", "running", "finished" or "failed"
+    positions_done: int = 0
+    positions_total: int = 0
+    measurement_points: int = 0
+    started: float = None  # in time.time()
+    finished: float = None  # in time.time()
+    predicted_duration: float = None  # in seconds
+    data_file: str = None
+    error: str = None
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (time.time() if self.finished is None else self.finished) - self.started
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "state": self.state,
+            "positions_done": self.positions_done,
+            "positions_total": self.positions_total,
+            "measurement_points": self.measurement_points,
+            "elapsed": self.elapsed,
+            "predicted_duration": self.predicted_duration,
+            "data_file": self.data_file,
+            "error": self.error,
+        }
+
+
+class Orchestrator:
+    """
+    Runs the jobs of several ground stations concurrently from one process, one thread per station.
+    Every station streams its measurements into its own sweep log and writes its own sweep data file.
+    """
+
+    jobs: [StationJob]
+    output_dir: str
+
+    def __init__(self, jobs: [StationJob], output_dir: str = "."):
+        """
+        This function initializes the orchestrator.
+        :param jobs: The jobs of the ground stations, one per station
+        :param output_dir: The directory of the sweep logs and sweep data files of all stations
+        """
+        self.jobs = list(jobs)
+        self.output_dir = str(output_dir)
+        for job in self.jobs:
+            if job.name is None:
+                job.name = os.path.splitext(os.path.basename(job.config_file))[0]
+        names = [job.name for job in self.jobs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"The names of the stations are not unique: {names}")
+        self.status = {job.name: StationStatus(name=job.name) for job in self.jobs}
+        self.controllers = {}
+        # SDR detection and device setup are not safe to run concurrently
+        self._setup_lock = threading.Lock()
+
+    def run(self, progress_interval: float = 30.0) -> {str: StationStatus}:
+        """
+        This function runs the jobs of all stations and reports their progress until all of them finished.
+        :param progress_interval: The time between two progress reports in seconds
+        :return: The status of each station
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        t_start = time.time()
+        threads = [
+            threading.Thread(target=self._run_job, args=(job,), name=job.name, daemon=True)
+            for job in self.jobs
+        ]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=progress_interval / len(threads))
+            self.print_progress()
+        print(f"All stations finished after {time.time() - t_start:.0f}s")
+        self.print_progress()
+        return self.status
+
+    def print_progress(self):
+        """
+        This function prints the progress of all stations.
+        :return: None
+        """
+        for status in self.status.values():
+            self._update_status(status)
+            predicted = (
+                ""
+                if status.predicted_duration is None
+                else f" of {status.predicted_duration:.0f}s predicted"
+            )
+            error = "" if status.error is None else f" - {status.error}"
+            print(
+                f"[{status.name}] {status.state}: "
+                f"{status.positions_done}/{status.positions_total} positions, "
+                f"{status.measurement_points} measurement points, "
+                f"{status.elapsed:.0f}s{predicted}{error}"
+            )
+
+    def _update_status(self, status: StationStatus):
+        controller = self.controllers.get(status.name)
+        if controller is None:
+            return
+        status.positions_done, status.positions_total = controller.progress
+        status.measurement_points = len(controller.measurement_points)
+
+    def _run_job(self, job: StationJob):
+        status = self.status[job.name]
+        status.started = time.time()
+        try:
+            status.state = "setup"
+            with self._setup_lock:
+                controller = GroundStationController(config_file=job.config_file)
+            self.controllers[job.name] = controller
+            status.state = "running"
+            if job.mode == "track":
+                status.data_file = os.path.join(
+                    self.output_dir,
+                    f"{job.name}_tracking_errors_{int(time.time())}.csv",
+                )
+                controller.track_object(
+                    duration_s=job.duration, predictive=True, log_file=status.data_file
+                )
+            else:
+                self._sweep(job, controller, status)
+            status.state = "finished"
+        except Exception as e:
+            status.state = "failed"
+            status.error = str(e)
+            print(f"[{job.name}] Job failed due to Exception: {e}")
+        finally:
+            status.finished = time.time()
+            controller = self.controllers.get(job.name)
+            if controller is not None:
+                controller.close_sweep_log()
+                self._update_status(status)
+
+    def _sweep(self, job: StationJob, controller: GroundStationController, status):
+        t_start = int(time.time())
+        prefix = os.path.join(self.output_dir, job.name)
+        controller.open_sweep_log(f"{prefix}_sweep_log_{t_start}.jsonl")
+        controller.set_target_position_to_astro_object()
+        if job.mode == "adaptive":
+            controller.adaptive_sweep(take_images=job.take_images)
+        elif job.mode in ("sweep", "continuous"):
+            # continuous scans need the rows of the path in order
+            controller.compute_path(
+                optimize=False if job.mode == "continuous" else job.optimize_path
+            )
+            status.predicted_duration = controller.predict_sweep_duration()
+            if job.mode == "continuous":
+                controller.scan_motion_path()
+            else:
+                controller.track_motion_path(take_images=job.take_images)
+        else:
+            raise ValueError(f"Unknown job mode {job.mode}!")
+        status.data_file = f"{prefix}_sweep_data_{t_start}-{int(time.time())}.csv"
+        controller.get_measurement_points_as_dataframe().to_csv(status.data_file)
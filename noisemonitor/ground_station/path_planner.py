@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+import math
+import numpy as np
+from collections import deque
+
+from .data_structures import Position
+
+
+class SlewCostModel:
+    """
+    Predicts the time the rotator needs to move between two positions. Both axes move at the same time, each with
+    its own slew rate and acceleration. The azimuth axis can only move within its cable wrap limits.
+    """
+
+    rate_azimuth: float = 2.0  # in degree per second
+    rate_elevation: float = 2.0  # in degree per second
+    acceleration_azimuth: float = None  # in degree per second², None = reaches its slew rate instantly
+    acceleration_elevation: float = None  # in degree per second², None = reaches its slew rate instantly
+    azimuth_limits: (float, float) = (0.0, 360.0)  # cable wrap limits in degree
+    settle_time: float = 1.0  # in seconds, until a move converged after reaching the target
+
+    def __init__(
+        self,
+        rate_azimuth: float = None,
+        rate_elevation: float = None,
+        acceleration_azimuth: float = None,
+        acceleration_elevation: float = None,
+        azimuth_limits: (float, float) = None,
+        settle_time: float = None,
+    ):
+        """
+        This function initializes the cost model. Omitted values keep their defaults.
+        :param rate_azimuth: The slew rate of the azimuth axis in degree per second
+        :param rate_elevation: The slew rate of the elevation axis in degree per second
+        :param acceleration_azimuth: The acceleration of the azimuth axis in degree per second²
+        :param acceleration_elevation: The acceleration of the elevation axis in degree per second²
+        :param azimuth_limits: The range of azimuth angles the rotator can move within, e.g. (-180, 540)
+        :param settle_time: The time in seconds a move needs to converge after reaching the target
+        """
+        if rate_azimuth is not None:
+            self.rate_azimuth = float(rate_azimuth)
+        if rate_elevation is not None:
+            self.rate_elevation = float(rate_elevation)
+        if acceleration_azimuth is not None:
+            self.acceleration_azimuth = float(acceleration_azimuth)
+        if acceleration_elevation is not None:
+            self.acceleration_elevation = float(acceleration_elevation)
+        if azimuth_limits is not None:
+            self.azimuth_limits = (float(azimuth_limits[0]), float(azimuth_limits[1]))
+        if settle_time is not None:
+            self.settle_time = float(settle_time)
+        if self.azimuth_limits[1] - self.azimuth_limits[0] < 360:
+            raise ValueError("The azimuth limits have to cover at least 360°!")
+
+    @staticmethod
+    def axis_time(distance, rate: float, acceleration: float = None):
+        """
+        This function computes the travel time of one axis with a trapezoidal velocity profile.
+        :param distance: The distance(s) to travel in degree, scalar or array
+        :param rate: The slew rate in degree per second
+        :param acceleration: The acceleration in degree per second², None for an instant acceleration
+        :return: The travel time(s) in seconds
+        """
+        distance = np.abs(distance)
+        if acceleration is None:
+            return distance / rate
+        # short moves never reach the slew rate
+        return np.where(
+            distance < rate**2 / acceleration,
+            2 * np.sqrt(distance / acceleration),
+            distance / rate + rate / acceleration,
+        )
+
+    def unwrap(self, azimuth: float, reference: float) -> float:
+        """
+        This function selects the azimuth within the cable wrap limits, which is closest to the reference.
+        :param azimuth: The azimuth angle in degree
+        :param reference: The azimuth the rotator comes from in degree
+        :return: The equivalent azimuth angle within the limits
+        """
+        low, high = self.azimuth_limits
+        turns = range(
+            math.floor((low - azimuth) / 360), math.ceil((high - azimuth) / 360) + 1
+        )
+        candidates = [
+            azimuth + 360 * k for k in turns if low <= azimuth + 360 * k <= high
+        ]
+        return min(candidates, key=lambda a: abs(a - reference))
+
+    def move_time(self, start: Position, stop: Position) -> float:
+        """
+        This function predicts the time of a move, including the settle time.
+        :param start: The position the move starts at
+        :param stop: The target position of the move
+        :return: The predicted time in seconds
+        """
+        return float(self.move_times([start, stop])[0])
+
+    def times_between(
+        self, start_azimuth, start_elevation, stop_azimuth, stop_elevation
+    ) -> np.ndarray:
+        """
+        This function predicts the times of moves, including the settle time. The arrays are broadcast, e.g. one
+        start position against the stop positions of all candidates.
+        :param start_azimuth: The azimuth angle(s) the moves start at, in degree
+        :param start_elevation: The elevation angle(s) the moves start at, in degree
+        :param stop_azimuth: The azimuth angle(s) of the targets of the moves, in degree
+        :param stop_elevation: The elevation angle(s) of the targets of the moves, in degree
+        :return: The predicted times in seconds
+        """
+        az_time = self.axis_time(
+            np.subtract(stop_azimuth, start_azimuth),
+            self.rate_azimuth,
+            self.acceleration_azimuth,
+        )
+        el_time = self.axis_time(
+            np.subtract(stop_elevation, start_elevation),
+            self.rate_elevation,
+            self.acceleration_elevation,
+        )
+        return np.maximum(az_time, el_time) + self.settle_time
+
+    def time_matrix(self, positions: [Position]) -> np.ndarray:
+        """
+        This function predicts the times of the moves between all given positions, including the settle time.
+        Its memory grows quadratically with the number of positions, the path planner only uses rows of it.
+        :param positions: The positions within the cable wrap limits
+        :return: Matrix of the predicted times in seconds, from row to column
+        """
+        azimuths, elevations = _angles(positions)
+        return self.times_between(
+            azimuths[:, None], elevations[:, None], azimuths[None, :], elevations[None, :]
+        )
+
+    def move_times(self, positions: [Position]) -> np.ndarray:
+        """
+        This function predicts the times of the moves between consecutive positions, including the settle time.
+        Unlike time_matrix, its memory grows linearly with the number of positions.
+        :param positions: The positions in the order they are visited
+        :return: The predicted time of each move in seconds, one less than the number of positions
+        """
+        azimuths, elevations = _angles(positions)
+        return self.times_between(
+            azimuths[:-1], elevations[:-1], azimuths[1:], elevations[1:]
+        )
+
+
+def _angles(positions: [Position]) -> (np.ndarray, np.ndarray):
+    return (
+        np.asarray([p.azimuth for p in positions], dtype=np.float64),
+        np.asarray([p.elevation for p in positions], dtype=np.float64),
+    )
+
+
+class SweepTiming:
+    """
+    Corrects the predicted duration of sweeps with the move and dwell times measured during previous positions.
+    The predicted times of the cost model and the SDRs are scaled by the ratio of the measured to the predicted times.
+    """
+
+    cost_model: SlewCostModel
+
+    def __init__(self, cost_model: SlewCostModel, history: int = 100):
+        """
+        This function initializes the sweep timing.
+        :param cost_model: The cost model of the rotator
+        :param history: The number of recent positions, whose times are considered
+        """
+        self.cost_model = cost_model
+        self._moves = deque(maxlen=history)  # (predicted, measured) in seconds
+        self._dwells = deque(maxlen=history)  # (predicted, measured) in seconds
+
+    def record(
+        self,
+        start: Position,
+        stop: Position,
+        move_time: float,
+        predicted_dwell_time: float,
+        dwell_time: float,
+    ):
+        """
+        This function adds the measured times of one position.
+        :param start: The position the move started at
+        :param stop: The target position of the move
+        :param move_time: The measured time from the move command until the rotator settled, in seconds
+        :param predicted_dwell_time: The predicted time of the measurement at the position, in seconds
+        :param dwell_time: The measured time of the measurement at the position, in seconds
+        :return: None
+        """
+        predicted_move = float(self.cost_model.move_times([start, stop])[0])
+        self._moves.append((predicted_move, float(move_time)))
+        self._dwells.append((float(predicted_dwell_time), float(dwell_time)))
+
+    @property
+    def move_factor(self) -> float:
+        return self._factor(self._moves)
+
+    @property
+    def dwell_factor(self) -> float:
+        return self._factor(self._dwells)
+
+    @staticmethod
+    def _factor(times: deque) -> float:
+        predicted = sum(p for p, _ in times)
+        if predicted <= 0:
+            return 1.0
+        return sum(m for _, m in times) / predicted
+
+    def predict(
+        self, path: [Position], start: Position = None, dwell_time: float = 0.0
+    ) -> float:
+        """
+        This function predicts the duration of a sweep along the path.
+        :param path: The positions of the path in the order they are visited
+        :param start: The position of the rotator before the sweep, defaults to the first position of the path
+        :param dwell_time: The predicted time in seconds spent measuring at each position
+        :return: The predicted duration in seconds
+        """
+        if len(path) < 1:
+            return 0.0
+        positions = list(path) if start is None else [start] + list(path)
+        move_time = float(self.cost_model.move_times(positions).sum())
+        return (
+            move_time * self.move_factor
+            + dwell_time * self.dwell_factor * len(path)
+        )
+
+
+def predict_duration(
+    path: [Position],
+    cost_model: SlewCostModel,
+    start: Position = None,
+    dwell_time: float = 0.0,
+) -> float:
+    """
+    This function predicts the duration of a sweep along the path.
+    :param path: The positions of the path in the order they are visited
+    :param cost_model: The cost model of the rotator
+    :param start: The position of the rotator before the sweep, defaults to the first position of the path
+    :param dwell_time: The time in seconds spent measuring at each position
+    :return: The predicted duration in seconds
+    """
+    if len(path) < 1:
+        return 0.0
+    positions = list(path) if start is None else [start] + list(path)
+    return float(cost_model.move_times(positions).sum() + dwell_time * len(path))
+
+
+def plan_path(
+    path: [Position],
+    cost_model: SlewCostModel,
+    start: Position = None,
+    max_passes: int = 50,
+) -> [Position]:
+    """
+    This function orders the positions of a path to minimize the total travel time of the rotator.
+    Azimuth angles are unwrapped within the cable wrap limits. The nearest neighbour tour improved by 2-opt is
+    compared to the given order and to serpentines along both axes, the fastest one is returned.
+    :param path: The positions, which shall be visited
+    :param cost_model: The cost model of the rotator
+    :param start: The position of the rotator before the sweep
+    :param max_passes: The maximum number of 2-opt improvement passes
+    :return: The positions in the order they shall be visited
+    """
+    path = list(path)
+    if len(path) < 3:
+        return path
+    candidates = [
+        path,
+        _serpentine(path, by_azimuth=False),
+        _serpentine(path, by_azimuth=True),
+    ]
+    candidates = [_unwrap_path(c, cost_model, start) for c in candidates]
+    tour = _nearest_neighbour(candidates[0], cost_model, start)
+    candidates.append(_two_opt(tour, cost_model, start, max_passes))
+    return min(candidates, key=lambda c: predict_duration(c, cost_model, start))
+
+
+def _unwrap_path(
+    path: [Position], cost_model: SlewCostModel, start: Position = None
+) -> [Position]:
+    # keep the azimuth within the cable wrap, as close as possible to the previous position
+    reference = path[0].azimuth if start is None else start.azimuth
+    unwrapped = []
+    for p in path:
+        reference = cost_model.unwrap(p.azimuth, reference)
+        unwrapped.append(Position(reference, p.elevation))
+    return unwrapped
+
+
+def _serpentine(path: [Position], by_azimuth: bool) -> [Position]:
+    # rows of equal elevation (or columns of equal azimuth), alternating their direction
+    def key(p: Position) -> (float, float):
+        return (p.azimuth, p.elevation) if by_azimuth else (p.elevation, p.azimuth)
+
+    lines = {}
+    for p in sorted(path, key=key):
+        lines.setdefault(round(key(p)[0], 6), []).append(p)
+    return [
+        p
+        for i, line in enumerate(lines.values())
+        for p in (line if i % 2 == 0 else line[::-1])
+    ]
+
+
+def _nearest_neighbour(
+    path: [Position], cost_model: SlewCostModel, start: Position = None
+) -> [Position]:
+    positions = path if start is None else [start] + path
+    azimuths, elevations = _angles(positions)
+    visited = np.zeros(len(positions), dtype=bool)
+    current = 0
+    visited[current] = True
+    order = [] if start is not None else [current]
+    for _ in range(len(positions) - 1):
+        # one row of the time matrix at a time, so the memory grows linearly
+        times = cost_model.times_between(
+            azimuths[current], elevations[current], azimuths, elevations
+        )
+        candidates = np.where(visited, np.inf, times)
+        current = int(candidates.argmin())
+        visited[current] = True
+        order.append(current)
+    return [positions[i] for i in order]
+
+
+def _two_opt(
+    path: [Position],
+    cost_model: SlewCostModel,
+    start: Position = None,
+    max_passes: int = 50,
+) -> [Position]:
+    # reverse segments of the open path, as long as this shortens the total travel time
+    positions = path if start is None else [start] + path
+    azimuths, elevations = _angles(positions)
+
+    def times(start_index, stop_index) -> np.ndarray:
+        # the needed entries of the time matrix, without building the whole matrix
+        return cost_model.times_between(
+            azimuths[start_index],
+            elevations[start_index],
+            azimuths[stop_index],
+            elevations[stop_index],
+        )
+
+    # the start position is fixed, as is the first position without start
+    order = np.arange(len(positions))
+    n = len(order)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, n - 1):
+            a, b = order[i - 1], order[i]
+            c = order[i + 1 :]
+            # successor of each candidate segment end, the last segment end has none
+            d = order[i + 2 :]
+            gain = times(a, b) - times(a, c)
+            gain[:-1] += times(c[:-1], d) - times(b, d)
+            j = int(gain.argmax())
+            if gain[j] > 1e-9:
+                order[i : i + j + 2] = order[i : i + j + 2][::-1]
+                improved = True
+        if not improved:
+            break
+    order = order if start is None else order[1:]
+    return [positions[i] for i in order]
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import queue
+import threading
+
+_STOP = object()
+
+
+class PipelineStage:
+    """
+    Processes jobs on worker threads in the order they were submitted, so the caller can continue with the next
+    position, while the results of the previous one are still being processed. Failed jobs are retried and skipped
+    afterwards, without ever raising into the submitting thread. Stages, which fail fast, stop at the first failed
+    job instead and raise its error into the submitting thread.
+    """
+
+    name: str
+    retries: int
+    fail_fast: bool
+    processed: int = 0
+    failed: int = 0
+    error: Exception = None  # the error of the failed job of a stage, which fails fast
+
+    def __init__(
+        self,
+        name: str,
+        function,
+        maxsize: int = 8,
+        retries: int = 1,
+        fail_fast: bool = False,
+    ):
+        """
+        This function initializes the stage and starts its worker thread.
+        :param name: The name of the stage, used in log messages
+        :param function: The function, which is called with the arguments of each job
+        :param maxsize: The maximum number of pending jobs. If the stage falls behind, submit blocks until a job
+            finished, which bounds the memory of queued images and measurements.
+        :param retries: The number of retries of a failed job, before it is skipped. Jobs, which must not run
+            twice, e.g. appending to a file, need 0 retries.
+        :param fail_fast: If set True, the jobs after a failed job are dropped, and submit, join and close raise
+            the error of the failed job
+        """
+        self.name = str(name)
+        self.retries = int(retries)
+        self.fail_fast = bool(fail_fast)
+        self._function = function
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(
+            target=self._work, name=f"pipeline-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, *args, **kwargs):
+        """
+        This function queues a job for the worker thread.
+        :return: None
+        """
+        self._raise_error()
+        if not self._thread.is_alive():
+            raise Exception(f"The pipeline stage {self.name} is closed!")
+        self._queue.put((args, kwargs))
+
+    @property
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def join(self):
+        """
+        This function waits until all submitted jobs were processed.
+        :return: None
+        """
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """
+        This function processes all submitted jobs and stops the worker thread.
+        :return: None
+        """
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._raise_error()
+
+    def __enter__(self) -> PipelineStage:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _raise_error(self):
+        if self.error is not None:
+            raise Exception(f"The pipeline stage {self.name} failed!") from self.error
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is _STOP:
+                    return
+                if self.error is not None:
+                    # a stage, which fails fast, drops all jobs after the failed one
+                    self.failed += 1
+                    continue
+                args, kwargs = job
+                for attempt in range(self.retries + 1):
+                    try:
+                        self._function(*args, **kwargs)
+                        self.processed += 1
+                        break
+                    except Exception as e:
+                        if attempt < self.retries:
+                            print(f"{self.name} failed due to Exception: {e}\nRetry..")
+                        elif self.fail_fast:
+                            self.failed += 1
+                            self.error = e
+                            print(f"{self.name} failed due to Exception: {e}\nStop..")
+                        else:
+                            self.failed += 1
+                            print(
+                                f"{self.name} failed due to Exception: {e}\nSkip this job.."
+                            )
+            finally:
+                self._queue.task_done()
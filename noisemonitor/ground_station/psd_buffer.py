@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import time
+import threading
+import numpy as np
+
+from .data_structures import PSDLevels
+
+
+class PSDStreamClosed(Exception):
+    """
+    The PSD stream was stopped or failed, before the requested frames arrived
+    """
+
+
+def average_psd_levels(frames: [PSDLevels]) -> PSDLevels:
+    """
+    This function averages the given PSD frames in linear power.
+    :param frames: List of PSD frames of the same frequency range
+    :return: The averaged PSD frame, with the timestamp of the latest frame
+    """
+    if len(frames) < 1:
+        raise ValueError("Expected at least one PSD frame to average!")
+    levels = np.stack([f.psd_levels for f in frames]).astype(np.float64)
+    mean = 10.0 * np.log10(np.mean(10.0 ** (levels / 10.0), axis=0))
+    latest = frames[-1]
+    return PSDLevels(
+        timestamp=latest.timestamp,
+        frequency_start=latest.frequency_start,
+        frequency_stop=latest.frequency_stop,
+        frequency_step=latest.frequency_step,
+        samples=sum(f.samples for f in frames),
+        psd_levels=mean.astype(np.float32),
+        frequency=latest.frequency,
+        capture_start=frames[0].capture_start,
+        capture_stop=latest.capture_stop,
+    )
+
+
+class PSDStatistics:
+    """
+    Running statistics (mean, variance, count) per frequency bin of PSD frames, computed in linear power
+    """
+
+    count: int = 0
+    samples: int = 0
+    first: PSDLevels = None
+    latest: PSDLevels = None
+
+    def __init__(self):
+        self._mean = None
+        self._m2 = None
+        self._band_mean = 0.0
+        self._band_m2 = 0.0
+
+    def update(self, frame: PSDLevels):
+        """
+        This function adds a PSD frame to the statistics (Welford's algorithm).
+        :param frame: The PSD frame
+        :return: None
+        """
+        power = 10.0 ** (frame.psd_levels.astype(np.float64) / 10.0)
+        if self._mean is None:
+            self._mean = np.zeros_like(power)
+            self._m2 = np.zeros_like(power)
+        self.count += 1
+        delta = power - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (power - self._mean)
+        band_power = float(power.mean())
+        band_delta = band_power - self._band_mean
+        self._band_mean += band_delta / self.count
+        self._band_m2 += band_delta * (band_power - self._band_mean)
+        self.samples += frame.samples
+        if self.first is None:
+            self.first = frame
+        self.latest = frame
+
+    @property
+    def std_error(self) -> np.ndarray:
+        """
+        This function returns the standard error of the mean PSD level of each bin.
+        :return: Standard error of each bin in dB
+        """
+        if self.count < 2:
+            return np.full(0 if self._mean is None else self._mean.size, np.inf)
+        se = np.sqrt(self._m2 / (self.count - 1) / self.count)
+        return 10.0 * np.log10(1.0 + se / self._mean)
+
+    @property
+    def snr(self) -> float:
+        """
+        This function returns the ratio of the mean band power to its standard error.
+        :return: SNR of the band power in dB
+        """
+        if self.count < 2:
+            return -np.inf
+        se = np.sqrt(self._band_m2 / (self.count - 1) / self.count)
+        if se <= 0:
+            return np.inf
+        return float(10.0 * np.log10(self._band_mean / se))
+
+    def result(self) -> PSDLevels:
+        """
+        This function returns the mean PSD levels of all frames.
+        :return: The mean PSD frame, with the timestamp of the latest frame
+        """
+        if self.latest is None:
+            raise ValueError("Expected at least one PSD frame!")
+        return PSDLevels(
+            timestamp=self.latest.timestamp,
+            frequency_start=self.latest.frequency_start,
+            frequency_stop=self.latest.frequency_stop,
+            frequency_step=self.latest.frequency_step,
+            samples=self.samples,
+            psd_levels=(10.0 * np.log10(self._mean)).astype(np.float32),
+            frequency=self.latest.frequency,
+            capture_start=self.first.capture_start,
+            capture_stop=self.latest.capture_stop,
+        )
+
+
+class PSDFrameBuffer:
+    """
+    Fixed size ring buffer, holding the latest PSD frames with monotonic sequence numbers
+    """
+
+    size: int
+    sequence: int = -1
+
+    def __init__(self, size: int = 64):
+        """
+        This function initializes the ring buffer.
+        :param size: The number of PSD frames the buffer can hold
+        """
+        self.size = int(size)
+        self._frames = [None] * self.size
+        self._received = [0.0] * self.size
+        self._first_sequence = 0
+        self._closed = None
+        self._subscribers = []
+        self._condition = threading.Condition()
+
+    def push(self, frame: PSDLevels) -> int:
+        """
+        This function adds a new PSD frame to the buffer and wakes up all waiting readers.
+        :param frame: The new PSD frame
+        :return: The sequence number of the frame
+        """
+        with self._condition:
+            self.sequence += 1
+            index = self.sequence % self.size
+            self._frames[index] = frame
+            self._received[index] = time.monotonic()
+            self._condition.notify_all()
+            sequence = self.sequence
+            started = self._started(index)
+            subscribers = list(self._subscribers)
+        # outside the lock, so subscribers may use the buffer
+        self._notify(subscribers, frame, started)
+        return sequence
+
+    def open(self):
+        """
+        This function marks the start of a new PSD stream. Frames of previous streams are discarded.
+        :return: None
+        """
+        with self._condition:
+            self._first_sequence = self.sequence + 1
+            self._closed = None
+
+    def close(self, reason: str = "PSD stream was stopped"):
+        """
+        This function marks the end of the PSD stream, so waiting readers do not block forever.
+        :param reason: Description why the stream ended
+        :return: None
+        """
+        with self._condition:
+            self._closed = str(reason)
+            self._condition.notify_all()
+            subscribers = list(self._subscribers)
+        self._notify(subscribers, None, None)
+
+    def subscribe(self, callback, after: float, frequency: float = None) -> [PSDLevels]:
+        """
+        This function registers a function, which is called with each new PSD frame, whose integration started after
+        the given point in time, and with None, once the stream ends. It is called from the thread pushing the frames,
+        so it shall return quickly, e.g. by handing the frame over to an event loop.
+        :param callback: The function
+        :param after: Point in time of time.monotonic()
+        :param frequency: If given, only frames captured at this center frequency are passed on
+        :return: The matching frames, which are buffered already, ordered from old to new
+        """
+
+        def matches(frame: PSDLevels, started: float) -> bool:
+            return (
+                frequency is None or frame.frequency == frequency
+            ) and started >= after
+
+        def on_frame(frame: PSDLevels, started: float):
+            if frame is None:
+                callback(None)
+            elif matches(frame, started):
+                callback(frame)
+
+        on_frame.callback = callback
+        with self._condition:
+            first = max(self._first_sequence, self.sequence - self.size + 1)
+            buffered = [
+                self._frames[sequence % self.size]
+                for sequence in range(first, self.sequence + 1)
+                if matches(
+                    self._frames[sequence % self.size],
+                    self._started(sequence % self.size),
+                )
+            ]
+            self._subscribers.append(on_frame)
+            closed = self._closed is not None
+        if closed:
+            self._notify([on_frame], None, None)
+        return buffered
+
+    def unsubscribe(self, callback):
+        """
+        This function removes a previously registered function.
+        :param callback: The function
+        :return: None
+        """
+        with self._condition:
+            self._subscribers = [
+                s for s in self._subscribers if s.callback is not callback
+            ]
+
+    def latest(self, frequency: float = None, timeout: float = None) -> PSDLevels:
+        """
+        This function returns the latest PSD frame. It only blocks, if no frame was received yet.
+        :param frequency: If given, only frames captured at this center frequency are considered
+        :param timeout: The maximum time in seconds to wait for the first frame
+        :return: The latest PSD frame
+        """
+        return self.last(count=1, frequency=frequency, timeout=timeout)[-1]
+
+    def next_after(
+        self, after: float, frequency: float = None, timeout: float = None
+    ) -> PSDLevels:
+        """
+        This function returns the first PSD frame, whose integration started after the given point in time.
+        If no such frame is buffered, it blocks until it arrives.
+        :param after: Point in time of time.monotonic()
+        :param frequency: If given, only frames captured at this center frequency are considered
+        :param timeout: The maximum time in seconds to wait for the frame
+        :return: The first PSD frame received after the given point in time
+        """
+        return next(self.iterate(after, frequency=frequency, timeout=timeout))
+
+    def iterate(self, after: float, frequency: float = None, timeout: float = None):
+        """
+        This function iterates over all PSD frames, whose integration started after the given point in time,
+        as they arrive. Frames, which were overwritten before they could be read, are skipped.
+        :param after: Point in time of time.monotonic()
+        :param frequency: If given, only frames captured at this center frequency are considered
+        :param timeout: The maximum time in seconds to wait for each frame
+        :return: Generator of PSD frames
+        """
+        sequence = -1
+        while True:
+            with self._condition:
+                (sequence,) = self._wait_for_sequences(
+                    lambda: self._find(
+                        lambda i: self._started(i) >= after,
+                        1,
+                        frequency=frequency,
+                        start=sequence + 1,
+                    ),
+                    timeout,
+                )
+                frame = self._frames[sequence % self.size]
+            yield frame
+
+    def last(
+        self, count: int, frequency: float = None, timeout: float = None
+    ) -> [PSDLevels]:
+        """
+        This function returns the latest PSD frames. It blocks, until enough frames were received.
+        :param count: The number of frames, limited to the size of the buffer
+        :param frequency: If given, only frames captured at this center frequency are considered
+        :param timeout: The maximum time in seconds to wait for the frames
+        :return: List of the latest PSD frames, ordered from old to new
+        """
+        count = min(max(1, int(count)), self.size)
+        with self._condition:
+            sequences = self._wait_for_sequences(
+                lambda: self._find(
+                    lambda i: True, count, frequency=frequency, newest=True
+                ),
+                timeout,
+            )
+            return [self._frames[sequence % self.size] for sequence in sequences]
+
+    def _find(
+        self,
+        match,
+        count: int,
+        frequency: float = None,
+        newest: bool = False,
+        start: int = 0,
+    ) -> [int]:
+        # search buffered frames of the current stream (oldest first or newest first)
+        first = max(self._first_sequence, self.sequence - self.size + 1, start)
+        sequences = range(first, self.sequence + 1)
+        found = []
+        for sequence in reversed(sequences) if newest else sequences:
+            index = sequence % self.size
+            if frequency is not None and self._frames[index].frequency != frequency:
+                continue
+            if match(index):
+                found.append(sequence)
+                if len(found) >= count:
+                    return found[::-1] if newest else found
+        return None
+
+    def _started(self, index: int) -> float:
+        # start of the integration, if known, otherwise the time the frame was received
+        capture_start = self._frames[index].capture_start
+        return self._received[index] if capture_start is None else capture_start
+
+    @staticmethod
+    def _notify(subscribers, frame: PSDLevels, started: float):
+        # a failing subscriber must not stop the stream of the SDR or of the other subscribers
+        for subscriber in subscribers:
+            try:
+                subscriber(frame, started)
+            except Exception as e:
+                print(f"Could not pass on PSD frame due to Exception: {e}")
+
+    def _wait_for_sequences(self, find, timeout: float = None) -> [int]:
+        sequences = None
+
+        def ready() -> bool:
+            nonlocal sequences
+            sequences = find()
+            return sequences is not None or self._closed is not None
+
+        if not self._condition.wait_for(ready, timeout):
+            raise TimeoutError("Did not receive the requested PSD frames in time!")
+        if sequences is None:
+            raise PSDStreamClosed(f"No PSD frames available, {self._closed}!")
+        return sequences
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import time
+import numpy as np
+
+try:
+    import pyfftw.interfaces.numpy_fft as fft_module
+    import pyfftw.interfaces.cache
+
+    pyfftw.interfaces.cache.enable()
+except ImportError:
+    fft_module = np.fft
+
+
+class IQSource:
+    """
+    Base class of all sources, which deliver complex IQ samples to the PSD engine
+    """
+
+    sampling_rate: float = None
+    frequency: float = None
+    gain: float = None
+
+    def open(self, sampling_rate: float, frequency: float, gain: float = None):
+        """
+        This function opens the source and configures it.
+        :param sampling_rate: The sample rate of the source in samples per second
+        :param frequency: The center frequency of the source in Hertz
+        :param gain: The gain of the source in dB
+        :return: None
+        """
+        self.sampling_rate = float(sampling_rate)
+        self.frequency = float(frequency)
+        self.gain = None if gain is None else float(gain)
+
+    def tune(self, frequency: float):
+        """
+        This function changes the center frequency of the source.
+        :param frequency: The new center frequency in Hertz
+        :return: None
+        """
+        self.frequency = float(frequency)
+
+    def start_stream(self):
+        """
+        This function starts the sample stream of the source.
+        :return: None
+        """
+        pass
+
+    def stop_stream(self):
+        """
+        This function stops the sample stream of the source.
+        :return: None
+        """
+        pass
+
+    def read(self, buffer: np.ndarray) -> np.ndarray:
+        """
+        This function fills the given buffer with the next IQ samples of the stream.
+        :param buffer: A complex64 array, which shall be filled with samples
+        :return: The filled buffer
+        """
+        raise NotImplementedError("IQ sources have to implement read()!")
+
+    def close(self):
+        """
+        This function stops the stream and releases the source.
+        :return: None
+        """
+        self.stop_stream()
+
+
+class SoapyIQSource(IQSource):
+    """
+    IQ samples read from an SDR via SoapySDR
+    """
+
+    device_args: str
+    _device = None
+
+    def __init__(self, device_args: str):
+        """
+        This function initializes the SoapySDR IQ source.
+        :param device_args: The SoapySDR device arguments, e.g. "driver=uhd"
+        """
+        self.device_args = str(device_args)
+
+    def open(self, sampling_rate: float, frequency: float, gain: float = None):
+        super().open(sampling_rate=sampling_rate, frequency=frequency, gain=gain)
+        # only needed with real hardware, so import it here
+        import simplesoapy
+
+        self._device = simplesoapy.SoapyDevice(self.device_args)
+        self._device.sample_rate = self.sampling_rate
+        self._device.freq = self.frequency
+        if self.gain is not None:
+            self._device.gain = self.gain
+
+    def tune(self, frequency: float):
+        super().tune(frequency)
+        self._device.freq = self.frequency
+
+    def start_stream(self):
+        self._device.start_stream()
+
+    def stop_stream(self):
+        if self._device is not None:
+            self._device.stop_stream()
+
+    def read(self, buffer: np.ndarray) -> np.ndarray:
+        return self._device.read_stream_into_buffer(buffer)
+
+    def close(self):
+        super().close()
+        self._device = None
+
+
+class SyntheticIQSource(IQSource):
+    """
+    Synthetic IQ samples consisting of white noise and optional tones, e.g. for testing and benchmarking
+    """
+
+    noise_level: float
+    tones: [(float, float)]
+    throttle: bool
+    _sample_count: int = 0
+    _stream_start: float = None
+
+    def __init__(
+        self,
+        noise_level: float = -60.0,
+        tones: [(float, float)] = None,
+        throttle: bool = False,
+        seed: int = None,
+    ):
+        """
+        This function initializes the synthetic IQ source.
+        :param noise_level: The total power of the white noise in dBFS
+        :param tones: List of tones given as (frequency in Hertz, power in dBFS)
+        :param throttle: If set True, samples will be delivered at the configured sample rate
+        :param seed: The seed of the random number generator
+        """
+        self.noise_level = float(noise_level)
+        self.tones = [] if tones is None else [(float(f), float(p)) for f, p in tones]
+        self.throttle = bool(throttle)
+        self._rng = np.random.default_rng(seed)
+
+    def start_stream(self):
+        self._stream_start = time.monotonic()
+        self._sample_count = 0
+
+    def read(self, buffer: np.ndarray) -> np.ndarray:
+        n = buffer.size
+        noise_std = np.sqrt(10 ** (self.noise_level / 10) / 2)
+        buffer.real = self._rng.standard_normal(n, dtype=np.float32) * noise_std
+        buffer.imag = self._rng.standard_normal(n, dtype=np.float32) * noise_std
+        if self.tones:
+            t = (self._sample_count + np.arange(n)) / self.sampling_rate
+            for tone_frequency, tone_level in self.tones:
+                amplitude = np.sqrt(10 ** (tone_level / 10))
+                offset = tone_frequency - self.frequency
+                buffer += (amplitude * np.exp(2j * np.pi * offset * t)).astype(
+                    np.complex64
+                )
+        self._sample_count += n
+        if self.throttle:
+            time_to_wait = (
+                self._stream_start
+                + self._sample_count / self.sampling_rate
+                - time.monotonic()
+            )
+            time.sleep(time_to_wait if time_to_wait > 0 else 0)
+        return buffer
+
+
+class PSDEngine:
+    """
+    Computes the power spectral density of IQ samples with Welch's method
+    """
+
+    bins: int
+    sampling_rate: float
+    overlap: float
+    window: np.ndarray
+
+    def __init__(
+        self,
+        bins: int,
+        sampling_rate: float,
+        window: str = "hann",
+        overlap: float = 0.0,
+    ):
+        """
+        This function initializes the PSD engine.
+        :param bins: In how many frequency bins shall the PSD data be computed?
+        :param sampling_rate: The sample rate of the processed samples in samples per second
+        :param window: The window function applied to each segment, "hann" or "boxcar"
+        :param overlap: The overlap of consecutive segments from 0 to <1
+        """
+        self.bins = int(bins)
+        self.sampling_rate = float(sampling_rate)
+        self.overlap = float(overlap)
+        if not 0 <= self.overlap < 1:
+            raise ValueError(f"Overlap has to be within 0..<1, but got {overlap}!")
+        if window == "hann":
+            self.window = np.hanning(self.bins + 1)[:-1].astype(np.float32)
+        elif window == "boxcar":
+            self.window = np.ones(self.bins, dtype=np.float32)
+        else:
+            raise NotImplementedError(f"The window {window} is not supported!")
+        # density scaling, as done by soapy_power
+        self._scale = 1.0 / (self.sampling_rate * float(np.sum(self.window**2)))
+        self._step = max(1, self.bins - int(self.bins * self.overlap))
+        self._power_sum = np.zeros(self.bins, dtype=np.float64)
+        self._tail = np.empty(0, dtype=np.complex64)
+        self.segments = 0
+
+    def reset(self):
+        """
+        This function discards all previously accumulated segments.
+        :return: None
+        """
+        self._power_sum[:] = 0
+        self._tail = np.empty(0, dtype=np.complex64)
+        self.segments = 0
+
+    def update(self, samples: np.ndarray):
+        """
+        This function adds the IQ samples to the running Welch average.
+        Samples, which do not fill a complete segment, are kept for the next update.
+        :param samples: complex IQ samples
+        :return: None
+        """
+        if self._tail.size:
+            samples = np.concatenate((self._tail, samples))
+        if samples.size < self.bins:
+            self._tail = samples.copy()
+            return
+        n_segments = (samples.size - self.bins) // self._step + 1
+        if self._step == self.bins:
+            segments = samples[: n_segments * self.bins].reshape(n_segments, self.bins)
+        else:
+            segments = np.lib.stride_tricks.sliding_window_view(samples, self.bins)[
+                :: self._step
+            ][:n_segments]
+        spectrum = fft_module.fft(segments * self.window, axis=1)
+        self._power_sum += np.sum(spectrum.real**2 + spectrum.imag**2, axis=0)
+        self.segments += n_segments
+        self._tail = samples[n_segments * self._step :].copy()
+
+    def result(self) -> np.ndarray:
+        """
+        This function returns the averaged PSD of all accumulated segments.
+        :return: PSD levels in dB, ordered from the lowest to the highest frequency
+        """
+        if self.segments < 1:
+            raise Exception("No complete segment was processed by the PSD engine!")
+        psd = np.fft.fftshift(self._power_sum * (self._scale / self.segments))
+        return (10.0 * np.log10(psd)).astype(np.float32)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        This function computes the PSD of the given IQ samples.
+        :param samples: complex IQ samples
+        :return: PSD levels in dB, ordered from the lowest to the highest frequency
+        """
+        self.reset()
+        self.update(samples)
+        return self.result()
+
+
+if __name__ == "__main__":
+    # benchmark the engine with one block of synthetic samples
+    rate = 4e6
+    source = SyntheticIQSource(noise_level=-60, tones=[(1250.5e6, -40)])
+    source.open(sampling_rate=rate, frequency=1250e6)
+    source.start_stream()
+    for psd_bins in [16, 1024, 16384]:
+        engine = PSDEngine(bins=psd_bins, sampling_rate=rate)
+        block = source.read(
+            np.empty(psd_bins * max(1, 2**16 // psd_bins), dtype=np.complex64)
+        )
+        frames, t_start = 0, time.perf_counter()
+        while time.perf_counter() - t_start < 2:
+            engine.reset()
+            for _ in range(int(rate) // block.size):
+                engine.update(block)
+            engine.result()
+            frames += 1
+        duration = time.perf_counter() - t_start
+        print(
+            f"{psd_bins} bins: {frames / duration:.1f} frames/s "
+            f"({frames / duration * rate / 1e6:.1f} MS/s)"
+        )
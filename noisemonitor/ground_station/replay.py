@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import math
+import numpy as np
+import pandas as pd
+
+from .data_structures import Position
+
+
+class SweepFileReplay:
+    """
+    PSD levels of a previously recorded sweep file, looked up by pointing position
+    """
+
+    file_path: str
+    bins: int
+
+    def __init__(self, file_path: str):
+        """
+        This function loads the recorded sweep file.
+        :param file_path: Path of the sweep CSV file, as written by the noise sweeper
+        """
+        self.file_path = str(file_path)
+        df = pd.read_csv(self.file_path, index_col=0)
+        psd_columns = sorted(
+            [c for c in df.columns if c.startswith("psd_") and c[4:].isdigit()],
+            key=lambda c: int(c[4:]),
+        )
+        if len(psd_columns) < 1:
+            raise Exception(f"{self.file_path} does not contain any PSD levels!")
+        self.bins = len(psd_columns)
+        self.levels = df[psd_columns].to_numpy(dtype=np.float32)
+        self.azimuth = df["measurement_azimuth"].to_numpy(dtype=np.float64)
+        self.elevation = df["measurement_elevation"].to_numpy(dtype=np.float64)
+        self.center_frequency = df["center_frequency"].to_numpy(dtype=np.float64)
+        self.samples = df["samples"].to_numpy(dtype=np.int64)
+        self.frequency_step = float(df["frequency_step"].iloc[0])
+        self._next_row = 0
+
+    def get_psd_levels(
+        self, frequency: float, position: Position = None
+    ) -> (np.ndarray, int):
+        """
+        This function returns the recorded PSD levels closest to the given position and frequency.
+        Without position, the rows of the file are replayed in their recorded order.
+        :param frequency: The center frequency in Hertz
+        :param position: The pointing position of the antenna
+        :return: The PSD levels in dB and the number of samples
+        """
+        rows = np.flatnonzero(
+            np.abs(self.center_frequency - frequency)
+            == np.abs(self.center_frequency - frequency).min()
+        )
+        if position is None:
+            row = rows[self._next_row % rows.size]
+            self._next_row += 1
+        else:
+            az_diff = (self.azimuth[rows] - position.azimuth + 180) % 360 - 180
+            az_diff *= math.cos(math.radians(position.elevation))
+            el_diff = self.elevation[rows] - position.elevation
+            row = rows[np.argmin(az_diff**2 + el_diff**2)]
+        return self.levels[row], int(self.samples[row])
+
+
+class GaussianBeamModel:
+    """
+    PSD levels of a noise source seen through a Gaussian antenna beam
+    """
+
+    source_position: Position
+    hpbw: (float, float)
+    source_level: float
+    noise_level: float
+
+    def __init__(
+        self,
+        source_position: Position,
+        hpbw: (float, float),
+        source_level: float = -70.0,
+        noise_level: float = -75.0,
+        seed: int = None,
+    ):
+        """
+        This function initializes the beam model.
+        :param source_position: The position of the noise source
+        :param hpbw: The HPBW opening angle of the antenna in azimuth and elevation direction in degree
+        :param source_level: The PSD level of the source in the center of the beam in dB
+        :param noise_level: The PSD level of the background noise in dB
+        :param seed: The seed of the random number generator
+        """
+        self.source_position = source_position
+        self.hpbw = (float(hpbw[0]), float(hpbw[1]))
+        self.source_level = float(source_level)
+        self.noise_level = float(noise_level)
+        self._rng = np.random.default_rng(seed)
+
+    def get_psd_levels(
+        self, bins: int, averages: int, position: Position = None
+    ) -> np.ndarray:
+        """
+        This function computes the PSD levels seen at the given pointing position.
+        :param bins: The number of frequency bins
+        :param averages: The number of averaged FFT segments, which defines the noise of the levels
+        :param position: The pointing position of the antenna
+        :return: The PSD levels in dB
+        """
+        gain = 0.0
+        if position is not None:
+            az_diff = (
+                (position.azimuth - self.source_position.azimuth + 180) % 360 - 180
+            ) * math.cos(math.radians(position.elevation))
+            el_diff = position.elevation - self.source_position.elevation
+            gain = math.exp(
+                -4
+                * math.log(2)
+                * ((az_diff / self.hpbw[0]) ** 2 + (el_diff / self.hpbw[1]) ** 2)
+            )
+        power = 10 ** (self.noise_level / 10) + gain * 10 ** (self.source_level / 10)
+        # averaged periodogram bins scatter with a relative std. deviation of 1/sqrt(averages)
+        scatter = self._rng.standard_normal(bins) / math.sqrt(max(1, averages))
+        return (10 * np.log10(power * np.clip(1 + scatter, 1e-3, None))).astype(
+            np.float32
+        )
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import time
-import socket
+from collections import deque
 
-from .data_structures import Position
+from .data_structures import Position, SettleEvent
+from .rotctld import RotctldClient
+from .path_planner import SlewCostModel
+from .telemetry import RotatorTelemetry
 
 
 class Rotator:
+    cost_model: SlewCostModel
     _rotator: GenericRotator
 
     def __init__(
@@ -23,6 +27,7 @@ class Rotator:
         :param netrotctl_port: The port address of the ROTCTL server
         :param positioning_tolerance: The accuracy or resolution of the rotator system
         """
+        self.cost_model = SlewCostModel()
         rot_type = str(rotator_type).lower()
         if rot_type == "spid":
             self._rotator = SPIDRotator(
@@ -30,27 +35,141 @@ class Rotator:
                 netrotctl_port=netrotctl_port,
                 positioning_tolerance=positioning_tolerance,
             )
+        elif rot_type == "simulated":
+            self._rotator = SimulatedRotator(
+                positioning_tolerance=positioning_tolerance
+            )
         else:
             raise NotImplementedError(
                 f"There is currently no support for {rotator_type} rotators."
             )
 
-    def move_rotator_to_position(self, target_position: Position) -> Position:
+    def move_rotator_to_position(
+        self, target_position: Position, on_reading=None, max_poll_interval: float = None
+    ) -> Position:
         """
         This function sets the motion control of the rotator controller to move the rotator towards the given
         position. After converging into a steady rotator position, the current positional reading will be returned.
         :param target_position: The position (azimuth and elevation) where the rotator shall point to
+        :param on_reading: Function, which is called with the time (time.monotonic()) and position of each reading
+        :param max_poll_interval: Overrides the longest time between two position readings of this move in seconds
         :return: The position the rotator could reach, after converging into a steady position reading.
         """
-        return self._rotator.move_rotator_to_position(target_position)
+        return self._rotator.move_rotator_to_position(
+            target_position, on_reading=on_reading, max_poll_interval=max_poll_interval
+        )
+
+    def set_position(self, target_position: Position):
+        """
+        This function commands the rotator to move towards the given position, without waiting for the movement.
+        :param target_position: The position (azimuth and elevation) where the rotator shall point to
+        :return: None
+        """
+        self._rotator.set_position(target_position)
 
     def get_position(self) -> Position:
         """
         This function returns the current position reading of the rotator controller.
+        While the telemetry is running, the latest cached reading is returned without querying the controller.
         :return: The current position reading of the rotator controller
         """
+        telemetry = self._rotator.telemetry
+        if telemetry is not None and telemetry.running:
+            latest = telemetry.latest()
+            if latest is not None:
+                return latest[1]
         return self._rotator.get_position()
 
+    @property
+    def last_position(self) -> Position:
+        """
+        This function returns the last position reading, without querying the rotator controller.
+        :return: The last position reading or None, if the position was not read yet
+        """
+        telemetry = self._rotator.telemetry
+        if telemetry is not None and telemetry.latest() is not None:
+            return telemetry.latest()[1]
+        return getattr(self._rotator, "position", None)
+
+    @property
+    def telemetry(self) -> RotatorTelemetry:
+        return self._rotator.telemetry
+
+    def start_telemetry(self, interval: float = None) -> RotatorTelemetry:
+        """
+        This function starts polling the position of the rotator controller at a fixed rate in the background.
+        Afterwards position reads and rotator movements use the published readings, so the rotator controller
+        receives a bounded number of position requests, independent of the number of readers.
+        :param interval: The time between two position requests in seconds, defaults to the current setting
+        :return: The telemetry service, e.g. to subscribe to new readings
+        """
+        telemetry = self._rotator.telemetry
+        if telemetry is None:
+            telemetry = RotatorTelemetry(
+                self._rotator.get_position,
+                interval=self._rotator.min_poll_interval if interval is None else interval,
+            )
+            self._rotator.telemetry = telemetry
+        elif interval is not None:
+            telemetry.interval = float(interval)
+        telemetry.start()
+        return telemetry
+
+    def stop_telemetry(self):
+        """
+        This function stops polling the position of the rotator controller in the background.
+        :return: None
+        """
+        if self._rotator.telemetry is not None:
+            self._rotator.telemetry.stop()
+
+    def position_at(self, timestamp: float) -> Position:
+        """
+        This function returns the position of the rotator at the given point in time, interpolated between the
+        readings of the telemetry.
+        :param timestamp: Point in time, in time.monotonic()
+        :return: The interpolated position
+        """
+        if self._rotator.telemetry is None:
+            raise Exception("The rotator telemetry was not started!")
+        return self._rotator.telemetry.position_at(timestamp)
+
+    def set_convergence(
+        self,
+        min_poll_interval: float = None,
+        max_poll_interval: float = None,
+        stable_rate: float = None,
+        stable_readings: int = None,
+        stall_timeout: float = None,
+    ):
+        """
+        This function configures, how the convergence into a target position is detected.
+        The position is polled fast close to the target and slower during long slews.
+        :param min_poll_interval: The shortest time between two position readings in seconds
+        :param max_poll_interval: The longest time between two position readings in seconds
+        :param stable_rate: Below this slew rate in degree per second the rotator is considered steady
+        :param stable_readings: The number of consecutive steady readings within tolerance to converge
+        :param stall_timeout: The maximum time in seconds the rotator may stay steady outside the tolerance
+        :return: None
+        """
+        self._rotator.set_convergence(
+            min_poll_interval=min_poll_interval,
+            max_poll_interval=max_poll_interval,
+            stable_rate=stable_rate,
+            stable_readings=stable_readings,
+            stall_timeout=stall_timeout,
+        )
+
+    @property
+    def last_settle_event(self) -> SettleEvent:
+        """
+        This function returns when and where the rotator settled after its last movement.
+        :return: The latest settle event or None, if the rotator did not move yet
+        """
+        if len(self._rotator.settle_events) < 1:
+            return None
+        return self._rotator.settle_events[-1]
+
     def get_positioning_tolerance(self) -> float:
         """
         This function returns the positional tolerance of the rotator system.
@@ -77,49 +196,104 @@ class GenericRotator:
     position: Position
     target_position: Position
     positioning_tolerance: float
+    settle_events: deque
+    telemetry: RotatorTelemetry = None  # shared position poller, if running the moves use its readings
+    min_poll_interval: float = 0.1  # in seconds, used close to the target
+    max_poll_interval: float = 1.0  # in seconds, used during long slews
+    stable_rate: float = 1.0  # in degree per second, below the rotator is considered steady
+    stable_readings: int = 2  # consecutive steady readings within tolerance, until the move converged
+    stall_timeout: float = 10.0  # in seconds, a steady rotator may stay outside the tolerance
 
     def __init__(self, positioning_tolerance: float = 0.1):
         self.positioning_tolerance = float(positioning_tolerance)
+        self.settle_events = deque(maxlen=1000)
+
+    def set_convergence(
+        self,
+        min_poll_interval: float = None,
+        max_poll_interval: float = None,
+        stable_rate: float = None,
+        stable_readings: int = None,
+        stall_timeout: float = None,
+    ):
+        """
+        This function configures, how the convergence into a target position is detected.
+        Omitted values keep their current setting. Only a given pair of poll intervals is validated, because a
+        single one may cross the default of the other, e.g. of the simulated rotator, which never waits.
+        """
+        if (
+            min_poll_interval is not None
+            and max_poll_interval is not None
+            and float(min_poll_interval) > float(max_poll_interval)
+        ):
+            raise ValueError("The min poll interval exceeds the max poll interval!")
+        if min_poll_interval is not None:
+            self.min_poll_interval = float(min_poll_interval)
+        if max_poll_interval is not None:
+            self.max_poll_interval = float(max_poll_interval)
+        if stable_rate is not None:
+            self.stable_rate = float(stable_rate)
+        if stable_readings is not None:
+            self.stable_readings = max(1, int(stable_readings))
+        if stall_timeout is not None:
+            self.stall_timeout = float(stall_timeout)
 
     def move_rotator_to_position(
-        self, position: Position, time_interval: float = 0.5
+        self, position: Position, on_reading=None, max_poll_interval: float = None
     ) -> Position:
         # Gets rotator position and tracks motion progress.
         # If rotator position converges, it returns the measured position.
-        last_position = Position(float("inf"), float("inf"))
-        self.set_position(position)
-        converged, count = False, 0
-        while not converged:
-            current_position = self.get_position()
-            position_difference = abs(last_position - current_position)
-            target_difference = abs(current_position - position)
-            # print(
-            #     f"Target-{position}, "
-            #     f"Current-{current_position}, "
-            #     f"Difference-{target_difference}, "
-            #     f"Count:{count}"
-            # )
-            if (
-                position_difference.azimuth < 0.5
-                and position_difference.elevation < 0.5
-            ):
-                if (
-                    target_difference.azimuth < self.positioning_tolerance
-                    and target_difference.elevation < self.positioning_tolerance
-                ):
-                    self.stop_motion()
-                    if count > 2:
-                        converged = True
-                        self.stop_motion()
-                if count < 20:
-                    count += 1
-                else:
-                    raise Exception("Rotator could not reach target position!")
-            else:
-                count = 0
-            last_position = current_position
-            time.sleep(time_interval)
-        return self.get_position()
+        move_start = time.monotonic()
+        if self._telemetry_running():
+            self.set_position(position)
+            reading_time, current_position = self.telemetry.wait_for_reading(
+                after=time.monotonic()
+            )
+        else:
+            # the first reading is taken together with setting the target
+            current_position = self.set_and_get_position(position)
+            reading_time = time.monotonic()
+        convergence = MoveConvergence(self, position, move_start, max_poll_interval)
+        while True:
+            if on_reading is not None:
+                on_reading(reading_time, current_position)
+            poll_interval = convergence.update(reading_time, current_position)
+            if convergence.stop_pending:
+                self.stop_motion()
+                convergence.stop_pending = False
+            if poll_interval is None:
+                break
+            reading_time, current_position = self._next_reading(
+                poll_interval, reading_time
+            )
+        self.settle_events.append(convergence.settle_event())
+        return current_position
+
+    def _telemetry_running(self) -> bool:
+        return self.telemetry is not None and self.telemetry.running
+
+    def _next_reading(
+        self, poll_interval: float, last_reading_time: float
+    ) -> (float, Position):
+        # waits for the next published reading, instead of querying the rotator controller itself
+        if self._telemetry_running():
+            return self.telemetry.wait_for_reading(
+                after=last_reading_time + poll_interval
+            )
+        time.sleep(poll_interval)
+        current_position = self.get_position()
+        return time.monotonic(), current_position
+
+    def _poll_interval(
+        self, target_difference: Position, rate: float, in_tolerance: bool
+    ) -> float:
+        # poll fast close to the target and while the slew rate is unknown,
+        # otherwise wait for about half of the predicted time of arrival
+        if in_tolerance or not self.stable_rate < rate < float("inf"):
+            return self.min_poll_interval
+        distance = max(target_difference.azimuth, target_difference.elevation)
+        arrival = distance / rate
+        return min(max(arrival / 2, self.min_poll_interval), self.max_poll_interval)
 
     @property
     def azimuth_position(self) -> float:
@@ -135,6 +309,10 @@ class GenericRotator:
     def set_position(self, position: Position):
         self.target_position = position
 
+    def set_and_get_position(self, position: Position) -> Position:
+        self.set_position(position)
+        return self.get_position()
+
     def stop_motion(self):
         pass
 
@@ -142,6 +320,102 @@ class GenericRotator:
         pass
 
 
+class MoveConvergence:
+    """
+    Detects the convergence of one rotator movement from the position readings, independent of how the readings
+    are taken, so blocking and asyncio movements share the same logic
+    """
+
+    def __init__(
+        self,
+        rotator: GenericRotator,
+        target_position: Position,
+        move_start: float,
+        max_poll_interval: float = None,
+    ):
+        """
+        This function initializes the convergence detection of one movement.
+        :param rotator: The rotator, whose convergence settings are used
+        :param target_position: The position the rotator was commanded to
+        :param move_start: Point in time of time.monotonic(), when the movement was commanded
+        :param max_poll_interval: Overrides the longest time between two position readings in seconds
+        """
+        self.rotator = rotator
+        self.target_position = target_position
+        self.move_start = float(move_start)
+        self.max_poll_interval = max_poll_interval
+        self.stop_pending = False  # set once, when the motion shall be stopped
+        self.readings = 0
+        self._stable = 0
+        self._stopped = False
+        self._settled_since = None
+        self._stalled_since = None
+        self._last_reading = None
+
+    def update(self, reading_time: float, position: Position) -> float:
+        """
+        This function processes the next position reading.
+        :param reading_time: Point in time of time.monotonic(), when the position was read
+        :param position: The position reading
+        :return: The time until the next reading in seconds, or None if the rotator converged
+        """
+        rotator = self.rotator
+        self.readings += 1
+        target_difference = abs(position - self.target_position)
+        in_tolerance = (
+            target_difference.azimuth < rotator.positioning_tolerance
+            and target_difference.elevation < rotator.positioning_tolerance
+        )
+        rate = float("inf")
+        if self._last_reading is not None:
+            last_reading_time, last_position = self._last_reading
+            position_difference = abs(position - last_position)
+            rate = max(
+                position_difference.azimuth, position_difference.elevation
+            ) / max(reading_time - last_reading_time, 1e-3)
+        self._last_reading = (reading_time, position)
+        if rate > rotator.stable_rate:
+            self._stable = 0
+        else:
+            self._stable += 1
+        if self._stable > 0 and in_tolerance:
+            # the dish is steady since the first stable reading within tolerance
+            if self._settled_since is None:
+                self._settled_since = reading_time
+            if not self._stopped:
+                self.stop_pending = True
+                self._stopped = True
+            if self._stable >= rotator.stable_readings:
+                return None
+        else:
+            self._settled_since = None
+        if self._stable > 0 and not in_tolerance:
+            if self._stalled_since is None:
+                self._stalled_since = reading_time
+            elif reading_time - self._stalled_since > rotator.stall_timeout:
+                raise Exception("Rotator could not reach target position!")
+        else:
+            self._stalled_since = None
+        poll_interval = rotator._poll_interval(target_difference, rate, in_tolerance)
+        if self.max_poll_interval is not None:
+            poll_interval = min(poll_interval, self.max_poll_interval)
+        return poll_interval
+
+    def settle_event(self) -> SettleEvent:
+        """
+        This function describes when and where the rotator settled, after the movement converged.
+        :return: The settle event
+        """
+        reading_time, position = self._last_reading
+        return SettleEvent(
+            timestamp=self._settled_since,
+            target_position=self.target_position,
+            position=position,
+            settle_time=reading_time - self.move_start,
+            readings=self.readings,
+        )
+
+
 class SPIDRotator(GenericRotator):
     position: Position
     target_position: Position
@@ -162,9 +436,7 @@ class SPIDRotator(GenericRotator):
             self.netrotctl_ip = str(netrotctl_ip)
         if netrotctl_port is not None:
             self.netrotctl_port = int(netrotctl_port)
-        self.ROTCTL_ERROR = b"RPRT -1\n"
-        self.ROTCTL_CONFIRM = b"RPRT 0\n"
-        self.netrotctl_socket = None
+        self.netrotctl = None
         self.connect_netrotctl()
         self.position = self.get_position()
         self.target_position = self.position
@@ -174,58 +446,55 @@ class SPIDRotator(GenericRotator):
 
     def connect_netrotctl(self):
         self.disconnect_netrotctl()
-        self.netrotctl_socket = socket.create_connection(
-            (self.netrotctl_ip, self.netrotctl_port)
-        )
+        self.netrotctl = RotctldClient(self.netrotctl_ip, self.netrotctl_port)
 
     def disconnect_netrotctl(self):
-        if self.netrotctl_socket is not None:
-            try:
-                self.netrotctl_socket.close()
-            except AttributeError:
-                return
+        if getattr(self, "netrotctl", None) is not None:
+            self.netrotctl.close()
+            self.netrotctl = None
 
     def get_position(self) -> Position:
-        pos = self._get_rotator_position()
-        self.position = pos
-        return pos
+        self.position = self.netrotctl.get_position()
+        return self.position
 
     def set_position(self, position: Position):
         super().set_position(position)
-        self._set_rotator_position(position)
+        self.netrotctl.set_position(position)
 
-    def _send_command(self, cmd: str) -> str:
-        self.netrotctl_socket.sendall(str(cmd).encode())
-        data = self.netrotctl_socket.recv(64)
-        return str(data, encoding="utf-8")
+    def set_and_get_position(self, position: Position) -> Position:
+        super().set_position(position)
+        self.position = self.netrotctl.set_and_get_position(position)
+        return self.position
 
     def stop_motion(self):
         # Stop motion control
-        self._send_command("S\n")
+        self.netrotctl.stop()
 
     def reset_motor_driver(self):
         self.stop_motion()  # Make sure rotator does not move
-        self._send_command("R 2\n")  # Reset motor driver
-
-    def _get_rotator_position(self) -> Position:
-        command_message = "p\n"
-        self.netrotctl_socket.sendall(command_message.encode())
-        data = self.netrotctl_socket.recv(64)
-        try:
-            str_list = str(data, encoding="utf-8").splitlines()
-            az = float(str_list[0])
-            el = float(str_list[1])
-            self.position = Position(az, el)
-            return self.position
-        except Exception:
-            raise Exception(f"Unknown return value from NetRotCtl! ({data})")
-
-    def _set_rotator_position(self, position: Position):
-        command_message = f"P {position.azimuth:.3f} {position.elevation:.3f}\n"
-        self.netrotctl_socket.sendall(command_message.encode())
-        data = self.netrotctl_socket.recv(64)
-        if data == self.ROTCTL_CONFIRM:
-            return
-        if data == self.ROTCTL_ERROR:
-            raise Exception("ROTCTL Error")
-        raise Exception(f"Unknown return value from NetRotCtl! ({data})")
+        self.netrotctl.reset(2)  # Reset motor driver
+
+
+class SimulatedRotator(GenericRotator):
+    """
+    Rotator without hardware, which reaches every target position instantly, e.g. for offline benchmarking
+    """
+
+    position: Position
+    target_position: Position
+
+    min_poll_interval: float = 0
+    max_poll_interval: float = 0
+
+    def __init__(self, positioning_tolerance: float = None):
+        super().__init__(
+            positioning_tolerance=0.1
+            if positioning_tolerance is None
+            else positioning_tolerance
+        )
+        self.position = Position(0.0, 0.0)
+        self.target_position = self.position
+
+    def set_position(self, position: Position):
+        super().set_position(position)
+        self.position = position
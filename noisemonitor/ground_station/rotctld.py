@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import socket
+import asyncio
+import threading
+
+from .data_structures import Position
+
+
+class RotctldError(Exception):
+    """
+    Error reported by rotctld with a negative RPRT code
+    """
+
+    def __init__(self, command: str, code: int):
+        super().__init__(f"rotctld rejected '{command}' with RPRT {code}!")
+        self.command = command
+        self.code = code
+
+
+def encode_commands(commands: [str]) -> bytes:
+    """
+    This function encodes rotctld commands in the extended response mode, so they can be sent at once.
+    :param commands: rotctld commands without the extended response prefix, e.g. "p" or "P 180.0 45.0"
+    :return: The encoded commands
+    """
+    return "".join(f"+{c}\n" for c in commands).encode()
+
+
+class ReplyParser:
+    """
+    Parser of one extended rotctld reply, which is fed line by line, independent of how the lines are read
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.code = None
+
+    def feed(self, line: str) -> bool:
+        """
+        This function parses one line of the reply.
+        :param line: The line without its line break
+        :return: True, if the reply is complete
+        """
+        # extended replies echo the command, list "key: value" lines and end with "RPRT <code>"
+        line = line.strip()
+        if line.startswith("RPRT"):
+            self.code = int(line.split()[1])
+            return True
+        key, separator, value = line.partition(":")
+        if separator and value.strip():
+            self.values[key.strip()] = value.strip()
+        return False
+
+
+def check_replies(commands: [str], replies: [ReplyParser]) -> [dict]:
+    """
+    This function raises an error, if any of the commands was rejected.
+    :param commands: The commands
+    :param replies: The parsed reply of each command
+    :return: The values of each reply
+    """
+    for command, reply in zip(commands, replies):
+        if reply.code != 0:
+            raise RotctldError(command, reply.code)
+    return [reply.values for reply in replies]
+
+
+def set_position_command(position: Position) -> str:
+    return f"P {position.azimuth:.3f} {position.elevation:.3f}"
+
+
+def parse_position(reply: dict) -> Position:
+    try:
+        return Position(float(reply["Azimuth"]), float(reply["Elevation"]))
+    except (KeyError, ValueError):
+        raise Exception(f"Unknown return value from NetRotCtl! ({reply})")
+
+
+class RotctldClient:
+    """
+    Line buffered client of hamlib's rotctld protocol, using the extended response mode.
+    Several commands can be sent at once, their replies are read in order afterwards.
+    """
+
+    host: str
+    port: int
+    timeout: float
+
+    def __init__(self, host: str, port: int, timeout: float = 5.0):
+        """
+        This function initializes the client and connects to rotctld.
+        :param host: The IP address or host name of the rotctld server
+        :param port: The port of the rotctld server
+        :param timeout: The maximum time in seconds to wait for a reply
+        """
+        self.host = str(host)
+        self.port = int(port)
+        self.timeout = float(timeout)
+        self._socket = None
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self.connect()
+
+    def connect(self):
+        """
+        This function (re-)connects to the rotctld server.
+        :return: None
+        """
+        self.close()
+        self._socket = socket.create_connection(
+            (self.host, self.port), timeout=self.timeout
+        )
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._buffer.clear()
+
+    def close(self):
+        """
+        This function closes the connection to the rotctld server.
+        :return: None
+        """
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
+    def execute(self, *commands: str) -> [dict]:
+        """
+        This function sends all commands at once and reads their replies.
+        :param commands: rotctld commands without the extended response prefix, e.g. "p" or "P 180.0 45.0"
+        :return: The values of each reply, e.g. [{"Azimuth": "180.000000", "Elevation": "45.000000"}]
+        """
+        with self._lock:
+            self._socket.sendall(encode_commands(commands))
+            # read all replies, even if one of them reports an error
+            replies = [self._read_reply() for _ in commands]
+        return check_replies(commands, replies)
+
+    def get_position(self) -> Position:
+        """
+        This function queries the current position of the rotator.
+        :return: The current position
+        """
+        (reply,) = self.execute("p")
+        return parse_position(reply)
+
+    def set_position(self, position: Position):
+        """
+        This function sets the target position of the rotator.
+        :param position: The target position
+        :return: None
+        """
+        self.execute(set_position_command(position))
+
+    def set_and_get_position(self, position: Position) -> Position:
+        """
+        This function sets the target position and queries the current position within one round trip.
+        :param position: The target position
+        :return: The current position
+        """
+        _, reply = self.execute(set_position_command(position), "p")
+        return parse_position(reply)
+
+    def stop(self):
+        """
+        This function stops the motion of the rotator.
+        :return: None
+        """
+        self.execute("S")
+
+    def reset(self, reset_type: int = 2):
+        """
+        This function resets the rotator controller.
+        :param reset_type: The hamlib reset type, e.g. 2 to reset the motor driver
+        :return: None
+        """
+        self.execute(f"R {int(reset_type)}")
+
+    def _read_line(self) -> str:
+        while True:
+            end = self._buffer.find(b"\n")
+            if end >= 0:
+                line = self._buffer[:end]
+                del self._buffer[: end + 1]
+                return line.decode("utf-8").strip()
+            data = self._socket.recv(4096)
+            if not data:
+                raise ConnectionError("rotctld closed the connection!")
+            self._buffer += data
+
+    def _read_reply(self) -> ReplyParser:
+        reply = ReplyParser()
+        while not reply.feed(self._read_line()):
+            pass
+        return reply
+
+
+class AsyncRotctldClient:
+    """
+    Asyncio client of hamlib's rotctld protocol, the counterpart of RotctldClient on a non-blocking connection.
+    Several commands can be sent at once, their replies are read in order afterwards.
+    """
+
+    host: str
+    port: int
+    timeout: float
+
+    def __init__(self, host: str, port: int, timeout: float = 5.0):
+        """
+        This function initializes the client, it connects to rotctld with the first command.
+        :param host: The IP address or host name of the rotctld server
+        :param port: The port of the rotctld server
+        :param timeout: The maximum time in seconds to wait for a reply
+        """
+        self.host = str(host)
+        self.port = int(port)
+        self.timeout = float(timeout)
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        """
+        This function (re-)connects to the rotctld server.
+        :return: None
+        """
+        await self.close()
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        sock = self._writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    async def close(self):
+        """
+        This function closes the connection to the rotctld server.
+        :return: None
+        """
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+            self._reader, self._writer = None, None
+
+    async def execute(self, *commands: str) -> [dict]:
+        """
+        This function sends all commands at once and reads their replies.
+        :param commands: rotctld commands without the extended response prefix, e.g. "p" or "P 180.0 45.0"
+        :return: The values of each reply, e.g. [{"Azimuth": "180.000000", "Elevation": "45.000000"}]
+        """
+        async with self._lock:
+            if self._writer is None:
+                await self.connect()
+            try:
+                self._writer.write(encode_commands(commands))
+                await self._writer.drain()
+                # read all replies, even if one of them reports an error
+                replies = [await self._read_reply() for _ in commands]
+            except BaseException:
+                # a partially read reply would shift all following replies
+                self._writer.close()
+                self._reader, self._writer = None, None
+                raise
+        return check_replies(commands, replies)
+
+    async def get_position(self) -> Position:
+        """
+        This function queries the current position of the rotator.
+        :return: The current position
+        """
+        (reply,) = await self.execute("p")
+        return parse_position(reply)
+
+    async def set_position(self, position: Position):
+        """
+        This function sets the target position of the rotator.
+        :param position: The target position
+        :return: None
+        """
+        await self.execute(set_position_command(position))
+
+    async def set_and_get_position(self, position: Position) -> Position:
+        """
+        This function sets the target position and queries the current position within one round trip.
+        :param position: The target position
+        :return: The current position
+        """
+        _, reply = await self.execute(set_position_command(position), "p")
+        return parse_position(reply)
+
+    async def stop(self):
+        """
+        This function stops the motion of the rotator.
+        :return: None
+        """
+        await self.execute("S")
+
+    async def reset(self, reset_type: int = 2):
+        """
+        This function resets the rotator controller.
+        :param reset_type: The hamlib reset type, e.g. 2 to reset the motor driver
+        :return: None
+        """
+        await self.execute(f"R {int(reset_type)}")
+
+    async def _read_reply(self) -> ReplyParser:
+        reply = ReplyParser()
+        while True:
+            line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+            if not line:
+                raise ConnectionError("rotctld closed the connection!")
+            if reply.feed(line.decode("utf-8")):
+                return reply
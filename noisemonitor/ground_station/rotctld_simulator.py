@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import argparse
+import random
+import socketserver
+import threading
+import time
+
+
+class SimulatedAxis:
+    """
+    One axis of a simulated rotator, moving with a trapezoidal velocity profile
+    """
+
+    rate: float  # in degree per second
+    acceleration: float  # in degree per second², None = reaches its slew rate instantly
+    backlash: float  # in degree, play of the gear between motor and dish
+    minimum: float
+    maximum: float
+
+    def __init__(
+        self,
+        rate: float,
+        acceleration: float = None,
+        backlash: float = 0.0,
+        limits: (float, float) = (0.0, 360.0),
+        position: float = 0.0,
+    ):
+        self.rate = float(rate)
+        self.acceleration = None if acceleration is None else float(acceleration)
+        self.backlash = float(backlash)
+        self.minimum, self.maximum = float(limits[0]), float(limits[1])
+        self.motor = float(position)
+        self.dish = float(position)
+        self.target = float(position)
+        self.velocity = 0.0
+
+    def step(self, dt: float):
+        """
+        This function advances the axis by the given time.
+        :param dt: The time step in seconds
+        :return: None
+        """
+        remaining = self.target - self.motor
+        direction = 1.0 if remaining > 0 else -1.0
+        if self.acceleration is None:
+            self.velocity = direction * min(self.rate, abs(remaining) / dt)
+        else:
+            # fastest velocity, which still allows to brake until the target
+            desired = direction * min(
+                self.rate,
+                (2 * self.acceleration * abs(remaining)) ** 0.5,
+                abs(remaining) / dt,
+            )
+            change = self.acceleration * dt
+            self.velocity += max(-change, min(change, desired - self.velocity))
+        self.motor += self.velocity * dt
+        # the dish only follows the motor, once the play of the gear is taken up
+        half_play = self.backlash / 2
+        self.dish = min(max(self.dish, self.motor - half_play), self.motor + half_play)
+
+    def stop(self):
+        if self.acceleration is None or self.velocity == 0:
+            self.target = self.motor
+        else:
+            # stop as fast as possible
+            braking = self.velocity**2 / (2 * self.acceleration)
+            self.target = self.motor + (braking if self.velocity > 0 else -braking)
+
+
+class SimulatedRotatorModel:
+    """
+    Azimuth/elevation rotator with slew rate, acceleration, backlash, reading jitter and resolution per axis
+    """
+
+    def __init__(
+        self,
+        rate_azimuth: float = 2.0,
+        rate_elevation: float = 2.0,
+        acceleration: float = None,
+        backlash: float = 0.0,
+        jitter: float = 0.0,
+        resolution: float = 0.1,
+        error_rate: float = 0.0,
+        azimuth_limits: (float, float) = (0.0, 360.0),
+        elevation_limits: (float, float) = (0.0, 90.0),
+        position: (float, float) = None,
+        seed: int = None,
+    ):
+        """
+        This function initializes the rotator model.
+        :param rate_azimuth: The slew rate of the azimuth axis in degree per second
+        :param rate_elevation: The slew rate of the elevation axis in degree per second
+        :param acceleration: The acceleration of both axes in degree per second², None for an instant acceleration
+        :param backlash: The play of the gears of both axes in degree
+        :param jitter: The standard deviation of the noise of each position reading in degree
+        :param resolution: The resolution of the position readings in degree
+        :param error_rate: The probability, that a command is answered with an error
+        :param azimuth_limits: The range of azimuth angles, which can be set
+        :param elevation_limits: The range of elevation angles, which can be set
+        :param position: The initial azimuth and elevation, defaults to the lower limits
+        :param seed: The seed of the random number generator
+        """
+        if position is None:
+            position = (azimuth_limits[0], elevation_limits[0])
+        self.azimuth = SimulatedAxis(
+            rate_azimuth, acceleration, backlash, azimuth_limits, position[0]
+        )
+        self.elevation = SimulatedAxis(
+            rate_elevation, acceleration, backlash, elevation_limits, position[1]
+        )
+        self.jitter = float(jitter)
+        self.resolution = float(resolution)
+        self.error_rate = float(error_rate)
+        self._random = random.Random(seed)
+        self._time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def update(self):
+        """
+        This function advances the model to the current time.
+        :return: None
+        """
+        now = time.monotonic()
+        steps = max(1, int((now - self._time) / 0.01))
+        dt = (now - self._time) / steps
+        if dt > 0:
+            for _ in range(steps):
+                self.azimuth.step(dt)
+                self.elevation.step(dt)
+        self._time = now
+
+    def fails(self) -> bool:
+        return self._random.random() < self.error_rate
+
+    def get_position(self) -> (float, float):
+        with self._lock:
+            self.update()
+            return self._read(self.azimuth.dish), self._read(self.elevation.dish)
+
+    def set_position(self, azimuth: float, elevation: float) -> bool:
+        with self._lock:
+            if not (
+                self.azimuth.minimum <= azimuth <= self.azimuth.maximum
+                and self.elevation.minimum <= elevation <= self.elevation.maximum
+            ):
+                return False
+            self.update()
+            self.azimuth.target = azimuth
+            self.elevation.target = elevation
+            return True
+
+    def stop(self):
+        with self._lock:
+            self.update()
+            self.azimuth.stop()
+            self.elevation.stop()
+
+    def _read(self, position: float) -> float:
+        position += self._random.gauss(0.0, self.jitter) if self.jitter > 0 else 0.0
+        if self.resolution > 0:
+            position = round(position / self.resolution) * self.resolution
+        return position
+
+
+class _RotctldHandler(socketserver.StreamRequestHandler):
+    # hamlib error codes
+    OK, EINVAL, ETIMEOUT, ENIMPL = 0, -1, -5, -4
+
+    def handle(self):
+        model = self.server.model
+        for raw in self.rfile:
+            line = raw.decode("utf-8", errors="replace").strip()
+            if not line:
+                continue
+            extended = line.startswith("+")
+            command, *args = line.lstrip("+").split()
+            if model.fails():
+                self._reply(extended, f"{command}:", [], self.ETIMEOUT)
+                continue
+            if command in ("p", "get_pos"):
+                azimuth, elevation = model.get_position()
+                if extended:
+                    self._reply(
+                        extended,
+                        "get_pos:",
+                        [f"Azimuth: {azimuth:.6f}", f"Elevation: {elevation:.6f}"],
+                        self.OK,
+                    )
+                else:
+                    self.wfile.write(f"{azimuth:.6f}\n{elevation:.6f}\n".encode())
+            elif command in ("P", "set_pos") and len(args) == 2:
+                try:
+                    accepted = model.set_position(float(args[0]), float(args[1]))
+                except ValueError:
+                    accepted = False
+                code = self.OK if accepted else self.EINVAL
+                self._reply(extended, f"set_pos: {args[0]} {args[1]}", [], code)
+            elif command in ("S", "stop"):
+                model.stop()
+                self._reply(extended, "stop:", [], self.OK)
+            elif command in ("R", "reset"):
+                model.stop()
+                self._reply(extended, f"reset: {' '.join(args)}", [], self.OK)
+            elif command in ("q", "Q"):
+                return
+            else:
+                self._reply(extended, f"{command}:", [], self.ENIMPL)
+
+    def _reply(self, extended: bool, echo: str, values: [str], code: int):
+        lines = [echo, *values] if extended else []
+        self.wfile.write("".join(f"{x}\n" for x in lines + [f"RPRT {code}"]).encode())
+
+
+class RotctldSimulator(socketserver.ThreadingTCPServer):
+    """
+    Local TCP server speaking the subset of hamlib's rotctld protocol used by the SPID rotator driver
+    (p, P, S, R in normal and extended response mode), backed by a SimulatedRotatorModel
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        model: SimulatedRotatorModel = None,
+    ):
+        """
+        This function initializes the simulator and binds its socket.
+        :param host: The address the server listens on
+        :param port: The port the server listens on, 0 selects a free port
+        :param model: The simulated rotator, defaults to a rotator without acceleration, backlash or jitter
+        """
+        self.model = SimulatedRotatorModel() if model is None else model
+        super().__init__((host, port), _RotctldHandler)
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> RotctldSimulator:
+        """
+        This function serves clients on a background thread.
+        :return: self
+        """
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="rotctld-simulator", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        This function stops serving clients and closes the socket.
+        :return: None
+        """
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self) -> RotctldSimulator:
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Simulates a rotator behind a rotctld server, e.g. for tests and benchmarks"
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4533)
+    parser.add_argument("--rate_azimuth", type=float, default=2.0, help="in deg/s")
+    parser.add_argument("--rate_elevation", type=float, default=2.0, help="in deg/s")
+    parser.add_argument("--acceleration", type=float, default=None, help="in deg/s^2")
+    parser.add_argument("--backlash", type=float, default=0.0, help="in deg")
+    parser.add_argument("--jitter", type=float, default=0.0, help="in deg")
+    parser.add_argument("--resolution", type=float, default=0.1, help="in deg")
+    parser.add_argument(
+        "--error_rate", type=float, default=0.0, help="probability of error replies"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--benchmark",
+        type=int,
+        default=0,
+        help="Move the SPID rotator driver through a grid of this many points and report the settle times",
+    )
+    args = parser.parse_args()
+
+    simulator = RotctldSimulator(
+        host=args.host,
+        port=args.port,
+        model=SimulatedRotatorModel(
+            rate_azimuth=args.rate_azimuth,
+            rate_elevation=args.rate_elevation,
+            acceleration=args.acceleration,
+            backlash=args.backlash,
+            jitter=args.jitter,
+            resolution=args.resolution,
+            error_rate=args.error_rate,
+            position=(180.0, 20.0),
+            seed=args.seed,
+        ),
+    )
+    if args.benchmark < 1:
+        print(f"rotctld simulator listening on {args.host}:{simulator.port}")
+        try:
+            simulator.serve_forever()
+        except KeyboardInterrupt:
+            simulator.server_close()
+    else:
+        from .rotator import Rotator
+        from .data_structures import Position
+
+        with simulator:
+            rotator = Rotator(
+                "spid", netrotctl_ip=args.host, netrotctl_port=simulator.port
+            )
+            side = max(1, round(args.benchmark**0.5))
+            points = [
+                Position(180 + 2 * (c if r % 2 == 0 else side - c - 1), 20 + 2 * r)
+                for r in range(side)
+                for c in range(side)
+            ]
+            settle_times, retries, failures = [], 0, 0
+            t_start = time.monotonic()
+            for point in points:
+                # retry once after resetting the motor driver, as the sweep does
+                for attempt in range(2):
+                    try:
+                        if attempt > 0:
+                            retries += 1
+                            rotator.reset_motor_driver()
+                        rotator.move_rotator_to_position(point)
+                        settle_times.append(rotator.last_settle_event.settle_time)
+                        break
+                    except Exception as e:
+                        print(f"Move to {point} failed: {e}")
+                else:
+                    failures += 1
+            duration = time.monotonic() - t_start
+            print(
+                f"{len(settle_times)} moves in {duration:.1f}s, "
+                f"settle time mean {sum(settle_times) / max(1, len(settle_times)):.2f}s, "
+                f"max {max(settle_times, default=0):.2f}s, "
+                f"{retries} retries, {failures} failed"
+            )
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+import numpy as np
+
+from .data_structures import Position, PSDLevels, MeasurementPoint
+from .psd_buffer import average_psd_levels
+
+
+class PositionTrack:
+    """
+    Timestamped position readings of the rotator, which can be interpolated in time
+    """
+
+    def __init__(self, maxlen: int = None):
+        """
+        This function initializes the empty track.
+        :param maxlen: The maximum number of readings, older readings are dropped. If None, the track is unbounded.
+        """
+        self._times = deque(maxlen=maxlen)
+        self._azimuths = deque(maxlen=maxlen)
+        self._elevations = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    def append(self, timestamp: float, position: Position):
+        """
+        This function adds a position reading to the track.
+        :param timestamp: Point in time of the reading, in time.monotonic()
+        :param position: The position reading
+        :return: None
+        """
+        with self._lock:
+            self._times.append(float(timestamp))
+            self._azimuths.append(float(position.azimuth))
+            self._elevations.append(float(position.elevation))
+
+    def interpolate(self, timestamps: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        This function linearly interpolates the position at the given points in time.
+        Points in time outside the track are clamped to its first or last reading.
+        :param timestamps: Points in time, in time.monotonic()
+        :return: Arrays of the interpolated azimuth and elevation angles
+        """
+        with self._lock:
+            times = np.asarray(self._times)
+            azimuths = np.asarray(self._azimuths)
+            elevations = np.asarray(self._elevations)
+        if times.size < 1:
+            raise ValueError("The position track does not contain any readings!")
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+        # interpolate the azimuth across 0/360°
+        azimuths = np.unwrap(azimuths[order], period=360)
+        azimuth = np.interp(timestamps, times, azimuths) % 360
+        elevation = np.interp(timestamps, times, elevations[order])
+        return azimuth, elevation
+
+    def position_at(self, timestamp: float) -> Position:
+        """
+        This function returns the interpolated position at the given point in time.
+        :param timestamp: Point in time, in time.monotonic()
+        :return: The interpolated position
+        """
+        azimuth, elevation = self.interpolate(np.asarray([timestamp]))
+        return Position(float(azimuth[0]), float(elevation[0]))
+
+
+def bin_frames(
+    frames: [PSDLevels],
+    track: PositionTrack,
+    rows: [(float, float, [Position])],
+    sdr: str = None,
+) -> [MeasurementPoint]:
+    """
+    This function assigns PSD frames captured while scanning to the points of the scan grid.
+    Each frame is located at the interpolated position at the middle of its integration. Frames of the same grid
+    point are averaged.
+    :param frames: PSD frames captured during the scan
+    :param track: The position readings of the rotator during the scan
+    :param rows: The rows of the scan given as (start, stop, grid points), with the time the rotator scanned
+        along the row, in time.monotonic()
+    :param sdr: The name of the SDR, which captured the frames
+    :return: List of MeasurementPoints, one per grid point, which was hit by at least one frame
+    """
+    frames = [f for f in frames if f.capture_start is not None]
+    if len(frames) < 1 or len(track) < 1:
+        return []
+    starts = np.asarray([f.capture_start for f in frames])
+    stops = np.asarray([f.capture_stop for f in frames])
+    azimuths, elevations = track.interpolate((starts + stops) / 2)
+    measurement_points = []
+    for row_start, row_stop, grid in rows:
+        in_row = np.flatnonzero((starts >= row_start) & (stops <= row_stop))
+        if in_row.size < 1:
+            continue
+        grid_az = np.asarray([p.azimuth for p in grid])
+        # frames are assigned to the closest grid point within half the grid spacing
+        spacing = np.inf
+        if grid_az.size > 1:
+            spacing = np.abs((np.diff(grid_az) + 180) % 360 - 180).min()
+        distance = np.abs(
+            (azimuths[in_row, None] - grid_az[None, :] + 180) % 360 - 180
+        )
+        closest = distance.argmin(axis=1)
+        in_reach = distance[np.arange(in_row.size), closest] <= spacing / 2
+        for index, target_position in enumerate(grid):
+            hits = in_row[(closest == index) & in_reach]
+            if hits.size < 1:
+                continue
+            offsets = (azimuths[hits] - target_position.azimuth + 180) % 360 - 180
+            measurement_points.append(
+                MeasurementPoint(
+                    target_position=target_position,
+                    measurement_position=Position(
+                        float((target_position.azimuth + offsets.mean()) % 360),
+                        float(elevations[hits].mean()),
+                    ),
+                    psd_levels=average_psd_levels([frames[i] for i in hits]),
+                    sdr=sdr,
+                )
+            )
+    return measurement_points
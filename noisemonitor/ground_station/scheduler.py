@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict, fields
+
+from .controller import GroundStationController
+from .astronomical_object import AstroObject
+from .config_parser import load_config_from_file
+
+JOB_KINDS = ("sweep", "continuous", "adaptive", "track", "monitor")
+
+
+@dataclass
+class ScheduledJob:
+    """
+    A job of the scheduler, which runs on one ground station once its trigger is met
+    """
+
+    station: str  # path of the config file of the ground station
+    kind: str = "sweep"  # "sweep", "continuous", "adaptive", "track" or "monitor"
+    start_time: float = None  # UTC trigger, in seconds since epoch, None = as soon as possible
+    trigger_object: str = None  # elevation trigger, e.g. "sun" or "moon"
+    trigger_elevation: float = None  # in degree, the job starts once the trigger object is above
+    target_object: str = None  # defaults to the target object of the config
+    azimuth: float = None  # in degree, fixed target position instead of the target object
+    elevation: float = None  # in degree, fixed target position instead of the target object
+    duration: float = 3600.0  # in seconds, only "track" and "monitor" jobs
+    interval: float = 0.0  # in seconds, time between two measurements of "monitor" jobs
+    time_budget: float = None  # in seconds, "sweep" jobs measure the densest grid that fits
+    take_images: bool = False
+    optimize_path: bool = None  # defaults to the optimize_path setting of the config
+    job_id: str = None
+    state: str = "queued"  # "queued", "running", "finished", "failed" or "cancelled"
+    created: float = None  # in seconds since epoch
+    started: float = None  # in seconds since epoch
+    finished: float = None  # in seconds since epoch
+    sweep_log: str = None
+    data_file: str = None
+    error: str = None
+
+    def __post_init__(self):
+        if self.kind not in JOB_KINDS:
+            raise ValueError(
+                f"Unknown job kind {self.kind}, expected one of {JOB_KINDS}!"
+            )
+        if (self.trigger_object is None) != (self.trigger_elevation is None):
+            raise ValueError("An elevation trigger needs an object and an elevation!")
+        if self.kind == "monitor" and (self.azimuth is None or self.elevation is None):
+            raise ValueError("A monitor job needs a fixed azimuth and elevation!")
+        if self.job_id is None:
+            self.job_id = uuid.uuid4().hex[:8]
+        if self.created is None:
+            self.created = time.time()
+
+    def as_dict(self):
+        return asdict(self)
+
+
+class JobQueue:
+    """
+    Persistent job queue in a JSON file, which can be shared between the scheduler and other processes.
+    Every change locks the file, reloads it, and replaces it atomically, so concurrent changes are never lost.
+    """
+
+    file_path: str
+
+    def __init__(self, file_path: str):
+        """
+        This function initializes the job queue.
+        :param file_path: The path of the JSON file, which is created if it does not exist
+        """
+        self.file_path = str(file_path)
+        self._lock_path = self.file_path + ".lock"
+        self._thread_lock = threading.Lock()
+
+    def jobs(self) -> [ScheduledJob]:
+        """
+        This function loads all jobs of the queue.
+        :return: The jobs in the order they were added
+        """
+        if not os.path.exists(self.file_path):
+            return []
+        with open(self.file_path, "r") as f:
+            records = json.load(f)
+        names = {f.name for f in fields(ScheduledJob)}
+        return [
+            ScheduledJob(**{k: v for k, v in r.items() if k in names})
+            for r in records
+        ]
+
+    def get(self, job_id: str) -> ScheduledJob:
+        for job in self.jobs():
+            if job.job_id == job_id:
+                return job
+        raise KeyError(f"There is no job {job_id}!")
+
+    def add(self, job: ScheduledJob) -> ScheduledJob:
+        """
+        This function adds a job to the queue.
+        :param job: The job
+        :return: The added job
+        """
+        with self._locked() as jobs:
+            jobs.append(job)
+        return job
+
+    def update(self, job_id: str, **values) -> ScheduledJob:
+        """
+        This function changes the given attributes of a job.
+        :param job_id: The id of the job
+        :return: The changed job
+        """
+        with self._locked() as jobs:
+            for job in jobs:
+                if job.job_id == job_id:
+                    for key, value in values.items():
+                        setattr(job, key, value)
+                    return job
+        raise KeyError(f"There is no job {job_id}!")
+
+    def cancel(self, job_id: str) -> ScheduledJob:
+        """
+        This function cancels a job, which did not start yet.
+        :param job_id: The id of the job
+        :return: The cancelled job
+        """
+        with self._locked() as jobs:
+            for job in jobs:
+                if job.job_id == job_id:
+                    if job.state != "queued":
+                        raise Exception(f"The job {job_id} is {job.state} already!")
+                    job.state = "cancelled"
+                    return job
+        raise KeyError(f"There is no job {job_id}!")
+
+    @contextmanager
+    def _locked(self):
+        # yields the jobs, which are written back, if no exception occurred
+        self._acquire()
+        try:
+            jobs = self.jobs()
+            yield jobs
+            self._write(jobs)
+        finally:
+            self._release()
+
+    def _acquire(self, timeout: float = 30.0, stale: float = 60.0):
+        # lock file, which works across processes and platforms
+        self._thread_lock.acquire()
+        deadline = time.time() + timeout
+        while True:
+            try:
+                flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY
+                os.close(os.open(self._lock_path, flags))
+                return
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self._lock_path) > stale:
+                        # left behind by a crashed process
+                        os.remove(self._lock_path)
+                        continue
+                except OSError:
+                    continue
+                if time.time() > deadline:
+                    self._thread_lock.release()
+                    raise TimeoutError(
+                        f"Could not lock the job queue {self.file_path}!"
+                    )
+                time.sleep(0.05)
+
+    def _release(self):
+        try:
+            os.remove(self._lock_path)
+        finally:
+            self._thread_lock.release()
+
+    def _write(self, jobs: [ScheduledJob]):
+        temp_path = self.file_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump([job.as_dict() for job in jobs], f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.file_path)
+
+
+class Scheduler:
+    """
+    Long-running service, which runs the jobs of a job queue once their triggers are met. The ground stations
+    are set up once and kept ready between jobs, each station runs one job at a time and queued jobs of a station
+    run back-to-back.
+    """
+
+    queue: JobQueue
+    output_dir: str
+    poll_interval: float
+
+    def __init__(
+        self, queue: JobQueue, output_dir: str = ".", poll_interval: float = 10.0
+    ):
+        """
+        This function initializes the scheduler.
+        :param queue: The job queue
+        :param output_dir: The directory of the sweep logs and sweep data files of all jobs
+        :param poll_interval: The longest time between two checks of the job triggers in seconds
+        """
+        self.queue = queue
+        self.output_dir = str(output_dir)
+        self.poll_interval = float(poll_interval)
+        self.controllers = {}
+        self._astro_objects = {}
+        self._busy = {}  # station -> id of the running job
+        # SDR detection and device setup are not safe to run concurrently
+        self._setup_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        """
+        This function runs the jobs of the queue, until stop is called.
+        Jobs, which were running when a previous scheduler stopped, are queued again and resume their sweep log.
+        :return: None
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        for job in self.queue.jobs():
+            if job.state == "running":
+                print(f"Requeue interrupted job {job.job_id}")
+                self.queue.update(job.job_id, state="queued")
+        print(f"Scheduler is running, job queue {self.queue.file_path}")
+        while not self._stop_event.is_set():
+            self._wake.clear()
+            try:
+                self._start_due_jobs()
+            except Exception as e:
+                print(f"Could not check the job queue due to Exception: {e}")
+            self._wake.wait(self.poll_interval)
+        self.shutdown()
+
+    def stop(self):
+        """
+        This function stops the scheduler after the running jobs finished.
+        :return: None
+        """
+        self._stop_event.set()
+        self._wake.set()
+
+    def shutdown(self):
+        """
+        This function stops the scheduler, waits for the running jobs to finish and stops the SDRs of all stations.
+        It is called by run and has to be called, if run was interrupted, e.g. by a KeyboardInterrupt.
+        :return: None
+        """
+        self.stop()
+        for thread in list(self._busy.values()):
+            thread.join()
+        for controller in list(self.controllers.values()):
+            try:
+                controller.ground_station.stop_rx()
+            except Exception as e:
+                print(f"Could not stop the SDRs due to Exception: {e}")
+
+    def _start_due_jobs(self):
+        queued = [job for job in self.queue.jobs() if job.state == "queued"]
+        for job in sorted(queued, key=lambda j: (j.start_time or j.created, j.created)):
+            station = os.path.abspath(job.station)
+            # one job at a time per station, in the order of their start times
+            if station in self._busy or not self._triggered(job):
+                continue
+            self.queue.update(job.job_id, state="running", started=time.time())
+            thread = threading.Thread(
+                target=self._run_job,
+                args=(job, station),
+                name=f"job-{job.job_id}",
+                daemon=True,
+            )
+            self._busy[station] = thread
+            thread.start()
+
+    def _triggered(self, job: ScheduledJob) -> bool:
+        if job.start_time is not None and time.time() < job.start_time:
+            return False
+        if job.trigger_object is not None:
+            location = load_config_from_file(job.station)["groundstation"]["location"]
+            position = self._astro_object(job.trigger_object, location).get_position(
+                time.time()
+            )
+            return position.elevation >= job.trigger_elevation
+        return True
+
+    def _astro_object(self, object_name: str, location) -> AstroObject:
+        key = (object_name.lower(), location)
+        if key not in self._astro_objects:
+            self._astro_objects[key] = AstroObject(object_name, location)
+        return self._astro_objects[key]
+
+    def _controller(self, station: str) -> GroundStationController:
+        # set up once, the hardware stays ready for the following jobs of the station
+        with self._setup_lock:
+            if station not in self.controllers:
+                controller = GroundStationController(config_file=station)
+                # the SDRs keep receiving between the jobs and are stopped with the scheduler
+                controller.keep_rx = True
+                self.controllers[station] = controller
+            return self.controllers[station]
+
+    def _run_job(self, job: ScheduledJob, station: str):
+        print(f"Start {job.kind} job {job.job_id} on {job.station}")
+        values = {}
+        try:
+            controller = self._controller(station)
+            astro_object = controller.astro_object
+            try:
+                values = self._execute(job, controller)
+            finally:
+                # the next job of the station targets the object of the config again
+                controller.astro_object = astro_object
+            values["state"] = "finished"
+        except Exception as e:
+            print(f"Job {job.job_id} failed due to Exception: {e}")
+            values.update(state="failed", error=str(e))
+            controller = self.controllers.get(station)
+            if controller is not None:
+                # the next job starts the SDRs again, in case they caused the failure
+                try:
+                    controller.ground_station.stop_rx()
+                except Exception as e:
+                    print(f"Could not stop the SDRs due to Exception: {e}")
+        finally:
+            controller = self.controllers.get(station)
+            if controller is not None:
+                controller.close_sweep_log()
+            values["finished"] = time.time()
+            try:
+                job = self.queue.update(job.job_id, **values)
+            except Exception as e:
+                print(f"Could not update job {job.job_id} due to Exception: {e}")
+            self._busy.pop(station, None)
+            # the next job of the station starts without waiting for the next poll
+            self._wake.set()
+        print(f"Job {job.job_id} {job.state}")
+
+    def _execute(self, job: ScheduledJob, controller: GroundStationController) -> dict:
+        name = os.path.splitext(os.path.basename(job.station))[0]
+        prefix = os.path.join(self.output_dir, f"{name}_{job.job_id}")
+        controller.measurement_points.clear()
+        sweep_log = job.sweep_log or f"{prefix}_sweep_log.jsonl"
+        if job.kind != "track":
+            self.queue.update(job.job_id, sweep_log=sweep_log)
+            controller.open_sweep_log(sweep_log)
+        # a sweep, which was interrupted after its start was logged, resumes its sweep log,
+        # all others start from scratch, e.g. if the job failed while planning its path
+        resume = job.kind == "sweep" and controller.sweep_log.resumable
+        if resume:
+            controller.resume_sweep()
+        if job.target_object is not None:
+            controller.astro_object = self._astro_object(
+                job.target_object, controller.ground_station.location
+            )
+        if job.azimuth is not None and job.elevation is not None:
+            controller.set_target_position(job.azimuth, job.elevation)
+        elif job.kind != "track":
+            controller.set_target_position_to_astro_object()
+
+        if job.kind == "monitor":
+            controller.monitor_position(
+                controller.target_position,
+                duration_s=job.duration,
+                interval_s=job.interval,
+            )
+        elif job.kind == "track":
+            data_file = f"{prefix}_tracking_errors_{int(time.time())}.csv"
+            controller.track_object(
+                duration_s=job.duration, predictive=True, log_file=data_file
+            )
+            return {"data_file": data_file}
+        elif job.kind == "adaptive":
+            controller.adaptive_sweep(take_images=job.take_images)
+        elif job.kind == "continuous":
+            controller.compute_path(optimize=False)
+            controller.scan_motion_path()
+        elif resume:
+            controller.track_motion_path(
+                take_images=job.take_images,
+                resume=True,
+                deadline=None
+                if job.time_budget is None
+                else time.time() + job.time_budget,
+                optimize=job.optimize_path,
+            )
+        elif job.time_budget is not None:
+            controller.budgeted_sweep(
+                time_budget=job.time_budget,
+                optimize=job.optimize_path,
+                take_images=job.take_images,
+            )
+        else:
+            controller.compute_path(optimize=job.optimize_path)
+            controller.track_motion_path(take_images=job.take_images)
+
+        if len(controller.measurement_points) < 1:
+            return {}
+        data_file = f"{prefix}_sweep_data_{int(time.time())}.csv"
+        controller.get_measurement_points_as_dataframe().to_csv(data_file)
+        return {"data_file": data_file}
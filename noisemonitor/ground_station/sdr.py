@@ -1,16 +1,37 @@
 from __future__ import annotations
 
 import io
+import glob
+import json
+import hashlib
 import subprocess
 import time
 import os
+import queue
 import signal
-import pandas as pd
+import threading
+import numpy as np
 
-from .data_structures import PSDLevels
+from .data_structures import PSDLevels, Position
+from .psd_engine import PSDEngine, IQSource, SoapyIQSource, SyntheticIQSource
+from .psd_buffer import (
+    PSDFrameBuffer,
+    PSDStatistics,
+    PSDStreamClosed,
+    average_psd_levels,
+)
+from .replay import SweepFileReplay, GaussianBeamModel
+from .soapy_power import read_bin_frames
+
+DETECTION_CACHE_FILE = os.path.join(
+    os.path.expanduser("~"), ".cache", "noisemonitor", "sdr_devices.json"
+)
+DETECTION_CACHE_TTL = 24 * 3600  # in seconds
 
 
 class SDR:
+    name: str = None
+    frequencies: [float] = None
     _sdr: GenericSDR = None
 
     def __init__(
@@ -19,6 +40,21 @@ class SDR:
         device_driver: str = None,
         lna_gain: float = None,
         psd_bins: int = None,
+        backend: str = None,
+        tune_delay: float = None,
+        device_args: str = None,
+        name: str = None,
+        frequencies: [float] = None,
+        frame_time: float = None,
+        min_integration_time: float = None,
+        max_integration_time: float = None,
+        target_std_error: float = None,
+        target_snr: float = None,
+        replay_file: str = None,
+        replay_source=None,
+        replay_speed: float = None,
+        hpbw: (float, float) = None,
+        pointing=None,
     ):
         """
         This function initialized the SDR class.
@@ -26,6 +62,24 @@ class SDR:
         :param device_driver: The device driver of the SDR used for SoapySDR, e.g. "uhd", "lime", "rtlsdr"
         :param lna_gain: The gain in dB the LNA of the SDR shall be set to
         :param psd_bins: In how many frequency bins shall the PSD data be collected?
+        :param backend: How the PSD data is computed, "numpy" (in process) or "soapy_power" (subprocess)
+        :param tune_delay: The time in seconds, which the SDR needs to settle after changing the frequency
+        :param device_args: Additional SoapySDR device arguments to select one of several devices, e.g. "serial=1234"
+        :param name: The name of the SDR within the ground station, defaults to the device driver
+        :param frequencies: The center frequencies of the frequency windows this SDR captures in a sweep.
+            If None, the frequencies of the controller are used.
+        :param frame_time: The integration time of each PSD frame in seconds
+        :param min_integration_time: The minimum time in seconds a measurement integrates PSD frames
+        :param max_integration_time: The maximum time in seconds a measurement integrates PSD frames
+        :param target_std_error: A measurement stops integrating, once the standard error of each bin is below
+            this value in dB
+        :param target_snr: A measurement stops integrating, once the band power exceeds its standard error by
+            this value in dB
+        :param replay_file: Only "replay" SDRs, path of a recorded sweep file, whose PSD levels are replayed
+        :param replay_source: Only "replay" SDRs, position of the noise source of the beam model, if no file is given
+        :param replay_speed: Only "replay" SDRs, replay speed relative to real time, 0 replays as fast as possible
+        :param hpbw: Only "replay" SDRs, the HPBW opening angle of the antenna in azimuth and elevation in degree
+        :param pointing: Only "replay" SDRs, function returning the current pointing position of the antenna
         """
         if device_driver is None:
             sdrs = self._detect_sdrs()
@@ -42,18 +96,54 @@ class SDR:
             device_driver = sdr["driver"]
         if device_driver == "uhd":
             self._sdr = UsrpSDR(
-                sampling_rate=sampling_rate, lna_gain=lna_gain, psd_bins=psd_bins
+                sampling_rate=sampling_rate,
+                lna_gain=lna_gain,
+                psd_bins=psd_bins,
+                backend=backend,
             )
         elif device_driver == "lime":
             self._sdr = LimeSDR(
-                sampling_rate=sampling_rate, lna_gain=lna_gain, psd_bins=psd_bins
+                sampling_rate=sampling_rate,
+                lna_gain=lna_gain,
+                psd_bins=psd_bins,
+                backend=backend,
             )
         elif device_driver == "rtlsdr":
             self._sdr = RtlSDR(
-                sampling_rate=sampling_rate, lna_gain=lna_gain, psd_bins=psd_bins
+                sampling_rate=sampling_rate,
+                lna_gain=lna_gain,
+                psd_bins=psd_bins,
+                backend=backend,
+            )
+        elif device_driver == "synthetic":
+            self._sdr = SyntheticSDR(sampling_rate=sampling_rate, psd_bins=psd_bins)
+        elif device_driver == "replay":
+            self._sdr = ReplaySDR(
+                sampling_rate=sampling_rate,
+                psd_bins=psd_bins,
+                replay_file=replay_file,
+                replay_source=replay_source,
+                replay_speed=replay_speed,
+                hpbw=hpbw,
+                pointing=pointing,
             )
         else:
             raise NotImplementedError(f"No auto setup defined for {device_driver} SDR!")
+        if tune_delay is not None:
+            self._sdr.tune_delay = float(tune_delay)
+        if device_args is not None:
+            self._sdr.device_args = str(device_args)
+        if frame_time is not None:
+            self._sdr.frame_time = float(frame_time)
+        self._sdr.set_integration(
+            min_time=min_integration_time,
+            max_time=max_integration_time,
+            target_std_error=target_std_error,
+            target_snr=target_snr,
+        )
+        self.name = device_driver if name is None else str(name)
+        if frequencies is not None:
+            self.frequencies = [float(f) for f in frequencies]
 
     def __del__(self):
         self.stop_rx()
@@ -75,13 +165,76 @@ class SDR:
         if self._sdr is not None:
             self._sdr.stop_rx()
 
-    def get_psd_levels(self) -> PSDLevels:
+    def change_frequency(self, frequency: float, wait: bool = True):
+        """
+        This function retunes the running receiving process to the given frequency.
+        :param frequency: The new center frequency in Hertz
+        :param wait: If set True, the function returns after the SDR settled on the new frequency
+        :return: None
+        """
+        self._sdr.change_frequency(frequency, wait=wait)
+
+    def get_psd_levels(
+        self,
+        mode: str = "next",
+        after: float = None,
+        count: int = 1,
+        frequency: float = None,
+        timeout: float = None,
+    ) -> PSDLevels:
         """
-        This function fetches the current PSD data, collected in the background process.
+        This function fetches PSD data, collected in the background.
         For this function to work, the receiving has to be started first!
+        :param mode: "latest" returns the latest frame without waiting for a new one,
+            "next" returns the first frame received after the time given by after,
+            "average" returns the average of the latest count frames,
+            "integrate" averages frames received after the time given by after, until the integration targets
+            are met
+        :param after: Point in time of time.monotonic() for the "next" mode, defaults to now
+        :param count: Number of frames to average in the "average" mode
+        :param frequency: Only frames captured at this center frequency are returned, defaults to the current one
+        :param timeout: The maximum time in seconds to wait for the PSD data
+        :return: PSD levels
+        """
+        return self._sdr.get_psd_levels(
+            mode=mode, after=after, count=count, frequency=frequency, timeout=timeout
+        )
+
+    def iterate_psd_levels(self, after: float = None, timeout: float = None):
+        """
+        This function iterates over the PSD frames of the current frequency as they arrive.
+        :param after: Only frames, whose integration started after this point in time (time.monotonic()) are
+            returned. If None, the iteration starts with the next frame.
+        :param timeout: The maximum time in seconds to wait for each frame
+        :return: Generator of PSD frames
+        """
+        after = time.monotonic() if after is None else float(after)
+        return self._sdr.psd_buffer.iterate(
+            after, frequency=self._sdr.frequency, timeout=timeout
+        )
+
+    def capture_psd_levels(self, after: float = None) -> PSDLevels:
+        """
+        This function captures the PSD data of one measurement, starting after the given point in time.
+        If integration targets are configured, frames are integrated until the targets are met.
+        :param after: Point in time of time.monotonic(), defaults to now
         :return: PSD levels
         """
-        return self._sdr.get_psd_levels()
+        mode = "integrate" if self._sdr.adaptive_integration else "next"
+        return self._sdr.get_psd_levels(mode=mode, after=after)
+
+    def predict_capture_time(self, windows: int = 1) -> float:
+        """
+        This function predicts the time one measurement takes, e.g. to plan a sweep.
+        :param windows: The number of frequency windows captured in the measurement
+        :return: The predicted time in seconds
+        """
+        sdr = self._sdr
+        # on average, half a frame passes until the next frame starts
+        capture_time = 1.5 * sdr.frame_time
+        if sdr.adaptive_integration:
+            capture_time = max(capture_time, sdr.min_integration_time)
+        return windows * capture_time + (windows - 1) * sdr.tune_delay
 
     @property
     def frequency(self) -> float:
@@ -91,12 +244,75 @@ class SDR:
         """
         return self._sdr.frequency
 
+    @staticmethod
+    def clear_detection_cache():
+        """
+        This function removes the cached SDR detection results, so the next detection rescans all devices.
+        :return: None
+        """
+        if os.path.exists(DETECTION_CACHE_FILE):
+            os.remove(DETECTION_CACHE_FILE)
+
     @staticmethod
     def _detect_sdrs() -> list:
         """
         This function detects connected SDRs with feature SoapySDR support, if SoapySDR and drivers are installed.
+        The results are cached on disk, until the TTL expired or the set of connected USB devices changed.
         :return: List of detected SDR devices
         """
+        fingerprint = SDR._device_fingerprint()
+        try:
+            with open(DETECTION_CACHE_FILE, "r") as f:
+                cache = json.load(f)
+            if (
+                cache["fingerprint"] == fingerprint
+                and time.time() - cache["time"] < DETECTION_CACHE_TTL
+            ):
+                return cache["sdrs"]
+        except (OSError, ValueError, KeyError):
+            pass
+        sdrs = SDR._enumerate_sdrs()
+        if len(sdrs) < 1:
+            return sdrs  # do not cache failed detections
+        try:
+            os.makedirs(os.path.dirname(DETECTION_CACHE_FILE), exist_ok=True)
+            with open(DETECTION_CACHE_FILE, "w") as f:
+                json.dump(
+                    {"fingerprint": fingerprint, "time": time.time(), "sdrs": sdrs}, f
+                )
+        except OSError as e:
+            print(f"Could not cache detected SDRs due to Exception: {e}")
+        return sdrs
+
+    @staticmethod
+    def _device_fingerprint() -> str:
+        # hash of all connected USB devices, which changes if an SDR is plugged in or removed
+        devices = []
+        for path in sorted(glob.glob("/sys/bus/usb/devices/*/idVendor")):
+            directory = os.path.dirname(path)
+            ids = []
+            for name in ("idVendor", "idProduct", "serial"):
+                try:
+                    with open(os.path.join(directory, name), "r") as f:
+                        ids.append(f.read().strip())
+                except OSError:
+                    ids.append("")
+            devices.append(":".join(ids))
+        return hashlib.sha1("\n".join(devices).encode()).hexdigest()
+
+    @staticmethod
+    def _enumerate_sdrs() -> list:
+        try:
+            # enumerate in process, if the SoapySDR bindings are installed
+            import simplesoapy
+
+            devices = [
+                {str(k): str(v) for k, v in dict(d).items()}
+                for d in simplesoapy.detect_devices()
+            ]
+            return [d for d in devices if d.get("driver", "audio") != "audio"]
+        except ImportError:
+            pass
         proc = subprocess.Popen(
             "python3 -m soapypower --detect", shell=True, stdout=subprocess.PIPE
         )
@@ -118,14 +334,24 @@ class SDR:
 class GenericSDR:
     sampling_rate: float
     device_driver: str
+    device_args: str = None
+    backend: str = "numpy"
+    backends: (str,) = ("numpy", "soapy_power")
     frequency: float = None
     lna_gain: float = None
     psd_bins: int = 16
+    frame_time: float = 1
     tune_delay: float = 1
-    start_delay: float = 10
+    psd_buffer_size: int = 64
+    min_integration_time: float = 0
+    max_integration_time: float = 10
+    target_std_error: float = None
+    target_snr: float = None
     _process: subprocess.Popen = None
-    _start_time: float = None
-    _start_delay_done: bool = False
+    _source: IQSource = None
+    _engine: PSDEngine = None
+    _buffer: np.ndarray = None
+    _reader: threading.Thread = None
 
     def __init__(
         self,
@@ -133,6 +359,7 @@ class GenericSDR:
         device_driver: str,
         psd_bins: int = None,
         lna_gain: float = None,
+        backend: str = None,
     ):
         self.sampling_rate = float(sampling_rate)
         self.device_driver = str(device_driver)
@@ -140,12 +367,66 @@ class GenericSDR:
             self.psd_bins = int(psd_bins)
         if lna_gain is not None:
             self.lna_gain = float(lna_gain)
+        if backend is not None:
+            self.backend = str(backend).lower()
+        if self.backend not in self.backends:
+            raise NotImplementedError(f"There is no PSD backend {backend}!")
+        self.psd_buffer = PSDFrameBuffer(size=self.psd_buffer_size)
+        self._stop_event = threading.Event()
+        self._commands = queue.Queue()
 
     def __del__(self):
         self.stop_rx()
 
+    @property
+    def receiving(self) -> bool:
+        return self._reader is not None and self._reader.is_alive()
+
     def start_rx(self, frequency: float) -> None:
+        if self.receiving and self.backend != "soapy_power":
+            # keep the running session and only retune it
+            self.change_frequency(float(frequency))
+            return
+        self.stop_rx()
         self.frequency = float(frequency)
+        self._start_backend()
+        self._stop_event.clear()
+        self.psd_buffer.open()
+        self._reader = threading.Thread(
+            target=self._read_frames, name=f"{self.device_driver}-psd", daemon=True
+        )
+        self._reader.start()
+
+    def _start_backend(self) -> None:
+        if self.backend == "soapy_power":
+            self._start_soapy_power()
+        else:
+            self._start_psd_engine()
+
+    @property
+    def device_string(self) -> str:
+        if self.device_args is None:
+            return f"driver={self.device_driver}"
+        return f"driver={self.device_driver},{self.device_args}"
+
+    def _create_iq_source(self) -> IQSource:
+        return SoapyIQSource(device_args=self.device_string)
+
+    def _start_psd_engine(self) -> None:
+        self._source = self._create_iq_source()
+        self._source.open(
+            sampling_rate=self.sampling_rate,
+            frequency=self.frequency,
+            gain=self.lna_gain,
+        )
+        self._engine = PSDEngine(bins=self.psd_bins, sampling_rate=self.sampling_rate)
+        # read blocks of complete segments with roughly 64k samples
+        self._buffer = np.empty(
+            self.psd_bins * max(1, 2**16 // self.psd_bins), dtype=np.complex64
+        )
+        print("SDR PSD engine started successfully.")
+
+    def _start_soapy_power(self) -> None:
         # compose command string for soapy_power
         command = (
             f"python3 -m soapypower "
@@ -153,13 +434,12 @@ class GenericSDR:
             f"--rate {self.sampling_rate} "
             f"--bins {self.psd_bins} "
             f"--tune-delay {self.tune_delay} "
-            f"--device 'driver={self.device_driver}' "
+            f"--device '{self.device_string}' "
             f"--gain {self.lna_gain} "
-            f"--time 1 --quiet --continue"
+            f"--time {self.frame_time} --quiet --continue "
+            f"--format soapy_power_bin"
         )  # + f"--bandwidth {56e6}"
         # start background process
-        if self._process is not None:
-            self.stop_rx()
         self._process = subprocess.Popen(
             command,
             shell=True,
@@ -168,52 +448,212 @@ class GenericSDR:
             preexec_fn=os.setsid,
         )
         print("SDR subprocess started successfully.")
-        self._start_time = time.time()
 
     def stop_rx(self) -> None:
+        self._stop_event.set()
         if self._process is not None:
             os.killpg(os.getpgid(self._process.pid), signal.SIGTERM)
             print("SDR subprocess terminated.")
+        if self._reader is not None:
+            self._reader.join(timeout=max(5.0, 2 * self.frame_time))
+            self._reader = None
+        if self._process is not None:
+            self._process.stdout.close()
+            self._process = None
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+            print("SDR PSD engine stopped.")
 
-    def change_frequency(self, frequency: float):
+    def change_frequency(self, frequency: float, wait: bool = True):
         print(f"Change SDR frequency to {frequency/1e6:.3f}MHz")
-        self.start_rx(frequency=frequency)
+        if not self.receiving or self.backend == "soapy_power":
+            # soapy_power can not be retuned, so the process has to be restarted
+            self.stop_rx()
+            self.start_rx(frequency=frequency)
+            return
+        tuned = threading.Event()
+        self._commands.put((float(frequency), tuned))
+        if wait and not tuned.wait(timeout=self.tune_delay + 5):
+            raise TimeoutError(f"SDR could not be tuned to {frequency/1e6:.3f}MHz!")
 
-    def get_psd_levels(self) -> PSDLevels:
+    def get_psd_levels(
+        self,
+        mode: str = "next",
+        after: float = None,
+        count: int = 1,
+        frequency: float = None,
+        timeout: float = None,
+    ) -> PSDLevels:
         """
-        Get actual power spectral density level.
-        Is a blocking function!
+        Get power spectral density levels from the frames received in the background.
+        Only the "next" mode waits for new data.
         """
-        # if start up time delay is not already done
-        if not self._start_delay_done:
-            self._start_delay_done = True
-            time_to_wait = self.start_delay - (time.time() - self._start_time)
-            time.sleep(time_to_wait if time_to_wait > 0 else 0)
-        data = self._get_current_psd_data()
-        psd_levels = PSDLevels(
-            timestamp=pd.Timestamp(f"{data[0]} {data[1]}"),  # 0 = date, 1 = time
-            frequency_start=float(data[2]),  # 2 = f_start
-            frequency_stop=float(data[3]),  # 3 = f_stop
-            frequency_step=float(data[4]),  # 4 = f_step
-            samples=int(data[5]),  # 5 = samples
-            psd_levels=[float(x) for x in data[6:]],  # 6 - x = power levels
-        )
-        return psd_levels
+        frequency = self.frequency if frequency is None else float(frequency)
+        if mode == "latest":
+            return self.psd_buffer.latest(frequency=frequency, timeout=timeout)
+        if mode == "next":
+            after = time.monotonic() if after is None else float(after)
+            return self.psd_buffer.next_after(
+                after, frequency=frequency, timeout=timeout
+            )
+        if mode == "average":
+            return average_psd_levels(
+                self.psd_buffer.last(count, frequency=frequency, timeout=timeout)
+            )
+        if mode == "integrate":
+            after = time.monotonic() if after is None else float(after)
+            return self._integrate_psd_levels(
+                after, frequency=frequency, timeout=timeout
+            )
+        raise NotImplementedError(f"There is no PSD levels mode {mode}!")
 
-    def _get_current_psd_data(self) -> [str]:
-        self._dump_stdout_buffer()  # get rid of old psd measurements in buffer
-        line = self._process.stdout.readline()  # get new / next output
-        data = str(line, encoding="utf-8").replace("\n", "").replace(" ", "").split(",")
-        return data
+    @property
+    def adaptive_integration(self) -> bool:
+        return self.target_std_error is not None or self.target_snr is not None
 
-    def _dump_stdout_buffer(self) -> None:
-        # dump stdout buffer
-        duration_s = 0
-        # dump every thing until have to wait on new measurement data
-        while duration_s < 0.001:
-            start_t = time.time()
-            _ = self._process.stdout.readline()
-            duration_s = time.time() - start_t
+    def set_integration(
+        self,
+        min_time: float = None,
+        max_time: float = None,
+        target_std_error: float = None,
+        target_snr: float = None,
+    ):
+        """
+        This function configures the adaptive integration of measurements.
+        Omitted values keep their current setting.
+        """
+        if min_time is not None:
+            self.min_integration_time = float(min_time)
+        if max_time is not None:
+            self.max_integration_time = float(max_time)
+        if target_std_error is not None:
+            self.target_std_error = float(target_std_error)
+        if target_snr is not None:
+            self.target_snr = float(target_snr)
+        if self.min_integration_time > self.max_integration_time:
+            raise ValueError(
+                "The min integration time exceeds the max integration time!"
+            )
+
+    def _integrate_psd_levels(
+        self, after: float, frequency: float, timeout: float = None
+    ) -> PSDLevels:
+        # integrate frames until one of the targets is met, within the time budget
+        start = time.monotonic()
+        statistics = PSDStatistics()
+        frames = self.psd_buffer.iterate(after, frequency=frequency, timeout=timeout)
+        try:
+            for frame in frames:
+                statistics.update(frame)
+                if self.integration_finished(statistics, time.monotonic() - start):
+                    break
+        except PSDStreamClosed as e:
+            # keep the frames integrated until the stream was stopped
+            if statistics.count < 1:
+                raise
+            print(f"Integration stopped after {statistics.count} frame(s): {e}")
+        return statistics.result()
+
+    def integration_finished(self, statistics: PSDStatistics, elapsed: float) -> bool:
+        """
+        This function checks, if an integration met one of its targets or ran out of its time budget.
+        :param statistics: The statistics of the frames integrated so far
+        :param elapsed: The time since the integration started in seconds
+        :return: True, if the integration shall stop
+        """
+        if elapsed >= self.max_integration_time:
+            return True
+        if elapsed < self.min_integration_time:
+            return False
+        if (
+            self.target_std_error is not None
+            and statistics.std_error.max() <= self.target_std_error
+        ):
+            return True
+        return self.target_snr is not None and statistics.snr >= self.target_snr
+
+    def _read_frames(self) -> None:
+        # runs in the background and feeds all PSD frames into the ring buffer
+        reason = "PSD stream was stopped"
+        try:
+            for frame in self._frames():
+                self.psd_buffer.push(frame)
+                if self._stop_event.is_set():
+                    break
+        except Exception as e:
+            if not self._stop_event.is_set():
+                reason = f"PSD stream failed due to Exception: {e}"
+                print(f"SDR {reason}")
+        finally:
+            self.psd_buffer.close(reason)
+
+    def _frames(self):
+        if self.backend == "soapy_power":
+            return self._soapy_power_frames()
+        return self._psd_engine_frames()
+
+    def _psd_engine_frames(self):
+        blocks = max(1, round(self.frame_time * self.sampling_rate / self._buffer.size))
+        self._source.start_stream()
+        try:
+            self._settle_tuning()
+            while not self._stop_event.is_set():
+                self._engine.reset()
+                read_start = time.monotonic()
+                for _ in range(blocks):
+                    if self._stop_event.is_set():
+                        return
+                    if not self._commands.empty():
+                        break
+                    self._engine.update(self._source.read(self._buffer))
+                if not self._commands.empty():
+                    # discard the incomplete frame and retune
+                    frequency, tuned = self._commands.get()
+                    self._source.tune(frequency)
+                    self.frequency = frequency
+                    self._settle_tuning()
+                    tuned.set()
+                    continue
+                capture_stop = time.monotonic()
+                samples = blocks * self._buffer.size
+                yield PSDLevels(
+                    timestamp=time.time_ns(),
+                    frequency_start=self.frequency - self.sampling_rate / 2,
+                    frequency_stop=self.frequency + self.sampling_rate / 2,
+                    frequency_step=self.sampling_rate / self.psd_bins,
+                    samples=samples,
+                    psd_levels=self._engine.result(),
+                    frequency=self.frequency,
+                    # buffered samples may be older than the first read
+                    capture_start=min(
+                        read_start, capture_stop - samples / self.sampling_rate
+                    ),
+                    capture_stop=capture_stop,
+                )
+        finally:
+            self._source.stop_stream()
+
+    def _settle_tuning(self) -> None:
+        # drop samples until the tuning of the SDR settled
+        for _ in range(round(self.tune_delay * self.sampling_rate / self._buffer.size)):
+            self._source.read(self._buffer)
+
+    def _soapy_power_frames(self):
+        for frame in read_bin_frames(self._process.stdout):
+            # the frame was complete, before it could be read
+            capture_stop = time.monotonic()
+            yield PSDLevels(
+                timestamp=frame.time_stop,
+                frequency_start=frame.frequency_start,
+                frequency_stop=frame.frequency_stop,
+                frequency_step=frame.frequency_step,
+                samples=frame.samples,
+                psd_levels=frame.psd_levels,
+                frequency=self.frequency,
+                capture_start=capture_stop - frame.duration,
+                capture_stop=capture_stop,
+            )
 
 
 class UsrpSDR(GenericSDR):
@@ -222,6 +662,7 @@ class UsrpSDR(GenericSDR):
         sampling_rate: float = None,
         lna_gain: float = 76,
         psd_bins: int = None,
+        backend: str = None,
     ):
         if sampling_rate is None:
             sampling_rate = 4e6
@@ -230,6 +671,7 @@ class UsrpSDR(GenericSDR):
             device_driver="uhd",
             lna_gain=lna_gain,
             psd_bins=psd_bins,
+            backend=backend,
         )
 
 
@@ -239,6 +681,7 @@ class LimeSDR(GenericSDR):
         sampling_rate: float = None,
         lna_gain: float = None,
         psd_bins: int = None,
+        backend: str = None,
     ):
         if sampling_rate is None:
             sampling_rate = 4e6
@@ -247,6 +690,7 @@ class LimeSDR(GenericSDR):
             device_driver="lime",
             lna_gain=lna_gain,
             psd_bins=psd_bins,
+            backend=backend,
         )
 
 
@@ -256,6 +700,7 @@ class RtlSDR(GenericSDR):
         sampling_rate: float = None,
         lna_gain: float = 37.2,
         psd_bins: int = None,
+        backend: str = None,
     ):
         if sampling_rate is None:
             sampling_rate = 2048e3
@@ -264,7 +709,144 @@ class RtlSDR(GenericSDR):
             device_driver="rtlsdr",
             lna_gain=lna_gain,
             psd_bins=psd_bins,
+            backend=backend,
+        )
+
+
+class SyntheticSDR(GenericSDR):
+    noise_level: float = -60
+    tones: [(float, float)] = None
+
+    def __init__(
+        self,
+        sampling_rate: float = None,
+        psd_bins: int = None,
+        noise_level: float = None,
+        tones: [(float, float)] = None,
+    ):
+        if sampling_rate is None:
+            sampling_rate = 4e6
+        if noise_level is not None:
+            self.noise_level = float(noise_level)
+        if tones is not None:
+            self.tones = tones
+        super().__init__(
+            sampling_rate=sampling_rate,
+            device_driver="synthetic",
+            psd_bins=psd_bins,
+            backend="numpy",
         )
+        self.tune_delay = 0
+
+    def _create_iq_source(self) -> IQSource:
+        return SyntheticIQSource(
+            noise_level=self.noise_level, tones=self.tones, throttle=True
+        )
+
+
+class ReplaySDR(GenericSDR):
+    """
+    Replays PSD frames of a recorded sweep file or of a synthetic beam model, e.g. for offline benchmarking
+    """
+
+    backend: str = "replay"
+    backends: (str,) = ("replay",)
+    replay_file: str = None
+    replay_speed: float = 1.0
+    pointing = None
+    _replay: SweepFileReplay = None
+    _model: GaussianBeamModel = None
+    _source_position = None
+
+    def __init__(
+        self,
+        sampling_rate: float = None,
+        psd_bins: int = None,
+        replay_file: str = None,
+        replay_source=None,
+        replay_speed: float = None,
+        hpbw: (float, float) = None,
+        pointing=None,
+    ):
+        """
+        This function initializes the replay SDR.
+        :param sampling_rate: The sample rate of the beam model, ignored when replaying a file
+        :param psd_bins: The number of frequency bins of the beam model, ignored when replaying a file
+        :param replay_file: Path of a recorded sweep file, whose PSD levels are replayed
+        :param replay_source: Position of the noise source of the beam model, or a function returning it
+        :param replay_speed: Replay speed relative to real time, 0 replays as fast as possible
+        :param hpbw: The HPBW opening angle of the antenna in azimuth and elevation direction in degree
+        :param pointing: Function returning the current pointing position of the antenna without blocking
+        """
+        if replay_file is not None:
+            self.replay_file = str(replay_file)
+            self._replay = SweepFileReplay(self.replay_file)
+            psd_bins = self._replay.bins
+            sampling_rate = self._replay.frequency_step * self._replay.bins
+        if sampling_rate is None:
+            sampling_rate = 4e6
+        super().__init__(
+            sampling_rate=sampling_rate,
+            device_driver="replay",
+            psd_bins=psd_bins,
+            backend="replay",
+        )
+        if replay_speed is not None:
+            self.replay_speed = float(replay_speed)
+        self.pointing = pointing
+        self.tune_delay = 0
+        if self._replay is None:
+            if replay_source is None:
+                raise ValueError("Expected a replay file or a replay source position!")
+            if callable(replay_source):
+                self._source_position = replay_source
+                replay_source = replay_source()
+            elif not isinstance(replay_source, Position):
+                replay_source = Position(*(float(x) for x in replay_source))
+            self._model = GaussianBeamModel(
+                source_position=replay_source,
+                hpbw=(3.0, 3.0) if hpbw is None else hpbw,
+            )
+
+    def _start_backend(self) -> None:
+        print("SDR replay started successfully.")
+
+    def _frames(self):
+        while not self._stop_event.is_set():
+            if not self._commands.empty():
+                frequency, tuned = self._commands.get()
+                self.frequency = frequency
+                tuned.set()
+            capture_start = time.monotonic()
+            if self.replay_speed > 0:
+                # deliver the frame after its (scaled) integration time
+                self._stop_event.wait(self.frame_time / self.replay_speed)
+            else:
+                # give the consumers a chance to keep up
+                self._stop_event.wait(1e-3)
+            if not self._commands.empty():
+                continue
+            position = None if self.pointing is None else self.pointing()
+            if self._replay is not None:
+                levels, samples = self._replay.get_psd_levels(self.frequency, position)
+            else:
+                if self._source_position is not None:
+                    self._model.source_position = self._source_position()
+                samples = round(self.frame_time * self.sampling_rate)
+                levels = self._model.get_psd_levels(
+                    self.psd_bins, samples // self.psd_bins, position
+                )
+            yield PSDLevels(
+                timestamp=time.time_ns(),
+                frequency_start=self.frequency - self.sampling_rate / 2,
+                frequency_stop=self.frequency + self.sampling_rate / 2,
+                frequency_step=self.sampling_rate / self.psd_bins,
+                samples=samples,
+                psd_levels=levels.copy(),
+                frequency=self.frequency,
+                capture_start=capture_start,
+                capture_stop=time.monotonic(),
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import io
+import struct
+import time
+import numpy as np
+import pandas as pd
+
+# header of soapy_power's binary output format "soapy_power_bin":
+# magic, version, time start/stop (epoch seconds), frequency start/stop/step, samples, size of PSD levels in bytes
+# and 2 padding bytes, 64 bytes in total
+BIN_MAGIC = b"SDRFF"
+BIN_VERSION = 2
+BIN_HEADER = struct.Struct("<5sBdddddQQ2x")
+
+
+@dataclass
+class SoapyPowerFrame:
+    """
+    One PSD frame as written by soapy_power, with timestamps in nanoseconds since epoch
+    """
+
+    time_start: int
+    time_stop: int
+    frequency_start: float
+    frequency_stop: float
+    frequency_step: float
+    samples: int
+    psd_levels: np.ndarray
+
+    @property
+    def duration(self) -> float:
+        return (self.time_stop - self.time_start) / 1e9
+
+
+def read_bin_frames(stream: io.BufferedIOBase):
+    """
+    This function reads the frames of soapy_power's binary output format.
+    The PSD levels are read directly into a new float32 array, without parsing any text.
+    :param stream: Binary stream of soapy_power's output, e.g. stdout of the subprocess
+    :return: Generator of SoapyPowerFrames, which ends with the stream
+    """
+    header = bytearray(BIN_HEADER.size)
+    while True:
+        if stream.readinto(header) < BIN_HEADER.size:
+            return
+        (
+            magic,
+            version,
+            time_start,
+            time_stop,
+            frequency_start,
+            frequency_stop,
+            frequency_step,
+            samples,
+            size,
+        ) = BIN_HEADER.unpack(header)
+        if magic != BIN_MAGIC or version != BIN_VERSION:
+            raise ValueError(f"Unknown soapy_power frame header {bytes(header)}!")
+        psd_levels = np.empty(size // 4, dtype=np.float32)
+        if stream.readinto(memoryview(psd_levels).cast("B")) < size:
+            return
+        yield SoapyPowerFrame(
+            time_start=round(time_start * 1e9),
+            time_stop=round(time_stop * 1e9),
+            frequency_start=frequency_start,
+            frequency_stop=frequency_stop,
+            frequency_step=frequency_step,
+            samples=int(samples),
+            psd_levels=psd_levels,
+        )
+
+
+def parse_text_line(line: bytes, frame_time: float = 0.0) -> SoapyPowerFrame:
+    """
+    This function parses one line of soapy_power's text output format "rtl_power".
+    The PSD levels are converted at once by NumPy.
+    :param line: The line, e.g. b"2023-03-01, 11:40:37, 1248000000, 1252000000, 250000, 4000440, -74.3, ..."
+    :param frame_time: The integration time of the frame in seconds, which is not part of the text format
+    :return: The parsed frame or None, if the line does not contain a frame
+    """
+    fields = line.split(b",", 6)
+    if len(fields) < 7:
+        return None
+    time_stop = pd.Timestamp(
+        f"{fields[0].strip().decode()} {fields[1].strip().decode()}"
+    ).value
+    return SoapyPowerFrame(
+        time_start=time_stop - round(frame_time * 1e9),
+        time_stop=time_stop,
+        frequency_start=float(fields[2]),
+        frequency_stop=float(fields[3]),
+        frequency_step=float(fields[4]),
+        samples=int(fields[5]),
+        psd_levels=np.fromstring(fields[6], dtype=np.float32, sep=","),
+    )
+
+
+if __name__ == "__main__":
+    # benchmark parsing frames of soapy_power's text and binary output formats
+    for psd_bins in [16, 1024, 16384]:
+        levels = np.random.default_rng(0).normal(-70, 1, psd_bins).astype(np.float32)
+        now = time.time()
+        text = (
+            f"2023-03-01, 11:40:37, 1248000000, 1252000000, {4e6 / psd_bins}, 4000440, "
+            + ", ".join(f"{x:.6f}" for x in levels)
+            + "\n"
+        ).encode()
+        binary = (
+            BIN_HEADER.pack(
+                BIN_MAGIC,
+                BIN_VERSION,
+                now - 1,
+                now,
+                1248e6,
+                1252e6,
+                4e6 / psd_bins,
+                4000440,
+                levels.nbytes,
+            )
+            + levels.tobytes()
+        )
+        n = max(10, 200000 // psd_bins)
+
+        def legacy():
+            for _ in range(n):
+                data = (
+                    str(text, encoding="utf-8")
+                    .replace("\n", "")
+                    .replace(" ", "")
+                    .split(",")
+                )
+                pd.Timestamp(f"{data[0]} {data[1]}")
+                [float(x) for x in data[6:]]
+
+        def vectorized():
+            for _ in range(n):
+                parse_text_line(text)
+
+        def bin_format():
+            for _ in read_bin_frames(io.BytesIO(binary * n)):
+                pass
+
+        for name, parser in [
+            ("legacy text", legacy),
+            ("vectorized text", vectorized),
+            ("binary", bin_format),
+        ]:
+            t_start = time.perf_counter()
+            parser()
+            duration = time.perf_counter() - t_start
+            print(f"{psd_bins} bins, {name}: {n / duration:.0f} frames/s")
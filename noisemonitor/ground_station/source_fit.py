@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import math
+import numpy as np
+
+from .data_structures import Position, MeasurementPoint, SourceFit
+
+
+def position_levels(
+    measurement_points: [MeasurementPoint],
+) -> ([Position], np.ndarray):
+    """
+    This function combines the measurements of each measured position into a single level.
+    The PSD levels of all bins, SDRs and frequency windows are averaged in linear power.
+    :param measurement_points: The measurement points of one or several sweeps
+    :return: The measured positions and their levels in dB
+    """
+    powers = {}
+    for mp in measurement_points:
+        key = (mp.measurement_position.azimuth, mp.measurement_position.elevation)
+        linear = np.power(10.0, mp.psd_levels.psd_levels.astype(np.float64) / 10)
+        powers.setdefault(key, []).append(linear.mean())
+    positions = [Position(az, el) for az, el in powers]
+    levels = np.asarray([10 * math.log10(np.mean(p)) for p in powers.values()])
+    return positions, levels
+
+
+def _beam(x, y, background, peak, center_x, center_y, width_x, width_y):
+    # gaussian main lobe with the given half power beam widths
+    return background + peak * np.exp(
+        -4
+        * math.log(2)
+        * (((x - center_x) / width_x) ** 2 + ((y - center_y) / width_y) ** 2)
+    )
+
+
+def fit_source(
+    positions: [Position], levels: np.ndarray, beam_width: (float, float) = None
+) -> SourceFit:
+    """
+    This function estimates the position of a noise source by fitting a gaussian beam on a constant background
+    to the measured levels. Azimuth offsets are scaled by cos(elevation) to fit the beam on the sky.
+    :param positions: The measured positions
+    :param levels: The levels at the measured positions in dB
+    :param beam_width: The expected HPBW in azimuth and elevation in degree, used as initial guess
+    :return: The estimated source position and its uncertainty. The uncertainty is infinite, if the measurements
+        do not constrain the position.
+    """
+    # lmfit pulls in scipy, so it is only imported by sweeps that fit a source
+    import lmfit
+
+    levels = np.asarray(levels, dtype=np.float64)
+    if len(positions) != len(levels):
+        raise ValueError("Expected one level per position!")
+    if len(positions) < 6:
+        raise ValueError("At least 6 positions are needed to fit a source!")
+    brightest = positions[int(levels.argmax())]
+    elevations = np.asarray([p.elevation for p in positions])
+    # azimuth offsets around the brightest position, wrapped to -180..180°
+    x = (
+        (np.asarray([p.azimuth for p in positions]) - brightest.azimuth + 180) % 360
+        - 180
+    ) * np.cos(np.radians(elevations))
+    y = elevations
+    # fit in linear power relative to the weakest level
+    z = np.power(10.0, (levels - levels.min()) / 10)
+    if beam_width is None:
+        beam_width = (max(np.ptp(x), 1e-3) / 2, max(np.ptp(y), 1e-3) / 2)
+
+    model = lmfit.Model(_beam, independent_vars=["x", "y"])
+    params = model.make_params(
+        background=dict(value=1.0, min=0.0),
+        peak=dict(value=max(z.max() - 1.0, 1e-3), min=0.0),
+        center_x=dict(value=0.0, min=x.min(), max=x.max()),
+        center_y=dict(value=brightest.elevation, min=y.min(), max=y.max()),
+        width_x=dict(value=beam_width[0], min=1e-3),
+        width_y=dict(value=beam_width[1], min=1e-3),
+    )
+    result = model.fit(z, params, x=x, y=y)
+    values = result.params
+
+    def std_error(name: str) -> float:
+        error = values[name].stderr
+        return float("inf") if error is None or not np.isfinite(error) else error
+
+    center_elevation = values["center_y"].value
+    center_azimuth = brightest.azimuth + values["center_x"].value / max(
+        math.cos(math.radians(center_elevation)), 1e-6
+    )
+    background = max(values["background"].value, 1e-12)
+    return SourceFit(
+        position=Position(center_azimuth % 360, center_elevation),
+        uncertainty=Position(std_error("center_x"), std_error("center_y")),
+        beam_width=(abs(values["width_x"].value), abs(values["width_y"].value)),
+        peak_level=10 * math.log10((background + values["peak"].value) / background),
+        points=len(positions),
+    )
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import threading
+import numpy as np
+import pandas as pd
+from dateutil import tz
+
+from .data_structures import Position, PSDLevels, MeasurementPoint
+
+COLUMNS = {
+    "target_azimuth": np.float64,
+    "target_elevation": np.float64,
+    "measurement_azimuth": np.float64,
+    "measurement_elevation": np.float64,
+    "sdr": np.int32,  # index of the name of the SDR, -1 without name
+    "timestamp": np.int64,  # in nanoseconds since epoch
+    "frequency_start": np.float64,
+    "frequency_stop": np.float64,
+    "frequency_step": np.float64,
+    "samples": np.int64,
+    "frequency": np.float64,  # center frequency the SDR was tuned to, NaN if unknown
+    "bins": np.int32,  # number of PSD bins of the row
+}
+
+
+class SweepBuffer:
+    """
+    Columnar storage of the measurement points of sweeps. The metadata is kept in one preallocated array per column
+    and the PSD levels in a float32 matrix with one row per measurement point, so the points are written directly
+    into the arrays and DataFrames are built without copying the PSD levels.
+    It is a sequence of MeasurementPoints, whose PSD levels are views of the matrix.
+    """
+
+    def __init__(self, capacity: int = 1024, bins: int = 0):
+        """
+        This function initializes the buffer. It grows, if more points or bins are appended.
+        :param capacity: The number of measurement points, which are preallocated
+        :param bins: The number of PSD bins per point, which are preallocated
+        """
+        self._size = 0
+        self._sdr_names = []
+        self._columns = {
+            name: np.empty(max(1, int(capacity)), dtype=dtype)
+            for name, dtype in COLUMNS.items()
+        }
+        self._levels = np.full(
+            (max(1, int(capacity)), max(0, int(bins))), np.nan, dtype=np.float32
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield self._point(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._point(i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("The sweep buffer index is out of range!")
+        return self._point(index)
+
+    def append(self, measurement_point: MeasurementPoint):
+        """
+        This function writes a measurement point into the buffer.
+        :param measurement_point: The measurement point
+        :return: None
+        """
+        self.extend([measurement_point])
+
+    def extend(self, measurement_points: [MeasurementPoint]):
+        """
+        This function writes measurement points into the buffer.
+        :param measurement_points: The measurement points
+        :return: None
+        """
+        if isinstance(measurement_points, SweepBuffer):
+            measurement_points = list(measurement_points)
+        with self._lock:
+            bins = max(
+                (mp.psd_levels.psd_levels.size for mp in measurement_points), default=0
+            )
+            self._reserve(self._size + len(measurement_points), bins)
+            for mp in measurement_points:
+                self._write(self._size, mp)
+                self._size += 1
+
+    def clear(self):
+        """
+        This function removes all measurement points. New arrays of the same capacity are allocated, so views of
+        the previous points, e.g. DataFrames, are not overwritten.
+        :return: None
+        """
+        with self._lock:
+            self._size = 0
+            self._sdr_names = []
+            self._columns = {
+                name: np.empty_like(column) for name, column in self._columns.items()
+            }
+            self._levels = np.full_like(self._levels, np.nan)
+
+    def copy(self) -> SweepBuffer:
+        """
+        This function copies the measurement points into a new buffer.
+        :return: The new buffer
+        """
+        with self._lock:
+            buffer = SweepBuffer(capacity=self._size, bins=self._levels.shape[1])
+            for name, column in self._columns.items():
+                buffer._columns[name][: self._size] = column[: self._size]
+            buffer._levels[: self._size] = self._levels[: self._size]
+            buffer._sdr_names = list(self._sdr_names)
+            buffer._size = self._size
+        return buffer
+
+    @property
+    def levels(self) -> np.ndarray:
+        """
+        This function returns the PSD levels of all points, without copying them.
+        :return: float32 matrix with one row per point, bins beyond the size of a row are NaN
+        """
+        return self._levels[: self._size]
+
+    @property
+    def columns(self) -> {str: np.ndarray}:
+        """
+        This function returns the metadata of all points, without copying it.
+        :return: One array per column, e.g. "measurement_azimuth" or "timestamp"
+        """
+        size = self._size
+        return {name: column[:size] for name, column in self._columns.items()}
+
+    @property
+    def sdr_names(self) -> [str]:
+        return list(self._sdr_names)
+
+    def as_dataframe(self) -> pd.DataFrame:
+        """
+        This function returns the measurement points as DataFrame, with one row per point and one column per bin.
+        The columns of the PSD levels share the memory of the buffer.
+        :return: DataFrame with measurement results
+        """
+        with self._lock:
+            size = self._size
+            columns = {name: column[:size] for name, column in self._columns.items()}
+            levels = self._levels[:size]
+            names = np.asarray(self._sdr_names + [None], dtype=object)
+        # timestamps in local time, as pd.Timestamp.fromtimestamp
+        timestamps = (
+            pd.to_datetime(columns["timestamp"], unit="ns", utc=True)
+            .tz_convert(tz.tzlocal())
+            .tz_localize(None)
+        )
+        metadata = pd.DataFrame(
+            {
+                "target_azimuth": columns["target_azimuth"],
+                "target_elevation": columns["target_elevation"],
+                "measurement_azimuth": columns["measurement_azimuth"],
+                "measurement_elevation": columns["measurement_elevation"],
+                "sdr": names[columns["sdr"]],
+                "center_frequency": (
+                    columns["frequency_start"] + columns["frequency_stop"]
+                )
+                / 2,
+                "psd_bandwidth": columns["frequency_step"],
+                "timestamp": timestamps,
+                "frequency_start": columns["frequency_start"],
+                "frequency_stop": columns["frequency_stop"],
+                "frequency_step": columns["frequency_step"],
+                "samples": columns["samples"],
+            },
+            copy=False,
+        )
+        psd = pd.DataFrame(
+            levels,
+            columns=[f"psd_{i}" for i in range(levels.shape[1])],
+            copy=False,
+        )
+        # float64, so the float32 block of the PSD levels is the only one and is not consolidated into a copy
+        if size > 0 and levels.shape[1] > 0:
+            summary = {
+                "psd_min": np.nanmin(levels, axis=1).astype(np.float64),
+                "psd_max": np.nanmax(levels, axis=1).astype(np.float64),
+                "psd_mean": np.nanmean(levels, axis=1, dtype=np.float64),
+            }
+        else:
+            summary = {
+                name: np.full(size, np.nan) for name in ("psd_min", "psd_max", "psd_mean")
+            }
+        return pd.concat(
+            [metadata, psd, pd.DataFrame(summary, copy=False)], axis=1, copy=False
+        )
+
+    def _reserve(self, size: int, bins: int):
+        # grows the arrays by doubling their capacity, so appending stays amortized O(1)
+        capacity = len(self._levels)
+        width = self._levels.shape[1]
+        if size <= capacity and bins <= width:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name, column in self._columns.items():
+            if len(column) < capacity:
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[: self._size] = column[: self._size]
+                self._columns[name] = grown
+        levels = np.full((capacity, max(width, bins)), np.nan, dtype=np.float32)
+        levels[: self._size, :width] = self._levels[: self._size]
+        self._levels = levels
+
+    def _write(self, index: int, mp: MeasurementPoint):
+        psd = mp.psd_levels
+        values = psd.psd_levels
+        if mp.sdr is None:
+            sdr = -1
+        else:
+            if mp.sdr not in self._sdr_names:
+                self._sdr_names.append(mp.sdr)
+            sdr = self._sdr_names.index(mp.sdr)
+        row = (
+            mp.target_position.azimuth,
+            mp.target_position.elevation,
+            mp.measurement_position.azimuth,
+            mp.measurement_position.elevation,
+            sdr,
+            psd.timestamp,
+            psd.frequency_start,
+            psd.frequency_stop,
+            psd.frequency_step,
+            psd.samples,
+            np.nan if psd.frequency is None else psd.frequency,
+            values.size,
+        )
+        for column, value in zip(self._columns.values(), row):
+            column[index] = value
+        self._levels[index, : values.size] = values
+        self._levels[index, values.size :] = np.nan
+
+    def _point(self, index: int) -> MeasurementPoint:
+        c = {name: column[index] for name, column in self._columns.items()}
+        sdr = int(c["sdr"])
+        return MeasurementPoint(
+            target_position=Position(
+                float(c["target_azimuth"]), float(c["target_elevation"])
+            ),
+            measurement_position=Position(
+                float(c["measurement_azimuth"]), float(c["measurement_elevation"])
+            ),
+            psd_levels=PSDLevels(
+                timestamp=int(c["timestamp"]),
+                frequency_start=float(c["frequency_start"]),
+                frequency_stop=float(c["frequency_stop"]),
+                frequency_step=float(c["frequency_step"]),
+                samples=int(c["samples"]),
+                psd_levels=self._levels[index, : int(c["bins"])],
+                frequency=None if np.isnan(c["frequency"]) else float(c["frequency"]),
+            ),
+            sdr=None if sdr < 0 else self._sdr_names[sdr],
+        )
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import base64
+import threading
+import numpy as np
+
+from .data_structures import Position, PSDLevels, MeasurementPoint
+from .sweep_buffer import SweepBuffer
+
+
+def _to_record(mp: MeasurementPoint) -> dict:
+    levels = mp.psd_levels
+    return {
+        "type": "measurement",
+        "target_position": [mp.target_position.azimuth, mp.target_position.elevation],
+        "measurement_position": [
+            mp.measurement_position.azimuth,
+            mp.measurement_position.elevation,
+        ],
+        "sdr": mp.sdr,
+        "timestamp": int(levels.timestamp),
+        "frequency_start": levels.frequency_start,
+        "frequency_stop": levels.frequency_stop,
+        "frequency_step": levels.frequency_step,
+        "samples": int(levels.samples),
+        "frequency": levels.frequency,
+        # the float32 levels are stored exactly and compact
+        "psd_levels": base64.b64encode(
+            levels.psd_levels.astype("<f4").tobytes()
+        ).decode("ascii"),
+    }
+
+
+def _from_record(record: dict) -> MeasurementPoint:
+    return MeasurementPoint(
+        target_position=Position(*record["target_position"]),
+        measurement_position=Position(*record["measurement_position"]),
+        psd_levels=PSDLevels(
+            timestamp=record["timestamp"],
+            frequency_start=record["frequency_start"],
+            frequency_stop=record["frequency_stop"],
+            frequency_step=record["frequency_step"],
+            samples=record["samples"],
+            psd_levels=np.frombuffer(
+                base64.b64decode(record["psd_levels"]), dtype="<f4"
+            ).astype(np.float32),
+            frequency=record.get("frequency"),
+        ),
+        sdr=record.get("sdr"),
+    )
+
+
+def _position_key(position: Position) -> (float, float):
+    return round(position.azimuth, 6), round(position.elevation, 6)
+
+
+class SweepLog:
+    """
+    Append-only log of a sweep, one JSON record per line. Every measurement point is written as soon as it was
+    measured, so an interrupted sweep can be resumed. A torn last line of a crashed process is discarded.
+    """
+
+    file_path: str
+    sync_interval: float  # in seconds, the longest time written records may stay in the page cache
+    motion_path: [(float, float)]  # the path of the current sweep
+    kind: str = None  # the kind of the current sweep, e.g. "sweep" or "adaptive"
+    measurement_points: SweepBuffer  # the measurements of the last sweep, as loaded from the file
+
+    def __init__(self, file_path: str, sync_interval: float = 10.0):
+        """
+        This function opens the sweep log and loads all records it already contains.
+        :param file_path: The path of the log file, which is created if it does not exist
+        :param sync_interval: The longest time in seconds between two syncs of the file to the disk
+        """
+        self.file_path = str(file_path)
+        self.sync_interval = float(sync_interval)
+        self.motion_path = []
+        self.measurement_points = SweepBuffer()
+        self._measured = set()
+        self._lock = threading.Lock()
+        self._load()
+        self._file = open(self.file_path, "a", encoding="utf-8")
+        self._last_sync = time.monotonic()
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, "rb+") as f:
+            data = f.read()
+            complete = data.rfind(b"\n") + 1
+            if complete < len(data):
+                print(f"Discard incomplete last record of {self.file_path}")
+                f.truncate(complete)
+        for line in data[:complete].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record["type"] == "sweep":
+                # only the last sweep of the log can be resumed
+                self.motion_path = [tuple(p) for p in record["motion_path"]]
+                self.kind = record.get("kind", "sweep")
+                self.measurement_points.clear()
+                self._measured = set()
+            elif record["type"] == "replan":
+                # the measurements taken before the sweep was re-planned stay part of it
+                self.motion_path = [tuple(p) for p in record["motion_path"]]
+            elif record["type"] == "measurement":
+                mp = _from_record(record)
+                self.measurement_points.append(mp)
+                self._measured.add(_position_key(mp.target_position))
+
+    def is_measured(self, position: Position) -> bool:
+        """
+        This function checks, whether the position of the current sweep was measured already.
+        :param position: The target position
+        :return: True, if the log contains a measurement at the target position
+        """
+        return _position_key(position) in self._measured
+
+    def take_measurement_points(self) -> SweepBuffer:
+        """
+        This function hands over the loaded measurements of the last sweep, e.g. to resume it. The log releases
+        them, so they are kept in memory only once.
+        :return: The measurement points
+        """
+        measurement_points, self.measurement_points = (
+            self.measurement_points,
+            SweepBuffer(capacity=1),
+        )
+        return measurement_points
+
+    @property
+    def resumable(self) -> bool:
+        # the passes of adaptive sweeps depend on the fits of the previous passes, so they are not resumed
+        return len(self.motion_path) > 0 and self.kind != "adaptive"
+
+    def start_sweep(self, motion_path: [(float, float)], kind: str = "sweep"):
+        """
+        This function records the start of a new sweep along the given path.
+        :param motion_path: The azimuth and elevation angles of all positions of the sweep
+        :param kind: The kind of the sweep, sweeps of the kind "adaptive" can not be resumed
+        :return: None
+        """
+        self.motion_path = [(float(az), float(el)) for az, el in motion_path]
+        self.kind = str(kind)
+        self.measurement_points.clear()
+        self._measured = set()
+        self._write(
+            [
+                {
+                    "type": "sweep",
+                    "kind": self.kind,
+                    "timestamp": time.time_ns(),
+                    "motion_path": self.motion_path,
+                }
+            ]
+        )
+        self.sync()
+
+    def replan(self, motion_path: [(float, float)]):
+        """
+        This function records a new path of the current sweep, the measurements taken so far are kept.
+        :param motion_path: The azimuth and elevation angles of all positions of the sweep, including the measured
+        :return: None
+        """
+        self.motion_path = [(float(az), float(el)) for az, el in motion_path]
+        self._write(
+            [
+                {
+                    "type": "replan",
+                    "timestamp": time.time_ns(),
+                    "motion_path": self.motion_path,
+                }
+            ]
+        )
+        self.sync()
+
+    def append(self, measurement_points: [MeasurementPoint]):
+        """
+        This function appends measurement points to the log. The file is flushed immediately and synced to the
+        disk at least every sync interval.
+        :param measurement_points: The measurement points
+        :return: None
+        """
+        # the points are only written, the caller keeps them in memory
+        self._write([_to_record(mp) for mp in measurement_points])
+        for mp in measurement_points:
+            self._measured.add(_position_key(mp.target_position))
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        """
+        This function writes all appended records to the disk.
+        :return: None
+        """
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._last_sync = time.monotonic()
+
+    def close(self):
+        """
+        This function syncs and closes the log file.
+        :return: None
+        """
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self) -> SweepLog:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, records: [dict]):
+        # one write per call, so concurrent writers never interleave their lines
+        lines = "".join(json.dumps(record) + "\n" for record in records)
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
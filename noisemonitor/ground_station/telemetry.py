@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import time
+import threading
+
+from .data_structures import Position
+from .scan import PositionTrack
+
+
+class RotatorTelemetry:
+    """
+    Polls the position of the rotator at a fixed rate on a background thread and publishes the timestamped readings
+    to any number of readers. Reading the cached position does not cause any request to the rotator controller.
+    """
+
+    interval: float
+    errors: int = 0
+
+    def __init__(self, read_position, interval: float = 0.2, history: int = 600):
+        """
+        This function initializes the telemetry service.
+        :param read_position: Function, which reads the position from the rotator controller
+        :param interval: The time between two position requests in seconds
+        :param history: The number of readings kept for interpolation
+        """
+        self.interval = float(interval)
+        self.track = PositionTrack(maxlen=history)
+        self._read_position = read_position
+        self._latest = None
+        self._subscribers = []
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        This function starts polling the rotator controller in the background.
+        :return: None
+        """
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._poll, name="rotator-telemetry", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        This function stops polling the rotator controller.
+        :return: None
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(5.0, 2 * self.interval))
+            self._thread = None
+        with self._condition:
+            self._condition.notify_all()
+
+    def subscribe(self, callback):
+        """
+        This function registers a function, which is called with the time (time.monotonic()) and the position of
+        each new reading. It is called from the telemetry thread, so it shall return quickly.
+        :param callback: The function
+        :return: None
+        """
+        with self._condition:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        This function removes a previously registered function.
+        :param callback: The function
+        :return: None
+        """
+        with self._condition:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def latest(self) -> (float, Position):
+        """
+        This function returns the latest reading without blocking.
+        :return: The time (time.monotonic()) and the position of the latest reading, or None without any reading
+        """
+        return self._latest
+
+    def position_at(self, timestamp: float) -> Position:
+        """
+        This function returns the position at the given point in time, interpolated between the readings.
+        :param timestamp: Point in time, in time.monotonic()
+        :return: The interpolated position
+        """
+        return self.track.position_at(timestamp)
+
+    def wait_for_reading(self, after: float, timeout: float = None) -> (float, Position):
+        """
+        This function waits for the first reading, which was requested after the given point in time.
+        :param after: Point in time, in time.monotonic()
+        :param timeout: The maximum time in seconds to wait, defaults to a few poll intervals
+        :return: The time (time.monotonic()) and the position of the reading
+        """
+        if timeout is None:
+            timeout = max(after - time.monotonic(), 0) + 5 * self.interval + 1
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: (self._latest is not None and self._latest[0] >= after)
+                or not self.running,
+                timeout,
+            ):
+                raise TimeoutError("Did not receive a rotator position in time!")
+            if self._latest is None or self._latest[0] < after:
+                raise Exception("Rotator telemetry was stopped!")
+            return self._latest
+
+    def _poll(self):
+        next_request = time.monotonic()
+        while not self._stop_event.is_set():
+            # the time of the request, so readings are never older than their timestamp
+            request_time = time.monotonic()
+            try:
+                position = self._read_position()
+            except Exception as e:
+                self.errors += 1
+                print(f"Could not read rotator position: {e}")
+            else:
+                self.track.append(request_time, position)
+                with self._condition:
+                    self._latest = (request_time, position)
+                    subscribers = list(self._subscribers)
+                    self._condition.notify_all()
+                for callback in subscribers:
+                    # a failing subscriber must not stop the telemetry of all others
+                    try:
+                        callback(request_time, position)
+                    except Exception as e:
+                        print(f"Could not publish rotator position: {e}")
+            next_request += self.interval
+            # do not try to catch up, if a request took longer than the interval
+            next_request = max(next_request, time.monotonic())
+            self._stop_event.wait(next_request - time.monotonic())
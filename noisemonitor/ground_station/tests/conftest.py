@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from noisemonitor.ground_station.data_structures import (
+    Position,
+    PSDLevels,
+    MeasurementPoint,
+)
+
+
+@pytest.fixture
+def measurement_point():
+    """
+    Factory of reproducible measurement points, whose metadata and PSD levels depend on the target position
+    """
+
+    def make(
+        azimuth: float,
+        elevation: float = 10.0,
+        bins: int = 32,
+        sdr: str = "rtlsdr",
+        frequency: float = 1.25e9,
+    ) -> MeasurementPoint:
+        rng = np.random.default_rng(round(azimuth * 1000))
+        return MeasurementPoint(
+            target_position=Position(azimuth, elevation),
+            measurement_position=Position(azimuth + 0.01, elevation - 0.01),
+            psd_levels=PSDLevels(
+                timestamp=1_700_000_000_123_456_789 + round(azimuth * 1e9),
+                frequency_start=1.2e9 + azimuth,
+                frequency_stop=1.3e9 + azimuth,
+                frequency_step=1e5,
+                samples=4096 + round(azimuth),
+                psd_levels=(rng.standard_normal(bins) - 75).astype(np.float32),
+                frequency=frequency,
+            ),
+            sdr=sdr,
+        )
+
+    return make
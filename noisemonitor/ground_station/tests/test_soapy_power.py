@@ -0,0 +1,71 @@
+import io
+import struct
+
+import numpy as np
+import pytest
+
+from noisemonitor.ground_station.soapy_power import BIN_HEADER, read_bin_frames
+
+# layout of soapy_power's writer (soapypower.writer.SoapyPowerBinFormat), independent of BIN_HEADER
+WRITER_MAGIC = b"SDRFF"
+WRITER_HEADER = struct.Struct("<BdddddQQ2x")
+
+
+def soapy_power_frame(
+    time_start: float, frequency_start: float, samples: int, levels: np.ndarray
+) -> bytes:
+    step = 4e6 / levels.size
+    return (
+        WRITER_MAGIC
+        + WRITER_HEADER.pack(
+            2,
+            time_start,
+            time_start + 0.5,
+            frequency_start,
+            frequency_start + 4e6,
+            step,
+            samples,
+            levels.nbytes,
+        )
+        + levels.tobytes()
+    )
+
+
+def test_header_size():
+    assert BIN_HEADER.size == len(WRITER_MAGIC) + WRITER_HEADER.size == 64
+
+
+def test_read_bin_frames():
+    rng = np.random.default_rng(0)
+    first = rng.normal(-70, 1, 16).astype(np.float32)
+    second = rng.normal(-60, 1, 1024).astype(np.float32)
+    stream = io.BytesIO(
+        soapy_power_frame(1_700_000_000.25, 1248e6, 4000440, first)
+        + soapy_power_frame(1_700_000_001.0, 1250e6, 2**40, second)
+    )
+    frames = list(read_bin_frames(stream))
+    assert len(frames) == 2
+    assert frames[0].time_start == pytest.approx(1_700_000_000_250_000_000, abs=1e3)
+    assert frames[0].duration == pytest.approx(0.5)
+    assert frames[0].frequency_start == 1248e6
+    assert frames[0].frequency_stop == 1252e6
+    assert frames[0].frequency_step == 4e6 / 16
+    assert frames[0].samples == 4000440
+    np.testing.assert_array_equal(frames[0].psd_levels, first)
+    assert frames[1].frequency_start == 1250e6
+    assert frames[1].samples == 2**40
+    np.testing.assert_array_equal(frames[1].psd_levels, second)
+
+
+def test_read_bin_frames_truncated():
+    levels = np.zeros(16, dtype=np.float32)
+    data = soapy_power_frame(1_700_000_000.0, 1248e6, 4096, levels)
+    frames = list(read_bin_frames(io.BytesIO(data + data[:-8])))
+    assert len(frames) == 1
+
+
+def test_read_bin_frames_unknown_header():
+    levels = np.zeros(16, dtype=np.float32)
+    data = b"XXXXX" + soapy_power_frame(1_700_000_000.0, 1248e6, 4096, levels)[5:]
+    with pytest.raises(ValueError):
+        list(read_bin_frames(io.BytesIO(data)))
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from noisemonitor.ground_station.sweep_buffer import SweepBuffer
+
+
+def test_points_round_trip(measurement_point):
+    points = [
+        measurement_point(0),
+        measurement_point(1, sdr=None, frequency=None),
+        measurement_point(2, bins=8, sdr="hackrf"),
+    ]
+    buffer = SweepBuffer(capacity=1)
+    for mp in points:
+        buffer.append(mp)
+    assert len(buffer) == 3
+    for expected, loaded in zip(points, buffer):
+        assert loaded.target_position == expected.target_position
+        assert loaded.measurement_position == expected.measurement_position
+        assert loaded.sdr == expected.sdr
+        assert loaded.timestamp == expected.timestamp
+        assert loaded.center_frequency == expected.center_frequency
+        assert loaded.psd_levels.samples == expected.psd_levels.samples
+        assert loaded.psd_levels.frequency == expected.psd_levels.frequency
+        np.testing.assert_array_equal(
+            loaded.psd_levels.psd_levels, expected.psd_levels.psd_levels
+        )
+    assert buffer[-1].sdr == "hackrf"
+    assert [mp.sdr for mp in buffer[1:]] == [None, "hackrf"]
+    # the shorter row is padded, without changing the bins of its point
+    assert np.isnan(buffer.levels[2, 8:]).all()
+
+
+def test_dataframe_matches_the_points(measurement_point):
+    points = [measurement_point(i) for i in range(50)]
+    buffer = SweepBuffer(capacity=4)
+    buffer.extend(points)
+    df = buffer.as_dataframe()
+    expected = pd.DataFrame([mp.as_dict() for mp in points])
+    assert list(df.columns) == list(expected.columns)
+    assert (df["sdr"] == expected["sdr"]).all()
+    assert (df["timestamp"] - expected["timestamp"]).abs().max() < pd.Timedelta(1, "ms")
+    numeric = [c for c in expected.columns if c not in ("sdr", "timestamp")]
+    np.testing.assert_allclose(
+        df[numeric].to_numpy(dtype=np.float64),
+        expected[numeric].to_numpy(dtype=np.float64),
+        rtol=1e-6,
+    )
+
+
+def test_dataframe_shares_the_psd_levels(measurement_point):
+    buffer = SweepBuffer()
+    buffer.extend([measurement_point(i) for i in range(10)])
+    df = buffer.as_dataframe()
+    assert np.shares_memory(df["psd_0"].to_numpy(), buffer.levels)
+
+
+def test_clear_keeps_previous_views(measurement_point):
+    buffer = SweepBuffer()
+    buffer.extend([measurement_point(i) for i in range(3)])
+    df = buffer.as_dataframe()
+    levels = df["psd_0"].to_numpy().copy()
+    buffer.clear()
+    assert len(buffer) == 0
+    buffer.extend([measurement_point(i + 10) for i in range(3)])
+    np.testing.assert_array_equal(df["psd_0"].to_numpy(), levels)
+
+
+def test_copy_is_independent(measurement_point):
+    buffer = SweepBuffer()
+    buffer.extend([measurement_point(i) for i in range(3)])
+    copy = buffer.copy()
+    buffer.clear()
+    buffer.append(measurement_point(7))
+    assert len(copy) == 3
+    assert copy[0].target_position == measurement_point(0).target_position
+
+
+def test_empty_buffer():
+    buffer = SweepBuffer()
+    assert len(buffer) == 0
+    assert list(buffer) == []
+    assert len(buffer.as_dataframe()) == 0
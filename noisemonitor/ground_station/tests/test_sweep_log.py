@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from noisemonitor.ground_station.data_structures import Position
+from noisemonitor.ground_station.sweep_log import SweepLog
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / "sweep_log.jsonl")
+
+
+def test_resume_restores_the_last_sweep_only(log_path, measurement_point):
+    with SweepLog(log_path) as log:
+        log.start_sweep([(1, 10), (2, 10)])
+        log.append([measurement_point(1), measurement_point(2)])
+        log.start_sweep([(3, 10), (4, 10)])
+        log.append([measurement_point(3)])
+    with SweepLog(log_path) as log:
+        assert log.motion_path == [(3, 10), (4, 10)]
+        assert [mp.target_position.azimuth for mp in log.measurement_points] == [3]
+        assert log.is_measured(Position(3, 10))
+        assert not log.is_measured(Position(4, 10))
+        assert not log.is_measured(Position(1, 10))
+
+
+def test_measurements_are_stored_exactly(log_path, measurement_point):
+    mp = measurement_point(5.5)
+    with SweepLog(log_path) as log:
+        log.start_sweep([(5.5, 10)])
+        log.append([mp])
+    with SweepLog(log_path) as log:
+        (loaded,) = log.measurement_points
+    assert loaded.target_position == mp.target_position
+    assert loaded.measurement_position == mp.measurement_position
+    assert loaded.sdr == mp.sdr
+    assert loaded.timestamp == mp.timestamp
+    assert loaded.psd_levels.frequency == mp.psd_levels.frequency
+    assert loaded.psd_levels.psd_levels.dtype == np.float32
+    np.testing.assert_array_equal(loaded.psd_levels.psd_levels, mp.psd_levels.psd_levels)
+
+
+def test_torn_last_record_is_discarded(log_path, measurement_point):
+    with SweepLog(log_path) as log:
+        log.start_sweep([(1, 10), (2, 10)])
+        log.append([measurement_point(1)])
+    with open(log_path, "a") as f:
+        f.write('{"type": "measurement", "target_position": [2, 1')
+    with SweepLog(log_path) as log:
+        assert len(log.measurement_points) == 1
+        assert not log.is_measured(Position(2, 10))
+        log.append([measurement_point(2)])
+    with open(log_path) as f:
+        assert all(line.endswith("}\n") for line in f)
+    with SweepLog(log_path) as log:
+        assert [mp.target_position.azimuth for mp in log.measurement_points] == [1, 2]
+
+
+def test_replanned_sweep_keeps_its_measurements(log_path, measurement_point):
+    with SweepLog(log_path) as log:
+        log.start_sweep([(1, 10), (2, 10), (3, 10)])
+        log.append([measurement_point(1)])
+        log.replan([(1, 10), (4, 10)])
+    with SweepLog(log_path) as log:
+        assert log.motion_path == [(1, 10), (4, 10)]
+        assert log.is_measured(Position(1, 10))
+        assert len(log.measurement_points) == 1
+        assert log.resumable
+
+
+def test_adaptive_sweeps_are_not_resumable(log_path):
+    with SweepLog(log_path) as log:
+        assert not log.resumable
+        log.start_sweep([(1, 10)], kind="adaptive")
+    with SweepLog(log_path) as log:
+        assert log.kind == "adaptive"
+        assert not log.resumable
+
+
+def test_appended_points_are_not_kept_in_memory(log_path, measurement_point):
+    with SweepLog(log_path) as log:
+        log.start_sweep([(1, 10)])
+        log.append([measurement_point(1)])
+        assert len(log.measurement_points) == 0
+        assert log.is_measured(Position(1, 10))
+    with SweepLog(log_path) as log:
+        points = log.take_measurement_points()
+        assert len(points) == 1
+        assert len(log.measurement_points) == 0
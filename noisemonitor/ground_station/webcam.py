@@ -1,4 +1,5 @@
 import cv2
+import threading
 import numpy as np
 
 from .antenna import GenericAntenna
@@ -29,6 +30,90 @@ class Webcam:
         self.cam_opening = float(cam_opening)
         self.position_azimuth = float(position_azimuth)
         self.position_elevation = float(position_elevation)
+        self._cap = None
+        self._cap_lock = threading.Lock()  # VideoCapture is not thread-safe
+        self._grabbed = 0  # number of frames grabbed since the stream (re-)connected
+        self._subscribers = []
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def streaming(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start_stream(self):
+        """
+        This function keeps a single connection to the webcam open and grabs its frames on a background thread,
+        so images can be grabbed without connecting to the webcam for every image. Frames are only decoded, when
+        they are used.
+        :return: None
+        """
+        if self.streaming:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._read_stream, name="webcam-stream", daemon=True
+        )
+        self._thread.start()
+
+    def stop_stream(self):
+        """
+        This function closes the connection to the webcam.
+        :return: None
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        with self._condition:
+            self._grabbed = 0
+
+    def grab_frame(self, timeout: float = 5.0) -> np.ndarray:
+        """
+        This function returns a copy of the latest frame of the stream, or takes a single image without a stream.
+        :param timeout: The maximum time in seconds to wait for the first frame of the stream
+        :return: The image
+        """
+        if not self.streaming:
+            cap = cv2.VideoCapture(self.rtsp_url, cv2.CAP_FFMPEG)
+            try:
+                ok, img = cap.read()
+            finally:
+                cap.release()
+            if not ok:
+                raise Exception("Could not read an image from the webcam!")
+            return img
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._grabbed > 0, timeout):
+                raise TimeoutError("Did not receive an image from the webcam in time!")
+        img = self._retrieve()
+        if img is None:
+            raise Exception("Could not decode an image from the webcam!")
+        return img
+
+    def subscribe(self, callback):
+        """
+        This function registers a function, which is called with each new frame of the stream. It is called from
+        the stream thread, so it shall return quickly and must not modify the frame. While functions are registered,
+        every frame is decoded.
+        :param callback: The function
+        :return: The latest frame or None, if no frame was received yet
+        """
+        with self._condition:
+            self._subscribers.append(callback)
+            grabbed = self._grabbed > 0
+        return self._retrieve() if grabbed else None
+
+    def unsubscribe(self, callback):
+        """
+        This function removes a previously registered function.
+        :param callback: The function
+        :return: None
+        """
+        with self._condition:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
 
     def take_image(
         self, image_path: str, overlay: bool = True, antenna: GenericAntenna = None
@@ -40,13 +125,75 @@ class Webcam:
         :param antenna: The antenna object necessary for the overlay
         :return: None
         """
-        cap = cv2.VideoCapture(self.rtsp_url, cv2.CAP_FFMPEG)
-        _, img = cap.read()
+        self.save_image(self.grab_frame(), image_path, overlay=overlay, antenna=antenna)
+
+    def save_image(
+        self,
+        img: np.ndarray,
+        image_path: str,
+        overlay: bool = True,
+        antenna: GenericAntenna = None,
+    ):
+        """
+        This function encodes a previously grabbed image and saves the file.
+        :param img: The image
+        :param image_path: File path where the image should be stored
+        :param overlay: Shall the image contain the overlay of the ground station information - True or False
+        :param antenna: The antenna object necessary for the overlay
+        :return: None
+        """
         if overlay:
             img = self.create_overlay(img, antenna)
-        cv2.imwrite(image_path, img)
-        cap.release()
-        return
+        if not cv2.imwrite(image_path, img):
+            raise Exception(f"Could not write image {image_path}!")
+
+    def _retrieve(self) -> np.ndarray:
+        # decodes the latest grabbed frame into a new image
+        with self._cap_lock:
+            if self._cap is None:
+                return None
+            ok, img = self._cap.retrieve()
+        return img if ok else None
+
+    def _release(self):
+        with self._condition:
+            self._grabbed = 0
+        with self._cap_lock:
+            if self._cap is not None:
+                self._cap.release()
+                self._cap = None
+
+    def _read_stream(self):
+        try:
+            while not self._stop_event.is_set():
+                if self._cap is None:
+                    cap = cv2.VideoCapture(self.rtsp_url, cv2.CAP_FFMPEG)
+                    with self._cap_lock:
+                        self._cap = cap
+                # grabbing continuously keeps the latest frame current, instead of buffering old frames,
+                # without decoding the frames, which are never used
+                with self._cap_lock:
+                    ok = self._cap.grab()
+                if not ok:
+                    print("Lost the webcam stream, reconnecting..")
+                    self._release()
+                    self._stop_event.wait(1.0)
+                    continue
+                with self._condition:
+                    self._grabbed += 1
+                    self._condition.notify_all()
+                    subscribers = list(self._subscribers)
+                if len(subscribers) > 0:
+                    img = self._retrieve()
+                    if img is not None:
+                        for callback in subscribers:
+                            # a failing subscriber must not stop the stream
+                            try:
+                                callback(img)
+                            except Exception as e:
+                                print(f"Could not pass on webcam image due to Exception: {e}")
+        finally:
+            self._release()
 
     def create_overlay(
         self,
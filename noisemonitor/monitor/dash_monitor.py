@@ -10,6 +10,7 @@ from ..ground_station import GroundStationController
 
 def display_results(controller: GroundStationController, sweep_df: pd.DataFrame = None):
     """This function launches a dash web server to display the results of the noise sweep data.
+    Multi-band sweeps are presented with one section per frequency window.
 
     :param controller: The initialized controller class of the ground station which recorded the data
     :param sweep_df: The measurement data, collected during noise sweep. If None, the previous measured data is used.
@@ -19,20 +20,6 @@ def display_results(controller: GroundStationController, sweep_df: pd.DataFrame
         sweep_df = controller.get_measurement_points_as_dataframe()
     title = "Noise Monitor"
     app = Dash(title)
-    buffer_3d = io.StringIO()
-    buffer_con = io.StringIO()
-
-    fig_3d = create_3d_figure(sweep_df)
-    fig_con, max_position = create_contour_figure(sweep_df, controller)
-
-    fig_3d.write_html(buffer_3d)
-    fig_con.write_html(buffer_con)
-
-    html_bytes_3d = buffer_3d.getvalue().encode()
-    encoded_3d = b64encode(html_bytes_3d).decode()
-
-    html_bytes_con = buffer_con.getvalue().encode()
-    encoded_con = b64encode(html_bytes_con).decode()
 
     oaz, oel = controller.ground_station.antenna.opening_angle
     try:
@@ -41,45 +28,24 @@ def display_results(controller: GroundStationController, sweep_df: pd.DataFrame
     except Exception:
         pos_tol = float('inf')
 
-    app.layout = html.Div(
-        [
-            html.H2(title),
-            html.H4("Noise sweep of PSD values displayed as 3D scatter"),
-            dcc.Graph(id="graph_3d", figure=fig_3d),
-            html.A(
-                html.Button("Download 3D graph as static HTML"),
-                id="download_3d",
-                href="data:text/html;base64," + encoded_3d,
-                download="3d_scatter.html",
-            ),
-            html.H4("Contour plot of the min PSD values"),
-            html.H6(
-                "The contour plot shows the distribution of the minimum PSD levels."
-            ),
-            html.H6(
-                "The intersection of the two dotted lines shows the maximum of estimated Gaussian distribution of the "
-                f"radiation source at {max_position.azimuth:.2f} azimuth and {max_position.elevation:.2f} elevation."
-            ),
-            html.H6(
-                f"The inaccuracy of the estimated position is thereby at least {pos_tol:.2f}° due to the rotator"
-                " resolution."
-            ),
-            html.H6(
-                "The green ellipse shows the half power band width of "
-                f"{oaz:.2f}° azimuth and {oel:.2f}° elevation."
-            ),
-            html.H6(
-                "If present, the red line shows the estimated path of the sun during the measurement."
-            ),
-            dcc.Graph(id="graph_con", figure=fig_con),
-            html.A(
-                html.Button("Download contour graph as static HTML"),
-                id="download_con",
-                href="data:text/html;base64," + encoded_con,
-                download="contour_plot.html",
-            ),
-        ]
-    )
+    children = [html.H2(title)]
+    if "sdr" not in sweep_df.columns:
+        sweep_df = sweep_df.assign(sdr="")
+    sweep_df = sweep_df.fillna({"sdr": ""})
+    bands = sweep_df.groupby(["sdr", "center_frequency"], sort=True)
+    for i, ((sdr, frequency), band_df) in enumerate(bands):
+        if bands.ngroups > 1:
+            children.append(
+                html.H3(f"Frequency window at {frequency/1e6:.3f}MHz {sdr}".strip())
+            )
+        children += _create_band_section(
+            sweep_df=band_df,
+            controller=controller,
+            suffix="" if i == 0 else f"_{i}",
+            pos_tol=pos_tol,
+            opening_angle=(oaz, oel),
+        )
+    app.layout = html.Div(children)
 
     print("Press CTRL+C to quit")
     app.run_server(
@@ -87,3 +53,64 @@ def display_results(controller: GroundStationController, sweep_df: pd.DataFrame
         port=controller.port,
         host=controller.ip,
     )
+
+
+def _create_band_section(
+    sweep_df: pd.DataFrame,
+    controller: GroundStationController,
+    suffix: str,
+    pos_tol: float,
+    opening_angle: (float, float),
+) -> list:
+    oaz, oel = opening_angle
+    buffer_3d = io.StringIO()
+    buffer_con = io.StringIO()
+
+    fig_3d = create_3d_figure(sweep_df)
+    fig_con, max_position = create_contour_figure(sweep_df, controller)
+
+    fig_3d.write_html(buffer_3d)
+    fig_con.write_html(buffer_con)
+
+    html_bytes_3d = buffer_3d.getvalue().encode()
+    encoded_3d = b64encode(html_bytes_3d).decode()
+
+    html_bytes_con = buffer_con.getvalue().encode()
+    encoded_con = b64encode(html_bytes_con).decode()
+
+    return [
+        html.H4("Noise sweep of PSD values displayed as 3D scatter"),
+        dcc.Graph(id=f"graph_3d{suffix}", figure=fig_3d),
+        html.A(
+            html.Button("Download 3D graph as static HTML"),
+            id=f"download_3d{suffix}",
+            href="data:text/html;base64," + encoded_3d,
+            download=f"3d_scatter{suffix}.html",
+        ),
+        html.H4("Contour plot of the min PSD values"),
+        html.H6(
+            "The contour plot shows the distribution of the minimum PSD levels."
+        ),
+        html.H6(
+            "The intersection of the two dotted lines shows the maximum of estimated Gaussian distribution of the "
+            f"radiation source at {max_position.azimuth:.2f} azimuth and {max_position.elevation:.2f} elevation."
+        ),
+        html.H6(
+            f"The inaccuracy of the estimated position is thereby at least {pos_tol:.2f}° due to the rotator"
+            " resolution."
+        ),
+        html.H6(
+            "The green ellipse shows the half power band width of "
+            f"{oaz:.2f}° azimuth and {oel:.2f}° elevation."
+        ),
+        html.H6(
+            "If present, the red line shows the estimated path of the sun during the measurement."
+        ),
+        dcc.Graph(id=f"graph_con{suffix}", figure=fig_con),
+        html.A(
+            html.Button("Download contour graph as static HTML"),
+            id=f"download_con{suffix}",
+            href="data:text/html;base64," + encoded_con,
+            download=f"contour_plot{suffix}.html",
+        ),
+    ]
@@ -0,0 +1,177 @@
+#! python3
+
+import time
+import argparse
+import pandas as pd
+
+from noisemonitor.ground_station.scheduler import (
+    JOB_KINDS,
+    JobQueue,
+    ScheduledJob,
+    Scheduler,
+)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Schedules sweeps, tracking sessions and monitoring jobs of ground stations"
+    )
+    parser.add_argument(
+        "-q",
+        "--queue",
+        type=str,
+        default="noise_jobs.json",
+        help="JSON file of the job queue",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the jobs of the queue, until stopped")
+    run.add_argument(
+        "-o",
+        "--output_dir",
+        type=str,
+        default=".",
+        help="Directory of the sweep logs and sweep data files of all jobs",
+    )
+    run.add_argument(
+        "-p",
+        "--poll_interval",
+        type=float,
+        default=10,
+        help="Longest time between two checks of the job triggers in seconds",
+    )
+
+    add = commands.add_parser("add", help="Add a job to the queue")
+    add.add_argument(
+        "config_file", type=str, help="Yaml configuration file of the ground station"
+    )
+    add.add_argument("kind", type=str, choices=JOB_KINDS, help="The kind of the job")
+    add.add_argument(
+        "-st",
+        "--start_time",
+        type=str,
+        default=None,
+        help="The UTC time at which the job shall start",
+    )
+    add.add_argument(
+        "--trigger_object",
+        type=str,
+        default=None,
+        help="Start the job once this object, e.g. sun or moon, is above the trigger elevation",
+    )
+    add.add_argument(
+        "--trigger_elevation",
+        type=float,
+        default=None,
+        help="Elevation angle of the trigger object in degree",
+    )
+    add.add_argument(
+        "--target_object",
+        type=str,
+        default=None,
+        help="Object of the job, defaults to the target object of the config",
+    )
+    add.add_argument(
+        "-tp_az",
+        "--target_position_azimuth",
+        type=float,
+        default=None,
+        help="Azimuth angle of a fixed target point",
+    )
+    add.add_argument(
+        "-tp_el",
+        "--target_position_elevation",
+        type=float,
+        default=None,
+        help="Elevation angle of a fixed target point",
+    )
+    add.add_argument(
+        "-d",
+        "--duration",
+        type=float,
+        default=3600,
+        help="Duration of tracking and monitoring jobs in seconds",
+    )
+    add.add_argument(
+        "-i",
+        "--interval",
+        type=float,
+        default=0,
+        help="Time between two measurements of monitoring jobs in seconds",
+    )
+    add.add_argument(
+        "-tb",
+        "--time_budget",
+        type=float,
+        default=None,
+        help="Duration of sweep jobs in seconds, the densest grid that fits is measured",
+    )
+    add.add_argument(
+        "-img",
+        "--take_images",
+        action="store_true",
+        help="Images shall be taken at every measurement point",
+    )
+    add.add_argument(
+        "-opt",
+        "--optimize_path",
+        action="store_true",
+        help="Reorder the positions of the sweep to minimize the slew time of the rotator",
+    )
+
+    commands.add_parser("status", help="Show the jobs of the queue")
+
+    cancel = commands.add_parser("cancel", help="Cancel a job, which did not start yet")
+    cancel.add_argument("job_id", type=str, help="The id of the job")
+    args = parser.parse_args()
+
+    queue = JobQueue(args.queue)
+    if args.command == "run":
+        scheduler = Scheduler(
+            queue, output_dir=args.output_dir, poll_interval=args.poll_interval
+        )
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            print("Wait for the running jobs to finish..")
+            scheduler.shutdown()
+    elif args.command == "add":
+        job = queue.add(
+            ScheduledJob(
+                station=args.config_file,
+                kind=args.kind,
+                start_time=None
+                if args.start_time is None
+                else pd.to_datetime(args.start_time, utc=True).timestamp(),
+                trigger_object=args.trigger_object,
+                trigger_elevation=args.trigger_elevation,
+                target_object=args.target_object,
+                azimuth=args.target_position_azimuth,
+                elevation=args.target_position_elevation,
+                duration=args.duration,
+                interval=args.interval,
+                time_budget=args.time_budget,
+                take_images=args.take_images,
+                optimize_path=args.optimize_path or None,
+            )
+        )
+        print(f"Added {job.kind} job {job.job_id}")
+    elif args.command == "cancel":
+        job = queue.cancel(args.job_id)
+        print(f"Cancelled {job.kind} job {job.job_id}")
+    else:
+        for job in queue.jobs():
+            start = (
+                "asap"
+                if job.start_time is None
+                else time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime(job.start_time))
+            )
+            trigger = (
+                ""
+                if job.trigger_object is None
+                else f", {job.trigger_object} above {job.trigger_elevation:.1f}°"
+            )
+            error = "" if job.error is None else f" - {job.error}"
+            print(
+                f"{job.job_id} {job.kind:<10} {job.state:<9} {job.station} "
+                f"(start {start}{trigger}){error}"
+            )
@@ -4,7 +4,7 @@ import time
 import argparse
 import pandas as pd
 
-from noisemonitor import GroundStationController, display_results
+from noisemonitor import GroundStationController, SDR, display_results
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -55,12 +55,71 @@ if __name__ == "__main__":
         default=None,
         help="Angle of the scan width in elevation direction",
     )
+    parser.add_argument(
+        "-f",
+        "--frequencies",
+        type=float,
+        nargs="+",
+        default=None,
+        help="Center frequencies of the frequency windows, which shall be captured at every position",
+    )
     parser.add_argument(
         "-img",
         "--take_images",
         action="store_true",
         help="Images shall be taken at every measurement point",
     )
+    parser.add_argument(
+        "-c",
+        "--continuous",
+        action="store_true",
+        help="Measure continuously while the rotator slews along each row, instead of stopping at every point",
+    )
+    parser.add_argument(
+        "-opt",
+        "--optimize_path",
+        action="store_true",
+        help="Reorder the positions of the sweep to minimize the slew time of the rotator",
+    )
+    parser.add_argument(
+        "-a",
+        "--adaptive",
+        action="store_true",
+        help="Locate the source with a coarse pass, followed by finer passes around the estimated peak",
+    )
+    parser.add_argument(
+        "-unc",
+        "--target_uncertainty",
+        type=float,
+        default=None,
+        help="Position uncertainty in degree, at which an adaptive sweep stops",
+    )
+    parser.add_argument(
+        "-tb",
+        "--time_budget",
+        type=float,
+        default=None,
+        help="Duration of the sweep in seconds, the densest grid that fits is measured",
+    )
+    parser.add_argument(
+        "-dl",
+        "--deadline",
+        type=str,
+        default=None,
+        help="The time at which the sweep has to be finished, the densest grid that fits is measured",
+    )
+    parser.add_argument(
+        "-log",
+        "--sweep_log",
+        type=str,
+        default=None,
+        help="Log file, to which every measurement is appended as soon as it was taken",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the interrupted sweep of the sweep log, skipping the positions it already contains",
+    )
     parser.add_argument(
         "-res",
         "--show_results",
@@ -74,7 +133,21 @@ if __name__ == "__main__":
         default=None,
         help="The time at which the measurement shall start",
     )
+    parser.add_argument(
+        "--rescan",
+        action="store_true",
+        help="Ignore cached SDR detection results and detect the connected SDRs again",
+    )
     args = parser.parse_args()
+    if args.resume and (args.sweep_log is None or args.adaptive or args.continuous):
+        parser.error("--resume requires --sweep_log and a sweep along a path")
+    if (args.time_budget is not None or args.deadline is not None) and (
+        args.adaptive or args.continuous
+    ):
+        parser.error("--time_budget and --deadline require a sweep along a path")
+
+    if args.rescan:
+        SDR.clear_detection_cache()
 
     if args.start_time is not None:
         t = pd.to_datetime(args.start_time, utc=True).timestamp()
@@ -83,7 +156,15 @@ if __name__ == "__main__":
             time.sleep(30)
 
     t_start = int(time.time())
+    deadline = None
+    if args.deadline is not None:
+        deadline = pd.to_datetime(args.deadline, utc=True).timestamp()
+    elif args.time_budget is not None:
+        deadline = time.time() + args.time_budget
     mission_control = GroundStationController(config_file=args.config_file)
+    mission_control.open_sweep_log(
+        args.sweep_log or f"sweep_log_{t_start}.jsonl", resume=args.resume
+    )
 
     if (
         args.target_position_azimuth is not None
@@ -102,9 +183,38 @@ if __name__ == "__main__":
     if args.width_azimuth is not None and args.width_elevation is not None:
         mission_control.set_scan_width(args.width_azimuth, args.width_elevation)
 
-    mission_control.compute_path()
-    mission_control.track_motion_path(take_images=args.take_images)
+    if args.frequencies is not None:
+        mission_control.set_target_frequencies(args.frequencies)
+
+    if args.resume:
+        # the path is restored from the sweep log
+        mission_control.track_motion_path(
+            take_images=args.take_images,
+            resume=True,
+            deadline=deadline,
+            optimize=args.optimize_path or None,
+        )
+    elif deadline is not None:
+        mission_control.budgeted_sweep(
+            deadline=deadline,
+            optimize=args.optimize_path or None,
+            take_images=args.take_images,
+        )
+    elif args.adaptive:
+        mission_control.adaptive_sweep(
+            target_uncertainty=args.target_uncertainty, take_images=args.take_images
+        )
+    else:
+        # continuous scans need the rows of the path in order
+        mission_control.compute_path(
+            optimize=False if args.continuous else (args.optimize_path or None)
+        )
+        if args.continuous:
+            mission_control.scan_motion_path()
+        else:
+            mission_control.track_motion_path(take_images=args.take_images)
 
+    mission_control.close_sweep_log()
     df = mission_control.get_measurement_points_as_dataframe()
     df.to_csv(f"sweep_data_{t_start}-{int(time.time())}.csv")
 
@@ -32,6 +32,10 @@ if __name__ == "__main__":
         print("Cannot open RTSP webcam stream")
         exit(-1)
 
+    # the overlay reads the cached position, instead of querying the rotator for every frame
+    if gsc.ground_station.rotator.telemetry is None:
+        gsc.ground_station.rotator.start_telemetry()
+
     print("Start Webcam overlay processing..")
 
     while True:
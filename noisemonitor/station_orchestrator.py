@@ -0,0 +1,75 @@
+#! python3
+
+import argparse
+
+from noisemonitor.ground_station.orchestrator import Orchestrator, StationJob
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Controls several ground stations concurrently and collects their noise data"
+    )
+    parser.add_argument(
+        "config_files",
+        type=str,
+        nargs="+",
+        help="Yaml configuration files of the ground stations, one per station",
+    )
+    parser.add_argument(
+        "-m",
+        "--mode",
+        type=str,
+        default="sweep",
+        choices=["sweep", "continuous", "adaptive", "track"],
+        help="The job of all stations: sweep around, locate or track their target object",
+    )
+    parser.add_argument(
+        "-img",
+        "--take_images",
+        action="store_true",
+        help="Images shall be taken at every measurement point",
+    )
+    parser.add_argument(
+        "-opt",
+        "--optimize_path",
+        action="store_true",
+        help="Reorder the positions of the sweeps to minimize the slew time of the rotators",
+    )
+    parser.add_argument(
+        "-d",
+        "--duration",
+        type=float,
+        default=3600,
+        help="Duration of tracking jobs in seconds",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_dir",
+        type=str,
+        default=".",
+        help="Directory of the sweep logs and sweep data files of all stations",
+    )
+    parser.add_argument(
+        "-p",
+        "--progress_interval",
+        type=float,
+        default=30,
+        help="Time between two progress reports in seconds",
+    )
+    args = parser.parse_args()
+
+    orchestrator = Orchestrator(
+        [
+            StationJob(
+                config_file=config_file,
+                mode=args.mode,
+                take_images=args.take_images,
+                optimize_path=args.optimize_path or None,
+                duration=args.duration,
+            )
+            for config_file in args.config_files
+        ],
+        output_dir=args.output_dir,
+    )
+    status = orchestrator.run(progress_interval=args.progress_interval)
+    if any(s.state == "failed" for s in status.values()):
+        exit(-1)
@@ -11,6 +11,8 @@ setup(
         "noisemonitor/noise_monitor.py",
         "noisemonitor/noise_sweeper.py",
         "noisemonitor/rotator_cam.py",
+        "noisemonitor/station_orchestrator.py",
+        "noisemonitor/noise_scheduler.py",
     ],
     install_requires=[
         "numpy",